@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_cart_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='flush_token',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='flush token'),
+        ),
+    ]
@@ -1,7 +1,15 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.core.cache import cache
 from django.core.validators import MinValueValidator
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
 from decimal import Decimal
+from ecommerce.cache import get_namespace_version
+
+# Segundos que se conserva en caché el resumen de un carrito
+CART_SUMMARY_TIMEOUT = 60 * 60 * 24
 
 
 class Cart(models.Model):
@@ -15,6 +23,11 @@ class Cart(models.Model):
         verbose_name=_('user')
     )
     
+    # Se incrementa con cada cambio en los items (invalida el resumen cacheado)
+    version = models.PositiveIntegerField(_('version'), default=0, editable=False)
+    # Último lote de cambios pendientes de Redis aplicado (ver cart/store.py)
+    flush_token = models.CharField(_('flush token'), max_length=32, blank=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
@@ -27,20 +40,64 @@ class Cart(models.Model):
     def __str__(self):
         return f"Cart of {self.user.full_name}"
     
+    @classmethod
+    def bump_version(cls, cart_id):
+        """Marca el carrito como modificado, lo que invalida su resumen."""
+        cls.objects.filter(pk=cart_id).update(version=F('version') + 1, updated_at=timezone.now())
+    
+    def compute_summary(self):
+        """
+        Totales del carrito con una sola agregación. Como
+        ProductVariant.final_price, una variante sin precio (nulo o 0) usa el
+        del producto.
+        """
+        money = DecimalField(max_digits=12, decimal_places=2)
+        totals = CartItem.objects.filter(cart=self).aggregate(
+            lines=Count('id'),
+            total_items=Coalesce(Sum('quantity'), 0),
+            total_price=Coalesce(
+                Sum(F('quantity') * Coalesce(NullIf('variant__price', Value(0)), 'product__price'), output_field=money),
+                Decimal('0'),
+                output_field=money
+            ),
+        )
+        return {
+            'version': self.version,
+            'lines': totals['lines'],
+            'total_items': totals['total_items'],
+            'total_price': totals['total_price'],
+            'is_empty': totals['lines'] == 0,
+        }
+    
+    def summary_cache_key(self):
+        # Los precios dependen del catálogo, así que su versión forma parte de la clave
+        return f'cart:summary:{self.pk}:{self.version}:{get_namespace_version("products")}'
+    
+    def get_summary(self):
+        """Resumen del carrito, cacheado por versión del carrito y del catálogo."""
+        key = self.summary_cache_key()
+        if getattr(self, '_summary_key', None) != key:
+            summary = cache.get(key)
+            if summary is None:
+                summary = self.compute_summary()
+                cache.set(key, summary, CART_SUMMARY_TIMEOUT)
+            self._summary_key, self._summary = key, summary
+        return self._summary
+    
     @property
     def total_items(self):
         """Retorna el total de items en el carrito."""
-        return sum(item.quantity for item in self.items.all())
+        return self.get_summary()['total_items']
     
     @property
     def total_price(self):
         """Retorna el precio total del carrito."""
-        return sum(item.total_price for item in self.items.all())
+        return self.get_summary()['total_price']
     
     @property
     def is_empty(self):
         """Verifica si el carrito está vacío."""
-        return self.items.count() == 0
+        return self.get_summary()['is_empty']
 
 
 class CartItem(models.Model):
@@ -81,6 +138,21 @@ class CartItem(models.Model):
         db_table = 'cart_items'
         unique_together = ['cart', 'product', 'variant']
     
+    @classmethod
+    def with_details(cls, expand=()):
+        """
+        Items con todo lo que necesita CartItemSerializer en una sola
+        consulta; las relaciones expandidas agregan sus prefetch.
+        """
+        queryset = cls.objects.select_related(
+            'product__brand', 'variant__product', 'variant__size', 'variant__color'
+        ).order_by('created_at', 'id')
+        if 'product' in expand:
+            queryset = queryset.select_related('product__category').prefetch_related(
+                'product__variants__size', 'product__variants__color'
+            )
+        return queryset
+    
     def __str__(self):
         variant_info = f" - {self.variant}" if self.variant else ""
         return f"{self.product.name}{variant_info} x{self.quantity}"
@@ -97,6 +169,13 @@ class CartItem(models.Model):
         """Retorna el precio total del item."""
         return self.unit_price * self.quantity
     
+    @staticmethod
+    def available_quantity(product, variant=None):
+        """Unidades que admite el carrito para la línea; None si no hay límite."""
+        if not product.track_inventory or product.allow_backorder:
+            return None
+        return variant.inventory_quantity if variant else product.inventory_quantity
+    
     def clean(self):
         """Validaciones del modelo."""
         from django.core.exceptions import ValidationError
@@ -106,10 +185,9 @@ class CartItem(models.Model):
             raise ValidationError(_('La variante debe pertenecer al producto seleccionado.'))
         
         # Verificar stock disponible
-        if self.product.track_inventory:
-            available_quantity = self.variant.inventory_quantity if self.variant else self.product.inventory_quantity
-            if self.quantity > available_quantity and not self.product.allow_backorder:
-                raise ValidationError(_('No hay suficiente stock disponible.'))
+        available_quantity = self.available_quantity(self.product, self.variant)
+        if available_quantity is not None and self.quantity > available_quantity:
+            raise ValidationError(_('No hay suficiente stock disponible.'))
     
     def save(self, *args, **kwargs):
         self.clean()
@@ -165,5 +243,12 @@ class WishlistItem(models.Model):
         db_table = 'wishlist_items'
         unique_together = ['wishlist', 'product']
     
+    @classmethod
+    def with_details(cls):
+        """Items con el producto, su categoría, marca y variantes para ProductListSerializer."""
+        return cls.objects.select_related('product__category', 'product__brand').prefetch_related(
+            'product__variants__size', 'product__variants__color'
+        ).order_by('created_at', 'id')
+    
     def __str__(self):
         return f"{self.product.name} in {self.wishlist.user.full_name}'s wishlist"
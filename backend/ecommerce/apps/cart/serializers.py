@@ -1,14 +1,80 @@
 from rest_framework import serializers
 from .models import Cart, CartItem, Wishlist, WishlistItem
+from ecommerce.apps.products.models import Product, ProductVariant
 from ecommerce.apps.products.serializers import ProductListSerializer, ProductVariantSerializer
 
 
+# Relaciones que se pueden pedir completas con ?expand=product,variant
+EXPANDABLE_FIELDS = ('product', 'variant')
+
+
+def parse_expand(request):
+    """Retorna las relaciones pedidas en ?expand= que admiten expansión."""
+    if request is None:
+        return ()
+    values = request.query_params.get('expand', '').split(',')
+    return tuple(value.strip() for value in values if value.strip() in EXPANDABLE_FIELDS)
+
+
+class CartProductSerializer(serializers.ModelSerializer):
+    """
+    Producto resumido con los campos que muestra el carrito.
+    """
+    primary_image = serializers.SerializerMethodField()
+    brand_details = serializers.SerializerMethodField()
+    is_in_stock = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'name', 'slug', 'sku', 'price', 'compare_price', 'primary_image',
+            'brand_details', 'inventory_quantity', 'track_inventory', 'allow_backorder',
+            'is_in_stock'
+        ]
+    
+    def get_primary_image(self, obj):
+        return obj.primary_image_url or None
+    
+    def get_brand_details(self, obj):
+        if obj.brand:
+            return {'id': obj.brand.id, 'name': obj.brand.name}
+        return None
+
+
+class CartVariantSerializer(serializers.ModelSerializer):
+    """
+    Variante resumida: talla, color, precio final y stock.
+    """
+    size_details = serializers.SerializerMethodField()
+    color_details = serializers.SerializerMethodField()
+    final_price = serializers.ReadOnlyField()
+    is_in_stock = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = ProductVariant
+        fields = [
+            'id', 'sku', 'size_details', 'color_details', 'final_price',
+            'inventory_quantity', 'is_in_stock'
+        ]
+    
+    def get_size_details(self, obj):
+        if obj.size:
+            return {'id': obj.size.id, 'name': obj.size.name}
+        return None
+    
+    def get_color_details(self, obj):
+        if obj.color:
+            return {'id': obj.color.id, 'name': obj.color.name, 'hex_code': obj.color.hex_code}
+        return None
+
+
 class CartItemSerializer(serializers.ModelSerializer):
     """
-    Serializer para items del carrito.
+    Serializer para items del carrito. Por defecto el producto y la variante
+    se representan resumidos; ?expand=product,variant los devuelve completos.
     """
-    product_details = ProductListSerializer(source='product', read_only=True)
-    variant_details = ProductVariantSerializer(source='variant', read_only=True)
+    product_details = CartProductSerializer(source='product', read_only=True)
+    variant_details = CartVariantSerializer(source='variant', read_only=True)
     unit_price = serializers.ReadOnlyField()
     total_price = serializers.ReadOnlyField()
     
@@ -19,6 +85,15 @@ class CartItemSerializer(serializers.ModelSerializer):
             'product_details', 'variant_details', 'unit_price', 'total_price'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get('expand', ())
+        if 'product' in expand:
+            fields['product_details'] = ProductListSerializer(source='product', read_only=True)
+        if 'variant' in expand:
+            fields['variant_details'] = ProductVariantSerializer(source='variant', read_only=True)
+        return fields
 
 
 class CartSerializer(serializers.ModelSerializer):
@@ -33,10 +108,28 @@ class CartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cart
         fields = [
-            'id', 'user', 'created_at', 'updated_at',
+            'id', 'user', 'version', 'created_at', 'updated_at',
             'items', 'total_items', 'total_price', 'is_empty'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'version', 'created_at', 'updated_at']
+
+
+class CartSummarySerializer(serializers.ModelSerializer):
+    """
+    Totales del carrito sin cargar sus items (para el contador del header).
+    """
+    lines = serializers.SerializerMethodField()
+    total_items = serializers.ReadOnlyField()
+    total_price = serializers.ReadOnlyField()
+    is_empty = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = Cart
+        fields = ['id', 'version', 'lines', 'total_items', 'total_price', 'is_empty', 'updated_at']
+        read_only_fields = fields
+    
+    def get_lines(self, obj):
+        return obj.get_summary()['lines']
 
 
 class WishlistItemSerializer(serializers.ModelSerializer):
@@ -0,0 +1,15 @@
+"""
+Invalidación del resumen del carrito ante cambios en sus items.
+"""
+
+from django.db.models.signals import post_save, post_delete
+
+from .models import Cart, CartItem
+
+
+def bump_cart_version(sender, instance, **kwargs):
+    Cart.bump_version(instance.cart_id)
+
+
+post_save.connect(bump_cart_version, sender=CartItem, dispatch_uid='cart-version-save-CartItem')
+post_delete.connect(bump_cart_version, sender=CartItem, dispatch_uid='cart-version-delete-CartItem')
@@ -0,0 +1,320 @@
+"""
+Carrito en Redis con escritura diferida (CART_BACKEND = 'redis').
+
+Agregar al carrito no toca la base de datos: la cantidad se acumula con
+HINCRBY en `cart:pending:<user_id>` (campo `<product_id>:<variant_id>`) y el
+usuario se marca en `cart:dirty`. Los cambios pendientes se escriben en
+Cart/CartItem:
+
+- de forma asíncrona, con la tarea `flush_cart` programada al primer cambio
+  de cada ráfaga y `flush_pending_carts` como barrido periódico;
+- de forma síncrona antes de cualquier lectura o edición del carrito, para
+  que la API siempre vea el estado completo.
+
+Cada escritura toma un candado con expiración (`cart:flush-lock:<user_id>`)
+y mueve los pendientes a `cart:flushing:<user_id>` junto con un token. Si el
+proceso muere a mitad, el candado expira y la siguiente escritura retoma ese
+lote; el token se guarda en Cart.flush_token en la misma transacción que los
+cambios, así que un lote nunca se aplica dos veces.
+
+Las cantidades se validan contra el stock antes de sumarlas en Redis y otra
+vez al escribirlas: las escrituras masivas no pasan por CartItem.clean(), así
+que una línea nunca queda por encima de lo disponible (si dos agregados
+simultáneos la superan, se recorta al stock). Las lecturas esperan a que
+termine la escritura en curso antes de consultar la base de datos.
+
+Con CART_BACKEND = 'database' (por defecto) todo sigue yendo a la base de datos.
+"""
+
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from redis.exceptions import RedisError, WatchError
+from rest_framework.exceptions import APIException
+
+from ecommerce.apps.products.models import Product, ProductVariant
+from .models import Cart, CartItem
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'cart:pending:{user_id}'
+FLUSHING_KEY = 'cart:flushing:{user_id}'
+LOCK_KEY = 'cart:flush-lock:{user_id}'
+DIRTY_KEY = 'cart:dirty'
+TOKEN_FIELD = b'__token'
+# Segundos que una escritura puede tener el carrito tomado antes de darla por muerta
+FLUSH_LOCK_TIMEOUT = 60
+# Red de seguridad para lotes que nadie retoma (el usuario sigue en cart:dirty)
+FLUSHING_TTL = 7 * 24 * 60 * 60
+# Segundos que una lectura espera a que termine otra escritura del carrito
+FLUSH_LOCK_WAIT = 10
+FLUSH_LOCK_POLL = 0.05
+
+
+class CartBusy(APIException):
+    status_code = 503
+    default_detail = 'El carrito se está actualizando; intente de nuevo.'
+    default_code = 'cart_busy'
+
+
+def _line_key(product_id, variant_id):
+    return f'{product_id}:{variant_id or 0}'
+
+
+def _parse_line_key(key):
+    product_id, variant_id = (int(part) for part in key.decode().split(':'))
+    return product_id, variant_id or None
+
+
+@transaction.atomic
+def apply_cart_deltas(user_id, deltas, token=''):
+    """
+    Aplica en la base de datos los cambios de cantidad {(producto, variante): delta}
+    con operaciones masivas. Se descartan productos inexistentes y variantes
+    que no pertenecen a su producto, y ninguna línea sube por encima del stock
+    disponible. Si el lote trae `token` y ya se aplicó (Cart.flush_token), no
+    hace nada.
+    """
+    Cart.objects.get_or_create(user_id=user_id)
+    cart = Cart.objects.select_for_update().get(user_id=user_id)
+    if token:
+        if cart.flush_token == token:
+            return 0
+        Cart.objects.filter(pk=cart.pk).update(flush_token=token)
+
+    products = Product.objects.only(
+        'track_inventory', 'allow_backorder', 'inventory_quantity'
+    ).in_bulk({pk for pk, _ in deltas})
+    variants = ProductVariant.objects.only('product_id', 'inventory_quantity').in_bulk(
+        {pk for _, pk in deltas if pk}
+    )
+    deltas = {
+        (product_id, variant_id): delta
+        for (product_id, variant_id), delta in deltas.items()
+        if product_id in products and (variant_id is None or (
+            variant_id in variants and variants[variant_id].product_id == product_id
+        ))
+    }
+    if not deltas:
+        return 0
+
+    existing = {
+        (item.product_id, item.variant_id): item
+        for item in CartItem.objects.select_for_update().filter(cart=cart, product_id__in={pk for pk, _ in deltas})
+    }
+    now = timezone.now()
+    to_update, to_delete, to_create = [], [], []
+    for line, delta in deltas.items():
+        item = existing.get(line)
+        current = item.quantity if item else 0
+        quantity = current + delta
+        available = CartItem.available_quantity(products[line[0]], variants.get(line[1]))
+        if available is not None and quantity > max(available, current):
+            logger.warning(
+                'Carrito %s: la línea %s pedía %s y se recorta al stock disponible (%s)',
+                user_id, _line_key(*line), quantity, available,
+            )
+            quantity = max(available, current)
+        if item:
+            item.quantity = quantity
+            item.updated_at = now
+            (to_update if item.quantity > 0 else to_delete).append(item)
+        elif quantity > 0:
+            to_create.append(CartItem(cart=cart, product_id=line[0], variant_id=line[1], quantity=quantity))
+
+    CartItem.objects.bulk_update(to_update, ['quantity', 'updated_at'])
+    CartItem.objects.filter(pk__in=[item.pk for item in to_delete]).delete()
+    CartItem.objects.bulk_create(to_create)
+    # Las operaciones masivas no emiten señales
+    Cart.bump_version(cart.pk)
+    return len(deltas)
+
+
+class RedisCartStore:
+    """Operaciones atómicas sobre los carritos activos en Redis."""
+
+    def __init__(self, connection=None):
+        if connection is None:
+            from django_redis import get_redis_connection
+            connection = get_redis_connection('default')
+        self.conn = connection
+
+    def add(self, user_id, product_id, variant_id=None, quantity=1):
+        """
+        Suma `quantity` a la línea del carrito. Retorna la cantidad de la
+        línea que aún no está en la base de datos (pendiente más la que se
+        está escribiendo) y si el carrito acaba de quedar pendiente de escritura.
+        """
+        line = _line_key(product_id, variant_id)
+        pipe = self.conn.pipeline()
+        pipe.hincrby(PENDING_KEY.format(user_id=user_id), line, quantity)
+        pipe.hget(FLUSHING_KEY.format(user_id=user_id), line)
+        pipe.sadd(DIRTY_KEY, user_id)
+        pending, flushing, newly_dirty = pipe.execute()
+        return pending + int(flushing or 0), bool(newly_dirty)
+
+    def pending(self, user_id, product_id, variant_id=None):
+        """Cantidad de la línea que aún no está en la base de datos."""
+        line = _line_key(product_id, variant_id)
+        pipe = self.conn.pipeline()
+        pipe.hget(PENDING_KEY.format(user_id=user_id), line)
+        pipe.hget(FLUSHING_KEY.format(user_id=user_id), line)
+        return sum(int(value or 0) for value in pipe.execute())
+
+    def discard(self, user_id):
+        """Descarta los cambios pendientes (p. ej. al vaciar el carrito)."""
+        pipe = self.conn.pipeline()
+        pipe.delete(PENDING_KEY.format(user_id=user_id), FLUSHING_KEY.format(user_id=user_id))
+        pipe.srem(DIRTY_KEY, user_id)
+        pipe.execute()
+
+    def flush(self, user_id, wait=0):
+        """
+        Escribe en la base de datos los cambios pendientes de un usuario. Lo
+        que llegue mientras tanto queda para la siguiente escritura, y dos
+        escrituras simultáneas del mismo carrito no se pisan. Si otra escritura
+        tiene el carrito, espera hasta `wait` segundos a que termine; si no
+        alcanza, retorna None sin escribir.
+        """
+        pending_key = PENDING_KEY.format(user_id=user_id)
+        flushing_key = FLUSHING_KEY.format(user_id=user_id)
+        lock_key = LOCK_KEY.format(user_id=user_id)
+        if not self.conn.exists(pending_key, flushing_key):
+            self.conn.srem(DIRTY_KEY, user_id)
+            return 0
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        while not self.conn.set(lock_key, token, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return None  # Otra escritura de este carrito está en curso
+            time.sleep(FLUSH_LOCK_POLL)
+
+        try:
+            applied = 0
+            # Lote de una escritura anterior que no terminó
+            if self.conn.exists(flushing_key):
+                applied += self._apply_batch(user_id, flushing_key)
+            if self._take_pending(pending_key, flushing_key, token):
+                applied += self._apply_batch(user_id, flushing_key)
+
+            pipe = self.conn.pipeline()
+            pipe.srem(DIRTY_KEY, user_id)
+            pipe.exists(pending_key)
+            removed, still_pending = pipe.execute()
+            if still_pending:
+                self.conn.sadd(DIRTY_KEY, user_id)
+            return applied
+        finally:
+            self._release(lock_key, token)
+
+    def _take_pending(self, pending_key, flushing_key, token):
+        """
+        Mueve los pendientes al lote en escritura con su token y expiración,
+        en una sola transacción (MULTI/EXEC). Retorna False si no había.
+        """
+        with self.conn.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(pending_key)
+                    if not pipe.exists(pending_key):
+                        return False
+                    pipe.multi()
+                    pipe.rename(pending_key, flushing_key)
+                    pipe.hset(flushing_key, TOKEN_FIELD, token)
+                    pipe.expire(flushing_key, FLUSHING_TTL)
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue  # Llegó un cambio (o se descartó el carrito): volver a mirar
+
+    def _apply_batch(self, user_id, flushing_key):
+        raw = self.conn.hgetall(flushing_key)
+        token = raw.pop(TOKEN_FIELD, b'').decode()
+        deltas = {_parse_line_key(key): int(value) for key, value in raw.items()}
+        try:
+            applied = apply_cart_deltas(user_id, deltas, token)
+        except Exception:
+            # La transacción no se confirmó: devolver los cambios para reintentar
+            pipe = self.conn.pipeline()
+            for key, value in raw.items():
+                pipe.hincrby(PENDING_KEY.format(user_id=user_id), key, int(value))
+            pipe.sadd(DIRTY_KEY, user_id)
+            pipe.delete(flushing_key)
+            pipe.execute()
+            raise
+        self.conn.delete(flushing_key)
+        return applied
+
+    def _release(self, lock_key, token):
+        """Libera el candado solo si sigue siendo de esta escritura."""
+        with self.conn.pipeline() as pipe:
+            try:
+                pipe.watch(lock_key)
+                if pipe.get(lock_key) == token.encode():
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+            except WatchError:
+                pass
+
+    def flush_dirty(self, batch_size=500):
+        """Escribe los carritos pendientes; retorna cuántos se procesaron."""
+        user_ids = self.conn.srandmember(DIRTY_KEY, batch_size)
+        for user_id in user_ids:
+            try:
+                self.flush(int(user_id))
+            except Exception:
+                logger.exception('No se pudo escribir el carrito pendiente del usuario %s', user_id)
+        return len(user_ids)
+
+
+def get_cart_store():
+    """Retorna el almacén en Redis si CART_BACKEND = 'redis'; si no, None."""
+    if getattr(settings, 'CART_BACKEND', 'database') != 'redis':
+        return None
+    return RedisCartStore()
+
+
+def schedule_flush(user_id):
+    """Programa la escritura diferida; sin broker se escribe en el momento."""
+    from kombu.exceptions import OperationalError
+    from .tasks import flush_cart
+
+    try:
+        flush_cart.apply_async((user_id,), countdown=settings.CART_WRITE_BEHIND_DELAY)
+    except OperationalError as e:
+        logger.warning('No se pudo programar la escritura del carrito %s: %s', user_id, e)
+        RedisCartStore().flush(user_id)
+
+
+def flush_pending_cart(user):
+    """
+    Escribe los cambios pendientes del usuario antes de leer o editar su
+    carrito. Si otra escritura lo tiene tomado, espera a que termine (hasta
+    FLUSH_LOCK_WAIT segundos; después responde 503 en lugar de servir un
+    carrito incompleto). Sin Redis se sigue con lo que ya está en la base de datos.
+    """
+    store = get_cart_store()
+    if store is None:
+        return
+    try:
+        flushed = store.flush(user.pk, wait=FLUSH_LOCK_WAIT)
+    except RedisError as e:
+        logger.warning('No se pudieron leer los cambios pendientes del carrito %s: %s', user.pk, e)
+        return
+    if flushed is None:
+        raise CartBusy()
+
+
+def discard_pending_cart(user):
+    store = get_cart_store()
+    if store is None:
+        return
+    try:
+        store.discard(user.pk)
+    except RedisError as e:
+        logger.warning('No se pudieron descartar los cambios pendientes del carrito %s: %s', user.pk, e)
@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from .store import RedisCartStore
+
+
+@shared_task(ignore_result=True)
+def flush_cart(user_id):
+    """Escritura diferida de los cambios pendientes de un carrito."""
+    return RedisCartStore().flush(user_id)
+
+
+@shared_task(ignore_result=True)
+def flush_pending_carts(batch_size=500):
+    """Barrido periódico de los carritos con cambios pendientes."""
+    return RedisCartStore().flush_dirty(batch_size)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     # Carrito
     path('', views.CartView.as_view(), name='cart'),
+    path('summary/', views.CartSummaryView.as_view(), name='cart-summary'),
     path('items/', views.CartItemListView.as_view(), name='cart-item-list'),
     path('items/<int:pk>/', views.CartItemDetailView.as_view(), name='cart-item-detail'),
     path('clear/', views.ClearCartView.as_view(), name='clear-cart'),
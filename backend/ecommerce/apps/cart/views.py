@@ -3,13 +3,80 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
+from django.utils import timezone
+from redis.exceptions import RedisError
 from .models import Cart, CartItem, Wishlist, WishlistItem
-from .serializers import CartSerializer, CartItemSerializer, WishlistSerializer, WishlistItemSerializer
+from .serializers import (
+    CartSerializer, CartSummarySerializer, CartItemSerializer, WishlistSerializer,
+    WishlistItemSerializer, parse_expand
+)
+from .store import get_cart_store, schedule_flush, flush_pending_cart, discard_pending_cart
 from ecommerce.apps.products.models import Product, ProductVariant
 from ecommerce.apps.users.permissions import IsCustomerOrReadOnly
 
 
-class CartView(generics.RetrieveAPIView):
+def add_to_pending_cart(request, product, variant=None, quantity=1):
+    """
+    Agrega la línea (ya validada) al carrito en Redis si CART_BACKEND =
+    'redis' y responde igual que la escritura en la base de datos: 201 con
+    el item y la cantidad que tendrá al escribirse (`id` es null mientras la
+    línea no exista en la base de datos), o 400 si la variante no es del
+    producto o la cantidad total supera el stock. Retorna None para seguir por
+    la base de datos (backend por defecto, cantidad no válida o Redis no disponible).
+    """
+    store = get_cart_store()
+    if store is None:
+        return None
+    try:
+        quantity = int(quantity)
+    except (TypeError, ValueError):
+        return None
+    if quantity < 1:
+        return None
+    if variant is not None and variant.product_id != product.pk:
+        return Response({'error': 'La variante debe pertenecer al producto seleccionado.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    variant_id = variant.pk if variant else None
+    item = CartItem.objects.filter(cart__user=request.user, product=product, variant=variant).first()
+    available = CartItem.available_quantity(product, variant)
+    try:
+        if available is not None:
+            in_cart = (item.quantity if item else 0) + store.pending(request.user.pk, product.pk, variant_id)
+            if in_cart + quantity > available:
+                return Response({'error': 'No hay suficiente stock disponible.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        pending, newly_dirty = store.add(request.user.pk, product.pk, variant_id, quantity)
+    except RedisError:
+        return None
+    if newly_dirty:
+        schedule_flush(request.user.pk)
+    
+    if item is None:
+        now = timezone.now()
+        item = CartItem(quantity=0, created_at=now, updated_at=now)
+    item.product = product
+    item.variant = variant
+    item.quantity += pending
+    serializer = CartItemSerializer(item, context={'expand': parse_expand(request)})
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class CartExpandMixin:
+    """
+    Agrega al contexto del serializer las relaciones pedidas con ?expand=.
+    """
+    def get_expand(self):
+        return parse_expand(self.request)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+
+class CartView(CartExpandMixin, generics.RetrieveAPIView):
     """
     Vista para obtener el carrito del usuario.
     """
@@ -17,11 +84,27 @@ class CartView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
+        flush_pending_cart(self.request.user)
+        cart, created = Cart.objects.prefetch_related(
+            Prefetch('items', queryset=CartItem.with_details(self.get_expand()))
+        ).get_or_create(user=self.request.user)
+        return cart
+
+
+class CartSummaryView(generics.RetrieveAPIView):
+    """
+    Vista con los totales del carrito (cacheados por versión), sin cargar items.
+    """
+    serializer_class = CartSummarySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        flush_pending_cart(self.request.user)
         cart, created = Cart.objects.get_or_create(user=self.request.user)
         return cart
 
 
-class CartItemListView(generics.ListCreateAPIView):
+class CartItemListView(CartExpandMixin, generics.ListCreateAPIView):
     """
     Vista para listar y crear items del carrito.
     """
@@ -30,14 +113,29 @@ class CartItemListView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         cart, created = Cart.objects.get_or_create(user=self.request.user)
-        return CartItem.objects.filter(cart=cart).select_related('product', 'variant')
+        return CartItem.with_details(self.get_expand()).filter(cart=cart)
+    
+    def list(self, request, *args, **kwargs):
+        flush_pending_cart(request.user)
+        return super().list(request, *args, **kwargs)
+    
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        line = serializer.validated_data
+        pending_response = add_to_pending_cart(request, line['product'], line.get('variant'), line.get('quantity', 1))
+        if pending_response is not None:
+            return pending_response
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
     
     def perform_create(self, serializer):
         cart, created = Cart.objects.get_or_create(user=self.request.user)
         serializer.save(cart=cart)
 
 
-class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CartItemDetailView(CartExpandMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vista para obtener, actualizar y eliminar un item específico del carrito.
     """
@@ -45,8 +143,9 @@ class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsCustomerOrReadOnly]
     
     def get_queryset(self):
+        flush_pending_cart(self.request.user)
         cart, created = Cart.objects.get_or_create(user=self.request.user)
-        return CartItem.objects.filter(cart=cart).select_related('product', 'variant')
+        return CartItem.with_details(self.get_expand()).filter(cart=cart)
 
 
 class ClearCartView(APIView):
@@ -56,6 +155,7 @@ class ClearCartView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsCustomerOrReadOnly]
     
     def delete(self, request):
+        discard_pending_cart(request.user)
         cart, created = Cart.objects.get_or_create(user=request.user)
         cart.items.all().delete()
         return Response({'message': 'Carrito vaciado exitosamente'})
@@ -69,7 +169,9 @@ class WishlistView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        wishlist, created = Wishlist.objects.get_or_create(user=self.request.user)
+        wishlist, created = Wishlist.objects.prefetch_related(
+            Prefetch('items', queryset=WishlistItem.with_details())
+        ).get_or_create(user=self.request.user)
         return wishlist
 
 
@@ -82,7 +184,7 @@ class WishlistItemListView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         wishlist, created = Wishlist.objects.get_or_create(user=self.request.user)
-        return WishlistItem.objects.filter(wishlist=wishlist).select_related('product')
+        return WishlistItem.with_details().filter(wishlist=wishlist)
     
     def perform_create(self, serializer):
         wishlist, created = Wishlist.objects.get_or_create(user=self.request.user)
@@ -98,7 +200,7 @@ class WishlistItemDetailView(generics.RetrieveDestroyAPIView):
     
     def get_queryset(self):
         wishlist, created = Wishlist.objects.get_or_create(user=self.request.user)
-        return WishlistItem.objects.filter(wishlist=wishlist).select_related('product')
+        return WishlistItem.with_details().filter(wishlist=wishlist)
 
 
 @api_view(['POST'])
@@ -127,6 +229,10 @@ def add_to_cart(request):
         except ProductVariant.DoesNotExist:
             return Response({'error': 'Variante no encontrada'}, status=status.HTTP_404_NOT_FOUND)
     
+    pending_response = add_to_pending_cart(request, product, variant, quantity)
+    if pending_response is not None:
+        return pending_response
+    
     # Obtener o crear carrito
     cart, created = Cart.objects.get_or_create(user=request.user)
     
@@ -140,7 +246,7 @@ def add_to_cart(request):
     if existing_item:
         existing_item.quantity += quantity
         existing_item.save()
-        serializer = CartItemSerializer(existing_item)
+        serializer = CartItemSerializer(existing_item, context={'expand': parse_expand(request)})
     else:
         # Crear nuevo item
         cart_item = CartItem.objects.create(
@@ -149,7 +255,7 @@ def add_to_cart(request):
             variant=variant,
             quantity=quantity
         )
-        serializer = CartItemSerializer(cart_item)
+        serializer = CartItemSerializer(cart_item, context={'expand': parse_expand(request)})
     
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -206,6 +312,8 @@ def move_to_cart(request, item_id):
     except WishlistItem.DoesNotExist:
         return Response({'error': 'Item no encontrado'}, status=status.HTTP_404_NOT_FOUND)
     
+    flush_pending_cart(request.user)
+    
     # Obtener o crear carrito
     cart, created = Cart.objects.get_or_create(user=request.user)
     
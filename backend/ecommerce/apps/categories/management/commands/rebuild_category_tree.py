@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from ecommerce.apps.categories.models import Category
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la ruta materializada y la profundidad de todas las categorías'
+
+    def handle(self, *args, **options):
+        total = Category.rebuild_tree()
+        self.stdout.write(
+            self.style.SUCCESS(f'Árbol recalculado para {total} categorías')
+        )
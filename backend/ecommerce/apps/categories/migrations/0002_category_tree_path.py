@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:39
+
+from django.db import migrations, models
+
+
+def backfill_tree_paths(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    parents = dict(Category.objects.values_list('pk', 'parent_id'))
+    paths = {}
+
+    def build_path(pk):
+        if pk not in paths:
+            parent_id = parents[pk]
+            paths[pk] = f'{build_path(parent_id) if parent_id else ""}{pk}/'
+        return paths[pk]
+
+    for pk in parents:
+        path = build_path(pk)
+        Category.objects.filter(pk=pk).update(path=path, depth=path.count('/') - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='depth'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='tree path'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='categories_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(backfill_tree_paths, migrations.RunPython.noop),
+    ]
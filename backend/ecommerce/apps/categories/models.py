@@ -1,6 +1,9 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
+from django.core.exceptions import ValidationError
+from django.db.models import F, Value, Subquery
+from django.db.models.functions import Concat, Substr
 
 
 class Category(models.Model):
@@ -23,6 +26,10 @@ class Category(models.Model):
         verbose_name=_('parent category')
     )
     
+    # Ruta materializada ("1/4/9/") y profundidad, mantenidas en save()
+    path = models.CharField(_('tree path'), max_length=255, blank=True, editable=False)
+    depth = models.PositiveIntegerField(_('depth'), default=0, editable=False)
+    
     # Configuración
     is_active = models.BooleanField(_('is active'), default=True)
     sort_order = models.PositiveIntegerField(_('sort order'), default=0)
@@ -40,35 +47,119 @@ class Category(models.Model):
         verbose_name_plural = _('Categories')
         db_table = 'categories'
         ordering = ['sort_order', 'name']
+        indexes = [
+            models.Index(fields=['path'], name='categories_path_idx', opclasses=['varchar_pattern_ops']),
+        ]
     
     def __str__(self):
         return self.name
     
+    def is_ancestor_of(self, category):
+        """Si `category` es esta categoría o una de sus descendientes."""
+        if not self.pk or category is None:
+            return False
+        return category.pk == self.pk or bool(self.path and category.path.startswith(self.path))
+    
+    def clean(self):
+        super().clean()
+        if self.parent_id and self.is_ancestor_of(self.parent):
+            raise ValidationError({'parent': _('Una categoría no puede moverse dentro de sí misma ni de sus descendientes.')})
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        
+        # Leer de la base de datos la ruta actual y la del padre para detectar movimientos
+        old_path = ''
+        if self.pk:
+            old_path = Category.objects.filter(pk=self.pk).values_list('path', flat=True).first() or ''
+        parent_path = ''
+        if self.parent_id:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list('path', flat=True).get()
+            # Última barrera: las vistas y el admin validan el padre antes de guardar
+            if old_path and parent_path.startswith(old_path):
+                raise ValidationError(_('Una categoría no puede moverse dentro de sí misma ni de sus descendientes.'))
+        
         super().save(*args, **kwargs)
+        self._move_to(parent_path, old_path)
+    
+    def _move_to(self, parent_path, old_path):
+        """
+        Actualiza la ruta de la categoría y, si cambió de padre, la de todo su
+        subárbol con una sola sentencia UPDATE.
+        """
+        new_path = f'{parent_path}{self.pk}/'
+        if new_path == old_path:
+            return
+        new_depth = new_path.count('/') - 1
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+        
+        if old_path:
+            old_depth = old_path.count('/') - 1
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (new_depth - old_depth)
+            )
+        self.path = new_path
+        self.depth = new_depth
+    
+    @classmethod
+    def rebuild_tree(cls):
+        """
+        Recalcula path y depth de todas las categorías a partir de parent.
+        """
+        parents = dict(cls.objects.values_list('pk', 'parent_id'))
+        paths = {}
+        
+        def build_path(pk):
+            if pk not in paths:
+                parent_id = parents[pk]
+                paths[pk] = f'{build_path(parent_id) if parent_id else ""}{pk}/'
+            return paths[pk]
+        
+        categories = [
+            cls(pk=pk, path=build_path(pk), depth=build_path(pk).count('/') - 1)
+            for pk in parents
+        ]
+        cls.objects.bulk_update(categories, ['path', 'depth'], batch_size=500)
+        return len(categories)
+    
+    @classmethod
+    def get_subtree_ids(cls, **lookup):
+        """
+        Ids de la categoría activa que cumple `lookup` y de todas sus
+        subcategorías activas, resueltos en una sola consulta.
+        """
+        root_path = cls.objects.filter(is_active=True, **lookup).values('path')[:1]
+        return list(
+            cls.objects.filter(path__startswith=Subquery(root_path), is_active=True).values_list('pk', flat=True)
+        )
+    
+    @property
+    def ancestor_ids(self):
+        """Ids de los ancestros, desde la raíz hasta el padre."""
+        return [int(pk) for pk in self.path.split('/')[:-2]]
     
     @property
     def full_path(self):
         """
         Retorna la ruta completa de la categoría incluyendo padres.
         """
-        if self.parent:
-            return f"{self.parent.full_path} > {self.name}"
-        return self.name
+        names = [ancestor.name for ancestor in self.get_ancestors()]
+        return ' > '.join(names + [self.name])
     
     @property
     def level(self):
         """
         Retorna el nivel de profundidad de la categoría.
         """
-        level = 0
-        parent = self.parent
-        while parent:
-            level += 1
-            parent = parent.parent
-        return level
+        return self.depth
+    
+    def get_ancestors(self):
+        """
+        Retorna los ancestros ordenados desde la raíz.
+        """
+        return Category.objects.filter(pk__in=self.ancestor_ids).order_by('depth')
     
     def get_children(self):
         """
@@ -78,13 +169,24 @@ class Category(models.Model):
     
     def get_descendants(self):
         """
-        Retorna todas las categorías descendientes.
+        Retorna todas las categorías descendientes activas.
+        """
+        if not self.path:
+            return Category.objects.none()
+        return Category.objects.filter(
+            path__startswith=self.path, is_active=True
+        ).exclude(pk=self.pk).order_by('path')
+    
+    def get_descendant_ids(self, include_self=True):
+        """
+        Retorna los ids del subárbol en una sola consulta.
         """
-        descendants = []
-        for child in self.get_children():
-            descendants.append(child)
-            descendants.extend(child.get_descendants())
-        return descendants
+        if not self.path:
+            return [self.pk] if include_self else []
+        ids = Category.objects.filter(path__startswith=self.path).values_list('pk', flat=True)
+        if not include_self:
+            ids = ids.exclude(pk=self.pk)
+        return list(ids)
 
 
 class Brand(models.Model):
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Category, Brand, Size, Color
+from .tree import CategoryTree
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -7,8 +8,8 @@ class CategorySerializer(serializers.ModelSerializer):
     Serializer para categorías.
     """
     children = serializers.SerializerMethodField()
-    parent_name = serializers.StringRelatedField(source='parent', read_only=True)
-    full_path = serializers.ReadOnlyField()
+    parent_name = serializers.SerializerMethodField()
+    full_path = serializers.SerializerMethodField()
     level = serializers.ReadOnlyField()
     
     class Meta:
@@ -17,16 +18,39 @@ class CategorySerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'description', 'image', 'icon',
             'parent', 'parent_name', 'is_active', 'sort_order',
             'meta_title', 'meta_description', 'created_at', 'updated_at',
-            'children', 'full_path', 'level'
+            'children', 'full_path', 'level', 'path', 'depth'
         ]
-        read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'slug', 'created_at', 'updated_at', 'path', 'depth']
+    
+    def validate_parent(self, parent):
+        """
+        Impide mover una categoría dentro de sí misma o de sus descendientes.
+        """
+        if self.instance is not None and self.instance.is_ancestor_of(parent):
+            raise serializers.ValidationError('Una categoría no puede moverse dentro de sí misma ni de sus descendientes.')
+        return parent
+    
+    def get_tree(self):
+        """
+        Árbol en memoria compartido por todo el serializer (una sola consulta).
+        """
+        if 'category_tree' not in self.context:
+            self.context['category_tree'] = CategoryTree.load()
+        return self.context['category_tree']
     
     def get_children(self, obj):
         """
         Retorna las categorías hijas.
         """
-        children = obj.get_children()
+        children = self.get_tree().get_children(obj)
         return CategorySerializer(children, many=True, context=self.context).data
+    
+    def get_parent_name(self, obj):
+        parent = self.get_tree().get_parent(obj)
+        return str(parent) if parent else None
+    
+    def get_full_path(self, obj):
+        return self.get_tree().get_full_path(obj)
 
 
 class BrandSerializer(serializers.ModelSerializer):
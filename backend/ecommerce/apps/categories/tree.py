@@ -0,0 +1,55 @@
+"""
+Árbol de categorías en memoria construido con una sola consulta.
+"""
+
+from collections import defaultdict
+
+from .models import Category
+
+
+class CategoryTree:
+    """
+    Índice en memoria de las categorías para resolver hijos, padres y rutas
+    sin consultas adicionales por nodo.
+    """
+
+    def __init__(self, categories):
+        self.by_id = {category.pk: category for category in categories}
+        self.children = defaultdict(list)
+        for category in categories:
+            if category.is_active:
+                self.children[category.parent_id].append(category)
+
+    @classmethod
+    def load(cls):
+        return cls(list(Category.objects.order_by('sort_order', 'name')))
+
+    def get_children(self, category):
+        return self.children.get(category.pk, [])
+
+    def get_parent(self, category):
+        return self.by_id.get(category.parent_id)
+
+    def get_full_path(self, category):
+        names = [self.by_id[pk].name for pk in category.ancestor_ids if pk in self.by_id]
+        return ' > '.join(names + [category.name])
+
+    def to_nested(self, root=None):
+        """
+        Retorna el árbol (o el subárbol de root) como listas de diccionarios
+        anidados, listo para la navegación de la tienda.
+        """
+        nodes = self.get_children(root) if root else self.children.get(None, [])
+        return [self._node(category) for category in nodes]
+
+    def _node(self, category):
+        return {
+            'id': category.pk,
+            'name': category.name,
+            'slug': category.slug,
+            'icon': category.icon,
+            'image': category.image.url if category.image else None,
+            'depth': category.depth,
+            'path': category.path,
+            'children': [self._node(child) for child in self.get_children(category)],
+        }
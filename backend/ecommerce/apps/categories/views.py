@@ -5,16 +5,19 @@ from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 
+from ecommerce.cache import CatalogCacheMixin, cached_response
 from .models import Category, Brand, Size, Color
 from .serializers import (
     CategorySerializer, BrandSerializer, SizeSerializer, ColorSerializer
 )
+from .tree import CategoryTree
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar categorías.
     """
+    cache_namespace = 'categories'
     queryset = Category.objects.filter(is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -32,12 +35,32 @@ class CategoryViewSet(viewsets.ModelViewSet):
         if parent_id:
             queryset = queryset.filter(parent_id=parent_id)
         return queryset
+    
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        """
+        Árbol completo de categorías activas para la navegación de la tienda.
+        Acepta ?root=<id> para obtener solo un subárbol.
+        """
+        def build_tree():
+            tree = CategoryTree.load()
+            root = None
+            root_id = request.query_params.get('root')
+            if root_id:
+                root = tree.by_id.get(int(root_id)) if root_id.isdigit() else None
+                if root is None:
+                    return Response({'error': 'Categoría no encontrada'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(tree.to_nested(root))
+        
+        # El árbol no depende del usuario, así que se cachea para todos
+        return cached_response(request, self.cache_namespace, build_tree, anonymous_only=False)
 
 
-class BrandViewSet(viewsets.ModelViewSet):
+class BrandViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar marcas.
     """
+    cache_namespace = 'brands'
     queryset = Brand.objects.filter(is_active=True)
     serializer_class = BrandSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -47,10 +70,11 @@ class BrandViewSet(viewsets.ModelViewSet):
     ordering = ['name']
 
 
-class SizeViewSet(viewsets.ModelViewSet):
+class SizeViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar tallas.
     """
+    cache_namespace = 'sizes'
     queryset = Size.objects.filter(is_active=True)
     serializer_class = SizeSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -70,10 +94,11 @@ class SizeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ColorViewSet(viewsets.ModelViewSet):
+class ColorViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar colores.
     """
+    cache_namespace = 'colors'
     queryset = Color.objects.filter(is_active=True)
     serializer_class = ColorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
-from .models import Order, OrderItem, OrderNote
+from .inventory import commit_orders_holds
+from .models import Order, OrderItem, OrderNote, InventoryHold
 
 
 class OrderItemInline(admin.TabularInline):
@@ -112,18 +113,21 @@ class OrderAdmin(admin.ModelAdmin):
     
     def mark_as_processing(self, request, queryset):
         queryset.update(status='processing')
+        commit_orders_holds(queryset.values_list('pk', flat=True))
         self.message_user(request, f"{queryset.count()} órdenes marcadas como 'En proceso'.")
     mark_as_processing.short_description = _("Marcar como 'En proceso'")
     
     def mark_as_shipped(self, request, queryset):
         from django.utils import timezone
         queryset.update(status='shipped', shipped_at=timezone.now())
+        commit_orders_holds(queryset.values_list('pk', flat=True))
         self.message_user(request, f"{queryset.count()} órdenes marcadas como 'Enviado'.")
     mark_as_shipped.short_description = _("Marcar como 'Enviado'")
     
     def mark_as_delivered(self, request, queryset):
         from django.utils import timezone
         queryset.update(status='delivered', delivered_at=timezone.now())
+        commit_orders_holds(queryset.values_list('pk', flat=True))
         self.message_user(request, f"{queryset.count()} órdenes marcadas como 'Entregado'.")
     mark_as_delivered.short_description = _("Marcar como 'Entregado'")
 
@@ -155,6 +159,25 @@ class OrderItemAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('order', 'product', 'variant')
 
 
+@admin.register(InventoryHold)
+class InventoryHoldAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo InventoryHold. Las reservas
+    cambian de estado solo desde el flujo de pago para no descuadrar el stock.
+    """
+    list_display = ['order', 'product', 'variant', 'quantity', 'status', 'expires_at', 'created_at']
+    list_filter = ['status', 'expires_at', 'created_at']
+    search_fields = ['order__order_number', 'product__name', 'product__sku']
+    raw_id_fields = ['order', 'product', 'variant']
+    readonly_fields = ['order', 'product', 'variant', 'quantity', 'status', 'expires_at', 'created_at', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('order', 'product', 'variant')
+
+
 @admin.register(OrderNote)
 class OrderNoteAdmin(admin.ModelAdmin):
     """
@@ -0,0 +1,201 @@
+"""
+Reservas de inventario para el checkout.
+
+Al crear un pedido se descuenta el stock de cada línea y se registra una
+reserva (InventoryHold) con vencimiento. El descuento es un UPDATE
+condicional (`inventory_quantity >= cantidad`) con F(), de modo que dos
+checkouts simultáneos no pueden vender la misma unidad y no hace falta leer
+ni bloquear la fila antes. Los descuentos y las reservas van en la misma
+transacción que crea el pedido y sus items: si una línea no alcanza, se
+revierte todo junto y no queda un pedido sin reservas ni stock descontado
+sin pedido. El bloqueo de cada fila de stock dura hasta el commit de esa
+transacción, que solo inserta el pedido, sus items y las reservas.
+
+- Pago completado, o pedido confirmado o en curso (procesando, enviado,
+  entregado): las reservas pasan a `committed` (el stock ya salió). Cada
+  camino que liquida un pedido o un pago (señal del Payment, acciones del
+  ViewSet y acciones masivas del admin) llama a `commit_order_holds`.
+- Pago fallido o cancelado, o pedido cancelado: las reservas se liberan y
+  el stock se devuelve.
+- Reservas vencidas: las libera la tarea periódica `release_expired_holds`.
+
+Cada cambio de estado es también un UPDATE condicional sobre la reserva, así
+que una reserva se libera o se confirma una sola vez aunque el pago y el
+barrido lleguen a la vez.
+
+Como los UPDATE con F() no emiten señales, cada cambio de stock invalida la
+caché del catálogo al confirmarse la transacción.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ecommerce.apps.products.models import Product, ProductVariant
+from ecommerce.cache import invalidate_catalog_cache
+from .models import InventoryHold
+
+logger = logging.getLogger(__name__)
+
+
+class InsufficientStock(Exception):
+    """No hay stock suficiente para reservar una línea del pedido."""
+
+    def __init__(self, product_id, variant_id=None):
+        self.product_id = product_id
+        self.variant_id = variant_id
+        super().__init__(
+            f'No hay suficiente stock disponible del producto {product_id}'
+            + (f' (variante {variant_id})' if variant_id else '')
+        )
+
+
+def _stock_queryset(product_id, variant_id):
+    if variant_id:
+        return ProductVariant.objects.filter(pk=variant_id, product_id=product_id)
+    return Product.objects.filter(pk=product_id)
+
+
+def take_stock(product_id, variant_id, quantity):
+    """Descuenta stock solo si alcanza; retorna si se pudo descontar."""
+    taken = _stock_queryset(product_id, variant_id).filter(
+        inventory_quantity__gte=quantity
+    ).update(inventory_quantity=F('inventory_quantity') - quantity) == 1
+    if taken:
+        # update() no emite señales: invalidar aquí las respuestas del catálogo
+        invalidate_catalog_cache('products')
+    return taken
+
+
+def restore_stock(product_id, variant_id, quantity):
+    if _stock_queryset(product_id, variant_id).update(inventory_quantity=F('inventory_quantity') + quantity):
+        invalidate_catalog_cache('products')
+
+
+def tracked_lines(lines, products=None):
+    """
+    Agrupa las líneas (producto, variante, cantidad) y descarta los productos
+    que no controlan inventario o admiten pedidos sin stock. `products`
+    ({id: Product}) evita la consulta si los productos ya están cargados.
+    """
+    quantities = {}
+    for product_id, variant_id, quantity in lines:
+        key = (product_id, variant_id or None)
+        quantities[key] = quantities.get(key, 0) + quantity
+    if products is not None:
+        tracked = {
+            pk for pk, product in products.items()
+            if product.track_inventory and not product.allow_backorder
+        }
+    else:
+        tracked = set(
+            Product.objects.filter(
+                pk__in={product_id for product_id, _ in quantities},
+                track_inventory=True,
+                allow_backorder=False,
+            ).values_list('pk', flat=True)
+        )
+    # Orden fijo para que los checkouts concurrentes tomen las filas en el mismo orden
+    return sorted(
+        (product_id, variant_id, quantity)
+        for (product_id, variant_id), quantity in quantities.items()
+        if product_id in tracked
+    )
+
+
+def reserve_order_stock(order, lines, minutes=None, products=None):
+    """
+    Reserva el stock de las líneas (producto, variante, cantidad) del pedido.
+    Debe llamarse dentro de la transacción que crea el pedido: si alguna línea
+    no alcanza lanza InsufficientStock y esa transacción revierte los
+    descuentos ya hechos junto con el pedido.
+    """
+    minutes = settings.INVENTORY_HOLD_MINUTES if minutes is None else minutes
+    expires_at = timezone.now() + timedelta(minutes=minutes)
+    holds = []
+    for product_id, variant_id, quantity in tracked_lines(lines, products):
+        if not take_stock(product_id, variant_id, quantity):
+            raise InsufficientStock(product_id, variant_id)
+        holds.append(InventoryHold(
+            order=order,
+            product_id=product_id,
+            variant_id=variant_id,
+            quantity=quantity,
+            expires_at=expires_at,
+        ))
+    return InventoryHold.objects.bulk_create(holds)
+
+
+def release_holds(holds, statuses=('held',)):
+    """
+    Libera las reservas que sigan en alguno de `statuses` y devuelve su
+    stock. Retorna cuántas se liberaron.
+    """
+    released = 0
+    for hold in holds:
+        with transaction.atomic():
+            changed = InventoryHold.objects.filter(pk=hold.pk, status__in=statuses).update(
+                status='released', updated_at=timezone.now()
+            )
+            if changed:
+                restore_stock(hold.product_id, hold.variant_id, hold.quantity)
+                released += 1
+    return released
+
+
+def release_order_holds(order_id, statuses=('held',)):
+    """Libera las reservas de un pedido (pago fallido o pedido cancelado)."""
+    holds = InventoryHold.objects.filter(order_id=order_id, status__in=statuses).only(
+        'product_id', 'variant_id', 'quantity'
+    )
+    return release_holds(list(holds), statuses)
+
+
+def commit_order_holds(order_id):
+    """
+    Confirma las reservas de un pedido pagado. Las que ya se habían liberado
+    (por vencimiento o por un intento de pago fallido) se vuelven a tomar si
+    queda stock; si no, se registra el faltante.
+    """
+    now = timezone.now()
+    committed = InventoryHold.objects.filter(order_id=order_id, status='held').update(
+        status='committed', updated_at=now
+    )
+    for hold in InventoryHold.objects.filter(order_id=order_id, status='released'):
+        with transaction.atomic():
+            changed = InventoryHold.objects.filter(pk=hold.pk, status='released').update(
+                status='committed', updated_at=now
+            )
+            if not changed:
+                continue
+            if not take_stock(hold.product_id, hold.variant_id, hold.quantity):
+                transaction.set_rollback(True)
+                logger.warning(
+                    'Pedido %s pagado sin stock para el producto %s (variante %s) x%s',
+                    order_id, hold.product_id, hold.variant_id, hold.quantity,
+                )
+                continue
+            committed += 1
+    return committed
+
+
+def commit_orders_holds(order_ids):
+    """Confirma las reservas de varios pedidos (acciones masivas del admin)."""
+    return sum(commit_order_holds(order_id) for order_id in set(order_ids))
+
+
+def release_orders_holds(order_ids, statuses=('held',)):
+    """Libera las reservas de varios pedidos (acciones masivas del admin)."""
+    return sum(release_order_holds(order_id, statuses) for order_id in set(order_ids))
+
+
+def release_expired_holds(batch_size=500):
+    """Libera un lote de reservas vencidas; retorna cuántas se liberaron."""
+    holds = InventoryHold.objects.filter(status='held', expires_at__lte=timezone.now()).order_by(
+        'expires_at'
+    ).only('product_id', 'variant_id', 'quantity')[:batch_size]
+    return release_holds(list(holds))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from ecommerce.apps.orders.inventory import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Libera las reservas de inventario vencidas y devuelve su stock'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Número de reservas a liberar por lote'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+        while True:
+            released = release_expired_holds(batch_size)
+            total += released
+            if released < batch_size:
+                break
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} reservas de inventario liberadas')
+        )
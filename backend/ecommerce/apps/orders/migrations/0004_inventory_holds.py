@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:55
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_listing_keyset_indexes'),
+        ('orders', '0003_listing_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='quantity')),
+                ('status', models.CharField(choices=[('held', 'Held'), ('committed', 'Committed'), ('released', 'Released')], default='held', max_length=20, verbose_name='status')),
+                ('expires_at', models.DateTimeField(verbose_name='expires at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_holds', to='orders.order', verbose_name='order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_holds', to='products.product', verbose_name='product')),
+                ('variant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='inventory_holds', to='products.productvariant', verbose_name='variant')),
+            ],
+            options={
+                'verbose_name': 'Inventory Hold',
+                'verbose_name_plural': 'Inventory Holds',
+                'db_table': 'inventory_holds',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='inventory_h_status_882892_idx'), models.Index(fields=['order', 'status'], name='inventory_h_order_i_f9d62e_idx')],
+            },
+        ),
+    ]
@@ -3,6 +3,9 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 import uuid
+from functools import partial
+
+from ecommerce.identifiers import generate_identifier, save_with_identifier
 
 
 class Order(models.Model):
@@ -94,15 +97,15 @@ class Order(models.Model):
             models.Index(fields=['status', 'payment_status']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['order_number']),
+            # Orden del listado (-created_at, -id) para la paginación por keyset
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id']),
         ]
     
     def __str__(self):
         return f"Order #{self.order_number} - {self.user.full_name}"
     
     def save(self, *args, **kwargs):
-        if not self.order_number:
-            self.order_number = self.generate_order_number()
-        
         # Si no hay dirección de facturación, usar la de envío
         if not self.billing_first_name:
             self.billing_first_name = self.shipping_first_name
@@ -113,18 +116,12 @@ class Order(models.Model):
             self.billing_country = self.shipping_country
             self.billing_postal_code = self.shipping_postal_code
         
-        super().save(*args, **kwargs)
+        save_with_identifier(self, 'order_number', self.generate_order_number, partial(super().save, *args, **kwargs))
     
     def generate_order_number(self):
-        """Genera un número de pedido único."""
-        import random
-        import string
-        from django.utils import timezone
-        
-        # Formato: YYYYMMDD-XXXXXX
-        date_str = timezone.now().strftime('%Y%m%d')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        return f"{date_str}-{random_str}"
+        """Genera un número de pedido único y ordenado en el tiempo."""
+        # Formato: YYYYMMDD-XXXXXXXXXX
+        return generate_identifier()
     
     @property
     def is_paid(self):
@@ -185,7 +182,15 @@ class OrderItem(models.Model):
         return f"{self.product_name} x{self.quantity} - {self.order.order_number}"
     
     def save(self, *args, **kwargs):
-        # Guardar información del producto al momento de la compra
+        self.fill_snapshot()
+        super().save(*args, **kwargs)
+    
+    def fill_snapshot(self):
+        """
+        Guarda la información del producto al momento de la compra y calcula
+        el total. Usa el producto y la variante ya cargados (bulk_create no
+        llama a save()).
+        """
         if not self.product_name:
             self.product_name = self.product.name
         if not self.product_sku:
@@ -200,8 +205,60 @@ class OrderItem(models.Model):
         
         # Calcular precio total
         self.total_price = self.unit_price * self.quantity
-        
-        super().save(*args, **kwargs)
+
+
+class InventoryHold(models.Model):
+    """
+    Reserva temporal de inventario de una línea del pedido. El stock se
+    descuenta al crear la reserva; el pago la confirma y un pago fallido, la
+    cancelación del pedido o su vencimiento la liberan y devuelven el stock.
+    """
+    HOLD_STATUS = [
+        ('held', _('Held')),
+        ('committed', _('Committed')),
+        ('released', _('Released')),
+    ]
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='inventory_holds',
+        verbose_name=_('order')
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='inventory_holds',
+        verbose_name=_('product')
+    )
+    variant = models.ForeignKey(
+        'products.ProductVariant',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='inventory_holds',
+        verbose_name=_('variant')
+    )
+    quantity = models.PositiveIntegerField(_('quantity'), validators=[MinValueValidator(1)])
+    status = models.CharField(_('status'), max_length=20, choices=HOLD_STATUS, default='held')
+    expires_at = models.DateTimeField(_('expires at'))
+
+    # Timestamps
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+
+    class Meta:
+        verbose_name = _('Inventory Hold')
+        verbose_name_plural = _('Inventory Holds')
+        db_table = 'inventory_holds'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['order', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.order.order_number} - {self.product_id}:{self.variant_id or 0} x{self.quantity} ({self.status})"
 
 
 class OrderStatusHistory(models.Model):
@@ -1,5 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
+from .inventory import InsufficientStock, reserve_order_stock
 from .models import Order, OrderItem
+from ecommerce.apps.products.models import Product, ProductVariant
 from ecommerce.apps.products.serializers import ProductListSerializer
 
 
@@ -9,12 +12,13 @@ class OrderItemSerializer(serializers.ModelSerializer):
     """
     product = ProductListSerializer(read_only=True)
     product_id = serializers.IntegerField(write_only=True)
-    price = serializers.DecimalField(max_digits=10, decimal_places=2, write_only=True)
+    variant_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, write_only=True, required=False)
     
     class Meta:
         model = OrderItem
         fields = [
-            'id', 'product', 'product_id', 'quantity', 'price', 
+            'id', 'product', 'product_id', 'variant_id', 'quantity', 'price', 
             'unit_price', 'total_price', 'product_name', 'product_sku', 'variant_info'
         ]
         read_only_fields = ['id', 'unit_price', 'total_price', 'product_name', 'product_sku', 'variant_info']
@@ -93,45 +97,101 @@ class OrderCreateSerializer(serializers.ModelSerializer):
     
 
     
+    def validate_items(self, items):
+        """
+        Carga de una vez los productos y variantes del pedido, verifica que
+        estén disponibles y fija el precio del servidor en cada item. Si el
+        cliente envía `price` y no coincide con el actual, se rechaza.
+        """
+        if not items:
+            raise serializers.ValidationError('El pedido debe tener al menos un producto.')
+        
+        products = Product.objects.in_bulk({item['product_id'] for item in items})
+        variant_ids = {item['variant_id'] for item in items if item.get('variant_id')}
+        variants = ProductVariant.objects.select_related('size', 'color').in_bulk(variant_ids) if variant_ids else {}
+        
+        errors = []
+        for item in items:
+            error = {}
+            product = products.get(item['product_id'])
+            variant = variants.get(item.get('variant_id'))
+            if product is None or product.status != 'published':
+                error['product_id'] = 'El producto no está disponible.'
+            elif item.get('variant_id') and (variant is None or variant.product_id != product.pk or not variant.is_active):
+                error['variant_id'] = 'La variante no está disponible para este producto.'
+            else:
+                if variant:
+                    variant.product = product
+                item['product'] = product
+                item['variant'] = variant
+                item['unit_price'] = variant.final_price if variant else product.price
+                if item.get('price') is not None and item['price'] != item['unit_price']:
+                    error['price'] = f'El precio cambió; el precio actual es {item["unit_price"]}.'
+            errors.append(error)
+        
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+    
     def create(self, validated_data):
         """
-        Crea una nueva orden con sus items.
+        Crea una nueva orden con sus items en una sola transacción, con los
+        precios del servidor y un único bulk_create de los items.
         """
         items_data = validated_data.pop('items', [])
         
+        order_items = [
+            OrderItem(
+                product=item_data['product'],
+                variant=item_data['variant'],
+                quantity=item_data['quantity'],
+                unit_price=item_data['unit_price'],
+            )
+            for item_data in items_data
+        ]
+        for order_item in order_items:
+            order_item.fill_snapshot()
+        
         # Calcular totales
-        total_amount = sum(item['quantity'] * item['price'] for item in items_data)
+        subtotal = sum(order_item.total_price for order_item in order_items)
+        shipping_amount = validated_data.get('shipping_amount', 0)
         
         # Crear la orden con campos requeridos
-        order = Order.objects.create(
-            first_name=validated_data['first_name'],
-            last_name=validated_data['last_name'],
-            document_id=validated_data['document_id'],
-            email=validated_data['email'],
-            phone=validated_data['phone'],
-            shipping_address=validated_data['shipping_address'],
-            billing_address=validated_data.get('billing_address', validated_data['shipping_address']),  # Usar billing_address si existe, sino shipping_address
-            notes=validated_data.get('notes', ''),
-            subtotal=total_amount,
-            shipping_amount=validated_data.get('shipping_amount', 0),
-            total_amount=total_amount + validated_data.get('shipping_amount', 0),
-            shipping_first_name=validated_data['first_name'],
-            shipping_last_name=validated_data['last_name'],
-            shipping_city='Bogotá',
-            shipping_state='Cundinamarca',
-            shipping_country='Colombia',
-            shipping_postal_code='110111',
-            user=self.context['request'].user
-        )
-        
-        # Crear los items de la orden
-        for item_data in items_data:
-            OrderItem.objects.create(
-                order=order,
-                product_id=item_data['product_id'],
-                quantity=item_data['quantity'],
-                unit_price=item_data['price'],
-                total_price=item_data['quantity'] * item_data['price']
+        with transaction.atomic():
+            order = Order.objects.create(
+                first_name=validated_data['first_name'],
+                last_name=validated_data['last_name'],
+                document_id=validated_data['document_id'],
+                email=validated_data['email'],
+                phone=validated_data['phone'],
+                shipping_address=validated_data['shipping_address'],
+                billing_address=validated_data.get('billing_address', validated_data['shipping_address']),  # Usar billing_address si existe, sino shipping_address
+                notes=validated_data.get('notes', ''),
+                subtotal=subtotal,
+                shipping_amount=shipping_amount,
+                total_amount=subtotal + shipping_amount,
+                shipping_first_name=validated_data['first_name'],
+                shipping_last_name=validated_data['last_name'],
+                shipping_city='Bogotá',
+                shipping_state='Cundinamarca',
+                shipping_country='Colombia',
+                shipping_postal_code='110111',
+                user=self.context['request'].user
             )
+            
+            # Crear los items de la orden
+            for order_item in order_items:
+                order_item.order = order
+            OrderItem.objects.bulk_create(order_items)
+            
+            # Reservar el stock en la misma transacción: si una línea no
+            # alcanza, el error revierte el pedido, sus items y los descuentos
+            try:
+                reserve_order_stock(order, [
+                    (item_data['product_id'], item_data.get('variant_id'), item_data['quantity'])
+                    for item_data in items_data
+                ], products={item_data['product_id']: item_data['product'] for item_data in items_data})
+            except InsufficientStock as e:
+                raise serializers.ValidationError({'items': [str(e)]})
         
         return order
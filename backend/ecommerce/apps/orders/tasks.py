@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from .inventory import release_expired_holds as release_expired
+
+
+@shared_task(ignore_result=True)
+def release_expired_holds(batch_size=500):
+    """Barrido periódico de las reservas de inventario vencidas."""
+    return release_expired(batch_size)
@@ -1,13 +1,15 @@
 from rest_framework import viewsets, status, permissions, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Prefetch, Q
+from .inventory import commit_order_holds, release_order_holds
 from .models import Order, OrderItem
 from .serializers import (
     OrderListSerializer, OrderDetailSerializer, OrderCreateSerializer, 
     OrderItemSerializer
 )
 from ecommerce.apps.users.permissions import IsOwnerOrAdmin
+from ecommerce.pagination import ListingPagination
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -15,6 +17,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     ViewSet para gestionar órdenes.
     """
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrAdmin]
+    pagination_class = ListingPagination
     
     def get_serializer_class(self):
         """
@@ -31,7 +34,17 @@ class OrderViewSet(viewsets.ModelViewSet):
         """
         Filtra las órdenes según el usuario.
         """
-        queryset = Order.objects.select_related('user').prefetch_related('items__product')
+        queryset = Order.objects.select_related('user')
+        if self.action == 'list':
+            queryset = queryset.prefetch_related('items')
+        else:
+            # OrderItemSerializer representa el producto con ProductListSerializer
+            queryset = queryset.prefetch_related(Prefetch(
+                'items',
+                queryset=OrderItem.objects.select_related('product__category', 'product__brand').prefetch_related(
+                    'product__variants__size', 'product__variants__color'
+                )
+            ))
         
         if self.request.user.is_staff:
             return queryset.all()
@@ -52,6 +65,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if order.status in ['pending', 'confirmed']:
             order.status = 'cancelled'
             order.save()
+            release_order_holds(order.pk, statuses=('held', 'committed'))
             return Response({'status': 'Order cancelled'})
         return Response(
             {'error': 'Order cannot be cancelled'}, 
@@ -67,6 +81,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if order.status == 'pending':
             order.status = 'confirmed'
             order.save()
+            commit_order_holds(order.pk)
             return Response({'status': 'Order confirmed'})
         return Response(
             {'error': 'Order cannot be confirmed'}, 
@@ -82,6 +97,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if order.status == 'confirmed':
             order.status = 'processing'
             order.save()
+            commit_order_holds(order.pk)
             return Response({'status': 'Order processing'})
         return Response(
             {'error': 'Order cannot be processed'}, 
@@ -97,6 +113,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if order.status == 'processing':
             order.status = 'shipped'
             order.save()
+            commit_order_holds(order.pk)
             return Response({'status': 'Order shipped'})
         return Response(
             {'error': 'Order cannot be shipped'}, 
@@ -112,6 +129,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if order.status == 'shipped':
             order.status = 'delivered'
             order.save()
+            commit_order_holds(order.pk)
             return Response({'status': 'Order delivered'})
         return Response(
             {'error': 'Order cannot be delivered'}, 
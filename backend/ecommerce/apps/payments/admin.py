@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
+from ecommerce.apps.orders.inventory import commit_orders_holds, release_orders_holds
 from .models import Payment
 
 
@@ -93,11 +94,14 @@ class PaymentAdmin(admin.ModelAdmin):
     
     def mark_as_completed(self, request, queryset):
         queryset.update(status='completed')
+        # update() no dispara la señal del Payment: se confirman las reservas aquí
+        commit_orders_holds(queryset.values_list('order_id', flat=True))
         self.message_user(request, f"{queryset.count()} pagos marcados como 'Completado'.")
     mark_as_completed.short_description = _("Marcar como 'Completado'")
     
     def mark_as_failed(self, request, queryset):
         queryset.update(status='failed')
+        release_orders_holds(queryset.values_list('order_id', flat=True))
         self.message_user(request, f"{queryset.count()} pagos marcados como 'Fallido'.")
     mark_as_failed.short_description = _("Marcar como 'Fallido'")
     
@@ -5,3 +5,6 @@ class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ecommerce.apps.payments'
     verbose_name = 'Pagos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
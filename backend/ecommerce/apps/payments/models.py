@@ -2,6 +2,9 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
 import uuid
+from functools import partial
+
+from ecommerce.identifiers import generate_identifier, save_with_identifier
 
 
 class Payment(models.Model):
@@ -95,20 +98,12 @@ class Payment(models.Model):
         return f"Payment {self.payment_id} - {self.order.order_number}"
     
     def save(self, *args, **kwargs):
-        if not self.payment_id:
-            self.payment_id = self.generate_payment_id()
-        super().save(*args, **kwargs)
+        save_with_identifier(self, 'payment_id', self.generate_payment_id, partial(super().save, *args, **kwargs))
     
     def generate_payment_id(self):
         """Genera un ID único para el pago."""
-        import random
-        import string
-        from django.utils import timezone
-        
-        # Formato: PAY-YYYYMMDD-XXXXXX
-        date_str = timezone.now().strftime('%Y%m%d')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        return f"PAY-{date_str}-{random_str}"
+        # Formato: PAY-YYYYMMDD-XXXXXXXXXX
+        return generate_identifier('PAY')
     
     @property
     def is_successful(self):
@@ -197,20 +192,12 @@ class Refund(models.Model):
         return f"Refund {self.refund_id} - {self.payment.payment_id}"
     
     def save(self, *args, **kwargs):
-        if not self.refund_id:
-            self.refund_id = self.generate_refund_id()
-        super().save(*args, **kwargs)
+        save_with_identifier(self, 'refund_id', self.generate_refund_id, partial(super().save, *args, **kwargs))
     
     def generate_refund_id(self):
         """Genera un ID único para el reembolso."""
-        import random
-        import string
-        from django.utils import timezone
-        
-        # Formato: REF-YYYYMMDD-XXXXXX
-        date_str = timezone.now().strftime('%Y%m%d')
-        random_str = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-        return f"REF-{date_str}-{random_str}"
+        # Formato: REF-YYYYMMDD-XXXXXXXXXX
+        return generate_identifier('REF')
 
 
 class PaymentMethod(models.Model):
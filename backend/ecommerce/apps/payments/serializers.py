@@ -8,13 +8,13 @@ class PaymentSerializer(serializers.ModelSerializer):
     """
     user_email = serializers.EmailField(source='user.email', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
-    order_number = serializers.CharField(source='order.id', read_only=True)
+    order_number = serializers.CharField(source='order.order_number', read_only=True)
     
     class Meta:
         model = Payment
         fields = [
-            'id', 'user', 'user_email', 'user_name', 'order', 'order_number',
-            'amount', 'payment_method', 'transaction_id', 'status', 
+            'id', 'payment_id', 'user', 'user_email', 'user_name', 'order', 'order_number',
+            'amount', 'currency', 'method', 'provider', 'provider_transaction_id', 'status',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'payment_id', 'user', 'created_at', 'updated_at']
@@ -0,0 +1,21 @@
+"""
+Confirmación o liberación de las reservas de inventario según el resultado
+del pago.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+
+from ecommerce.apps.orders.inventory import commit_order_holds, release_order_holds
+from .models import Payment
+
+
+def sync_inventory_holds(sender, instance, **kwargs):
+    order_id = instance.order_id
+    if instance.status == 'completed':
+        transaction.on_commit(lambda: commit_order_holds(order_id))
+    elif instance.status in ('failed', 'cancelled'):
+        transaction.on_commit(lambda: release_order_holds(order_id))
+
+
+post_save.connect(sync_inventory_holds, sender=Payment, dispatch_uid='inventory-holds-Payment')
@@ -43,7 +43,7 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ['status', 'is_featured', 'brand', 'category', 'created_at']
     search_fields = ['name', 'description', 'sku']
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ['created_at', 'updated_at', 'published_at']
+    readonly_fields = ['created_at', 'updated_at', 'published_at', 'rating_avg', 'rating_count', 'rating_histogram']
     inlines = [ProductImageInline, ProductVariantInline]
     
     fieldsets = (
@@ -60,6 +60,10 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('meta_title', 'meta_description'),
             'classes': ('collapse',)
         }),
+        (_('Calificaciones'), {
+            'fields': ('rating_avg', 'rating_count', 'rating_histogram'),
+            'classes': ('collapse',)
+        }),
         (_('Fechas'), {
             'fields': ('created_at', 'updated_at', 'published_at'),
             'classes': ('collapse',)
@@ -119,6 +123,12 @@ class ProductImageAdmin(admin.ModelAdmin):
             )
         return "No image"
     image_preview.short_description = _('Preview')
+    
+    def delete_queryset(self, request, queryset):
+        product_ids = set(queryset.values_list('product_id', flat=True))
+        super().delete_queryset(request, queryset)
+        for product_id in product_ids:
+            Product.refresh_primary_image(product_id)
 
 
 @admin.register(ProductReview)
@@ -148,11 +158,16 @@ class ProductReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
     
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True)
-        self.message_user(request, f"{queryset.count()} reseñas aprobadas.")
+        product_ids = list(queryset.values_list('product_id', flat=True))
+        updated = queryset.update(is_approved=True)
+        Product.refresh_rating_stats(product_ids)
+        self.message_user(request, f"{updated} reseñas aprobadas.")
     approve_reviews.short_description = _("Aprobar reseñas seleccionadas")
     
     def disapprove_reviews(self, request, queryset):
-        queryset.update(is_approved=False)
-        self.message_user(request, f"{queryset.count()} reseñas desaprobadas.")
+        product_ids = list(queryset.values_list('product_id', flat=True))
+        updated = queryset.update(is_approved=False)
+        Product.refresh_rating_stats(product_ids)
+        self.message_user(request, f"{updated} reseñas desaprobadas.")
     disapprove_reviews.short_description = _("Desaprobar reseñas seleccionadas")
+
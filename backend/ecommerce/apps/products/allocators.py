@@ -0,0 +1,120 @@
+"""
+Asignación de slugs y SKU únicos.
+
+El primer valor de una base es la base misma (`camisa`) y los siguientes
+llevan sufijo (`camisa-1`, `camisa-2`, ...). El último sufijo usado por cada
+base se guarda en SuffixCounter y se reserva con un UPDATE atómico
+(F('value') + 1), así que cada asignación cuesta un número fijo de consultas
+sin importar cuántos valores parecidos existan, y dos creaciones simultáneas
+nunca reciben el mismo sufijo. La primera vez que se usa una base el contador
+se inicializa con el mayor sufijo existente, en una sola consulta.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, F, Max, Value, When
+from django.db.models.functions import Cast, Greatest, Substr
+
+SEPARATOR = '-'
+# Espacio reservado para el sufijo: separador y hasta 6 dígitos
+SUFFIX_LENGTH = 7
+
+
+def _scope(model, field):
+    return f'{model._meta.label_lower}.{field}'
+
+
+def format_value(base, suffix):
+    return base if suffix == 0 else f'{base}{SEPARATOR}{suffix}'
+
+
+def max_existing_suffix(model, field, base):
+    """Mayor sufijo en uso para la base: 0 si solo existe la base y -1 si ninguno."""
+    pattern = rf'^{re.escape(base)}({SEPARATOR}[0-9]+)?$'
+    result = model._default_manager.filter(**{f'{field}__regex': pattern}).aggregate(
+        top=Max(Case(
+            When(**{field: base}, then=Value(0, output_field=BigIntegerField())),
+            default=Cast(Substr(field, len(base) + len(SEPARATOR) + 1), BigIntegerField()),
+        ))
+    )
+    return -1 if result['top'] is None else result['top']
+
+
+def _reserve(model, field, base, count=1):
+    """Reserva `count` sufijos consecutivos para la base; retorna el primero."""
+    from .models import SuffixCounter
+
+    counters = SuffixCounter.objects.filter(scope=_scope(model, field), base=base)
+    with transaction.atomic():
+        if counters.update(value=F('value') + count):
+            return counters.values_list('value', flat=True).get() - count + 1
+
+    # Primera vez que se usa la base: partir del mayor sufijo existente
+    first = max_existing_suffix(model, field, base) + 1
+    try:
+        with transaction.atomic():
+            SuffixCounter.objects.create(scope=_scope(model, field), base=base, value=first + count - 1)
+    except IntegrityError:
+        # Otro proceso creó el contador primero
+        return _reserve(model, field, base, count)
+    return first
+
+
+def _truncate(model, field, base, max_length):
+    if max_length is None:
+        max_length = model._meta.get_field(field).max_length
+    return base[:max_length - SUFFIX_LENGTH].rstrip(SEPARATOR)
+
+
+def allocate_unique(model, field, base, max_length=None):
+    """
+    Retorna un valor libre para `model.field` a partir de `base`, recortada
+    para que quepa el sufijo.
+    """
+    from .models import SuffixCounter
+
+    base = _truncate(model, field, base, max_length)
+    while True:
+        candidate = format_value(base, _reserve(model, field, base))
+        if not model._default_manager.filter(**{field: candidate}).exists():
+            return candidate
+        # Alguien asignó a mano un valor por encima del contador: resincronizar
+        SuffixCounter.objects.filter(scope=_scope(model, field), base=base).update(
+            value=Greatest(F('value'), max_existing_suffix(model, field, base))
+        )
+
+
+def allocate_unique_batch(model, field, bases, max_length=None):
+    """
+    Versión por lotes de allocate_unique para importaciones. Las bases libres
+    se usan tal cual (una consulta para todas) y cada base ocupada reserva en
+    el contador, de una vez, tantos sufijos como valores necesite.
+    """
+    bases = [_truncate(model, field, base, max_length) for base in bases]
+    taken = set(model._default_manager.filter(**{f'{field}__in': set(bases)}).values_list(field, flat=True))
+
+    values = [None] * len(bases)
+    pending = {}
+    for index, base in enumerate(bases):
+        if base in taken:
+            pending.setdefault(base, []).append(index)
+        else:
+            values[index] = base
+            taken.add(base)
+    assigned = {value for value in values if value is not None}
+
+    for base, indexes in pending.items():
+        first = _reserve(model, field, base, len(indexes))
+        for offset, index in enumerate(indexes):
+            values[index] = format_value(base, first + offset)
+
+    # Valores que ya existen o que coinciden con una base libre del lote
+    candidates = [values[index] for indexes in pending.values() for index in indexes]
+    clashes = set(model._default_manager.filter(**{f'{field}__in': candidates}).values_list(field, flat=True))
+    for indexes in pending.values():
+        for index in indexes:
+            while values[index] in clashes or values[index] in assigned:
+                values[index] = allocate_unique(model, field, bases[index], max_length)
+            assigned.add(values[index])
+    return values
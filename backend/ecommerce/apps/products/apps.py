@@ -5,3 +5,6 @@ class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ecommerce.apps.products'
     verbose_name = 'Productos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,482 @@
+"""
+Importación y exportación masiva del catálogo en CSV o JSONL.
+
+Cada fila describe un producto y, opcionalmente, una de sus variantes; un
+producto con varias variantes ocupa varias filas con los mismos datos de
+producto. Columnas (CATALOG_COLUMNS):
+
+- Producto: sku, name, description, short_description, category (slug o
+  nombre), brand (slug o nombre), gender, price, compare_price, cost_price,
+  status, is_featured, track_inventory, allow_backorder, inventory_quantity,
+  low_stock_threshold, weight e images (rutas en el almacenamiento de medios
+  separadas por `|`; en JSONL también una lista).
+- Variante: variant_sku, size, size_type, color, variant_price,
+  variant_compare_price, variant_inventory_quantity y variant_is_active.
+
+La importación lee el archivo como flujo y procesa lotes de filas: valida
+cada fila, resuelve categorías, marcas, tallas y colores desde mapas en
+memoria y escribe el lote con bulk_create(update_conflicts=True) por SKU,
+de modo que la memoria usada depende del tamaño del lote y no del archivo.
+Las filas inválidas no detienen la importación: se reportan con su número
+de línea.
+"""
+
+import csv
+import io
+import json
+import logging
+from decimal import Decimal
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import serializers
+
+from ecommerce.apps.categories.models import Brand, Category, Color, Size
+from ecommerce.cache import invalidate_catalog_cache
+from .allocators import allocate_unique_batch
+from .models import Product, ProductImage, ProductVariant
+from .search import get_search_backend
+from .suggest import product_entry, sync_batch_on_commit
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_COLUMNS = [
+    'sku', 'name', 'description', 'short_description', 'category', 'brand', 'gender',
+    'price', 'compare_price', 'cost_price', 'status', 'is_featured', 'track_inventory',
+    'allow_backorder', 'inventory_quantity', 'low_stock_threshold', 'weight', 'images',
+]
+VARIANT_COLUMNS = [
+    'variant_sku', 'size', 'size_type', 'color', 'variant_price', 'variant_compare_price',
+    'variant_inventory_quantity', 'variant_is_active',
+]
+CATALOG_COLUMNS = PRODUCT_COLUMNS + VARIANT_COLUMNS
+FORMATS = ('csv', 'jsonl')
+
+# Campos que la importación escribe en cada modelo
+PRODUCT_FIELDS = [
+    'name', 'description', 'short_description', 'category', 'brand', 'gender', 'price',
+    'compare_price', 'cost_price', 'status', 'is_featured', 'track_inventory', 'allow_backorder',
+    'inventory_quantity', 'low_stock_threshold', 'weight',
+]
+VARIANT_FIELDS = ['product', 'size', 'color', 'price', 'compare_price', 'inventory_quantity', 'is_active']
+
+DEFAULT_CHUNK_SIZE = 1000
+IMAGE_SEPARATOR = '|'
+# Errores que se conservan en memoria cuando no se indica dónde escribirlos
+MAX_REPORTED_ERRORS = 1000
+
+
+class ReferenceMaps:
+    """
+    Categorías, marcas, tallas y colores indexados por slug o nombre (en
+    minúsculas). Son tablas pequeñas: se cargan una vez por importación.
+    """
+
+    def __init__(self):
+        self.categories = self._by_slug_and_name(Category.objects.only('pk', 'name', 'slug'))
+        self.brands = self._by_slug_and_name(Brand.objects.only('pk', 'name', 'slug'))
+        self.colors = {color.name.lower(): color for color in Color.objects.only('pk', 'name')}
+        self.sizes = {}
+        for size in Size.objects.only('pk', 'name', 'type'):
+            self.sizes.setdefault(size.name.lower(), {})[size.type] = size
+
+    @staticmethod
+    def _by_slug_and_name(queryset):
+        mapping = {}
+        for obj in queryset:
+            mapping[obj.name.lower()] = obj
+            mapping[obj.slug.lower()] = obj
+        return mapping
+
+    def size(self, name, size_type=''):
+        by_type = self.sizes.get(name.lower(), {})
+        if size_type:
+            return by_type.get(size_type)
+        return next(iter(by_type.values())) if len(by_type) == 1 else None
+
+
+class CatalogRowSerializer(serializers.Serializer):
+    """Valida una fila del archivo y resuelve sus referencias."""
+    sku = serializers.CharField(max_length=100)
+    name = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    short_description = serializers.CharField(max_length=500, required=False, allow_blank=True, default='')
+    category = serializers.CharField()
+    brand = serializers.CharField(required=False, default='')
+    gender = serializers.ChoiceField(choices=Product.GENDER_CHOICES, required=False, default='')
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    compare_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    status = serializers.ChoiceField(choices=Product.PRODUCT_STATUS, required=False, default='draft')
+    is_featured = serializers.BooleanField(required=False, default=False)
+    track_inventory = serializers.BooleanField(required=False, default=True)
+    allow_backorder = serializers.BooleanField(required=False, default=False)
+    inventory_quantity = serializers.IntegerField(min_value=0, required=False, default=0)
+    low_stock_threshold = serializers.IntegerField(min_value=0, required=False, default=5)
+    weight = serializers.DecimalField(max_digits=8, decimal_places=2, required=False, allow_null=True, default=None)
+    images = serializers.CharField(required=False, default='')
+
+    variant_sku = serializers.CharField(max_length=100, required=False, default='')
+    size = serializers.CharField(required=False, default='')
+    size_type = serializers.ChoiceField(choices=Size.SIZE_TYPES, required=False, default='')
+    color = serializers.CharField(required=False, default='')
+    variant_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    variant_compare_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    variant_inventory_quantity = serializers.IntegerField(min_value=0, required=False, default=0)
+    variant_is_active = serializers.BooleanField(required=False, default=True)
+
+    def validate_category(self, value):
+        category = self.context['references'].categories.get(value.lower())
+        if category is None:
+            raise serializers.ValidationError(f'Categoría "{value}" no encontrada.')
+        return category
+
+    def validate_brand(self, value):
+        if not value:
+            return None
+        brand = self.context['references'].brands.get(value.lower())
+        if brand is None:
+            raise serializers.ValidationError(f'Marca "{value}" no encontrada.')
+        return brand
+
+    def validate_color(self, value):
+        if not value:
+            return None
+        color = self.context['references'].colors.get(value.lower())
+        if color is None:
+            raise serializers.ValidationError(f'Color "{value}" no encontrado.')
+        return color
+
+    def validate_images(self, value):
+        paths = [path.strip() for path in value.split(IMAGE_SEPARATOR) if path.strip()]
+        if any('://' in path for path in paths):
+            raise serializers.ValidationError('Las imágenes deben ser rutas del almacenamiento de medios.')
+        return paths
+
+    def validate(self, attrs):
+        size = None
+        if attrs['size']:
+            size = self.context['references'].size(attrs['size'], attrs['size_type'])
+            if size is None:
+                raise serializers.ValidationError({
+                    'size': f'Talla "{attrs["size"]}" no encontrada o ambigua; indique size_type.'
+                })
+        attrs['size'] = size
+        if not attrs['variant_sku'] and (size or attrs['color']):
+            raise serializers.ValidationError({'variant_sku': 'Las filas con talla o color requieren variant_sku.'})
+        return attrs
+
+
+def clean_row(raw):
+    """Descarta valores vacíos para que apliquen los valores por defecto."""
+    row = {}
+    for key, value in raw.items():
+        if key is None or value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = IMAGE_SEPARATOR.join(str(item) for item in value)
+        elif isinstance(value, str):
+            value = value.strip()
+        if value != '':
+            row[key] = value
+    return row
+
+
+def detect_format(filename, default='csv'):
+    """Formato según la extensión del archivo (.jsonl o .ndjson para JSONL)."""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else default
+
+
+def read_rows(stream, fmt):
+    """Genera (número de línea, fila) desde un flujo de texto CSV o JSONL."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = e
+        yield line_number, row
+
+
+class CatalogImporter:
+    """
+    Importa filas del catálogo por lotes. `on_error` recibe cada error
+    (dict con line, sku, field y message); si no se indica, se conservan
+    los primeros MAX_REPORTED_ERRORS en `errors`.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, on_error=None):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.on_error = on_error
+        self.errors = []
+        self.references = ReferenceMaps()
+        self.stats = {
+            'rows': 0, 'invalid_rows': 0, 'products_created': 0, 'products_updated': 0,
+            'variants': 0, 'images': 0,
+        }
+
+    # Errores
+
+    def report(self, line, sku, field, message):
+        error = {'line': line, 'sku': sku or '', 'field': field, 'message': str(message)}
+        if self.on_error is not None:
+            self.on_error(error)
+        elif len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+    def report_serializer_errors(self, line, sku, errors):
+        for field, messages in errors.items():
+            for message in messages if isinstance(messages, list) else [messages]:
+                self.report(line, sku, field, message)
+
+    # Flujo
+
+    def run(self, rows):
+        """Procesa un iterable de (número de línea, fila) y retorna las estadísticas."""
+        chunk = []
+        for line, raw in rows:
+            chunk.append((line, raw))
+            if len(chunk) >= self.chunk_size:
+                self.process_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.process_chunk(chunk)
+        if not self.dry_run:
+            invalidate_catalog_cache('products')
+        return self.stats
+
+    def validate_chunk(self, chunk):
+        """
+        Valida las filas y agrupa el lote por SKU. Si un producto o variante
+        se repite, la última fila manda.
+        """
+        products, variants, images, lines = {}, {}, {}, {}
+        # Una sola instancia para todo el lote: construir los campos del
+        # serializer en cada fila cuesta más que validarla
+        serializer = CatalogRowSerializer(context={'references': self.references})
+        for line, raw in chunk:
+            self.stats['rows'] += 1
+            if not isinstance(raw, dict):
+                self.stats['invalid_rows'] += 1
+                self.report(line, '', 'non_field_errors', f'Fila inválida: {raw}')
+                continue
+            try:
+                data = serializer.run_validation(clean_row(raw))
+            except serializers.ValidationError as e:
+                self.stats['invalid_rows'] += 1
+                self.report_serializer_errors(line, raw.get('sku'), e.detail)
+                continue
+            sku = data['sku']
+            products[sku] = {field: data[field] for field in PRODUCT_FIELDS}
+            lines.setdefault(sku, []).append(line)
+            if data['images']:
+                images[sku] = data['images']
+            if data['variant_sku']:
+                variants[data['variant_sku']] = {
+                    'line': line,
+                    'product_sku': sku,
+                    'size': data['size'],
+                    'color': data['color'],
+                    'price': data['variant_price'],
+                    'compare_price': data['variant_compare_price'],
+                    'inventory_quantity': data['variant_inventory_quantity'],
+                    'is_active': data['variant_is_active'],
+                }
+        return products, variants, images, lines
+
+    def process_chunk(self, chunk):
+        products, variants, images, lines = self.validate_chunk(chunk)
+        if not products or self.dry_run:
+            return
+        try:
+            with transaction.atomic():
+                product_objs = self.write_products(products)
+                self.write_variants(variants, product_objs)
+                self.write_images(images, product_objs)
+        except DatabaseError as e:
+            logger.exception('No se pudo guardar un lote del catálogo')
+            for sku, sku_lines in lines.items():
+                for line in sku_lines:
+                    self.report(line, sku, 'non_field_errors', f'No se pudo guardar el lote: {e}')
+
+    # Escritura
+
+    def write_products(self, products):
+        existing = {
+            sku: (slug, published_at)
+            for sku, slug, published_at in Product.objects.filter(sku__in=products).values_list(
+                'sku', 'slug', 'published_at'
+            )
+        }
+        new_skus = [sku for sku in products if sku not in existing]
+        new_slugs = allocate_unique_batch(
+            Product, 'slug', [slugify(products[sku]['name']) or 'producto' for sku in new_skus]
+        )
+        slugs = dict(zip(new_skus, new_slugs))
+
+        now = timezone.now()
+        objs = []
+        for sku, fields in products.items():
+            slug, published_at = existing.get(sku, (slugs.get(sku), None))
+            product = Product(sku=sku, slug=slug, published_at=published_at, **fields)
+            if product.status == 'published' and not product.published_at:
+                product.published_at = now
+            product.search_keywords = product.build_search_keywords()
+            objs.append(product)
+
+        Product.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=PRODUCT_FIELDS + ['slug', 'published_at', 'search_keywords', 'updated_at'],
+        )
+        ids = dict(Product.objects.filter(sku__in=products).values_list('sku', 'pk'))
+        for product in objs:
+            product.pk = ids[product.sku]
+
+        get_search_backend().index(objs)
+        sync_batch_on_commit(
+            'product',
+            [product_entry(product) for product in objs if product.status == 'published'],
+            [product.pk for product in objs if product.status != 'published'],
+        )
+        self.stats['products_created'] += len(new_skus)
+        self.stats['products_updated'] += len(objs) - len(new_skus)
+        return {product.sku: product for product in objs}
+
+    def write_variants(self, variants, products):
+        if not variants:
+            return
+        # Una variante no puede cambiar de producto ni repetir talla y color en él
+        owners = dict(ProductVariant.objects.filter(sku__in=variants).values_list('sku', 'product_id'))
+        combinations = {
+            (product_id, size_id, color_id): sku
+            for sku, product_id, size_id, color_id in ProductVariant.objects.filter(
+                product_id__in={products[data['product_sku']].pk for data in variants.values()}
+            ).values_list('sku', 'product_id', 'size_id', 'color_id')
+        }
+
+        objs = []
+        for sku, data in variants.items():
+            product = products[data['product_sku']]
+            if sku in owners and owners[sku] != product.pk:
+                self.report(data['line'], data['product_sku'], 'variant_sku', 'El SKU de variante pertenece a otro producto.')
+                continue
+            key = (product.pk, data['size'].pk if data['size'] else None, data['color'].pk if data['color'] else None)
+            if combinations.get(key, sku) != sku and None not in key[1:]:
+                self.report(data['line'], data['product_sku'], 'variant_sku', 'El producto ya tiene una variante con esa talla y color.')
+                continue
+            combinations[key] = sku
+            objs.append(ProductVariant(
+                sku=sku,
+                product=product,
+                size=data['size'],
+                color=data['color'],
+                price=data['price'],
+                compare_price=data['compare_price'],
+                inventory_quantity=data['inventory_quantity'],
+                is_active=data['is_active'],
+            ))
+
+        ProductVariant.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=VARIANT_FIELDS + ['updated_at'],
+        )
+        self.stats['variants'] += len(objs)
+
+    def write_images(self, images, products):
+        """Reemplaza las imágenes de los productos que traen la columna images."""
+        if not images:
+            return
+        product_ids = [products[sku].pk for sku in images]
+        ProductImage.objects.filter(product_id__in=product_ids).delete()
+        objs = [
+            ProductImage(product=products[sku], image=path, sort_order=index, is_primary=index == 0)
+            for sku, paths in images.items()
+            for index, path in enumerate(paths)
+        ]
+        ProductImage.objects.bulk_create(objs)
+
+        updated = []
+        for sku, paths in images.items():
+            product = products[sku]
+            product.primary_image_url = default_storage.url(paths[0])
+            updated.append(product)
+        Product.objects.bulk_update(updated, ['primary_image_url'])
+        self.stats['images'] += len(objs)
+
+
+# Exportación
+
+def _format_value(value, fmt):
+    if value is None:
+        return '' if fmt == 'csv' else None
+    if isinstance(value, bool):
+        return ('true' if value else 'false') if fmt == 'csv' else value
+    return value
+
+
+def export_rows(queryset=None, chunk_size=500):
+    """Genera las filas del catálogo (una por variante o por producto sin variantes)."""
+    if queryset is None:
+        queryset = Product.objects.all()
+    queryset = queryset.select_related('category', 'brand').prefetch_related(
+        Prefetch('variants', queryset=ProductVariant.objects.select_related('size', 'color').order_by('pk')),
+        Prefetch('images', queryset=ProductImage.objects.order_by('sort_order', 'pk')),
+    ).order_by('pk')
+
+    for product in queryset.iterator(chunk_size=chunk_size):
+        base = {field: getattr(product, field) for field in PRODUCT_FIELDS}
+        base.update(
+            sku=product.sku,
+            category=product.category.slug,
+            brand=product.brand.slug if product.brand else None,
+            images=[image.image.name for image in product.images.all()],
+        )
+        variants = list(product.variants.all())
+        if not variants:
+            yield {**base, **{column: None for column in VARIANT_COLUMNS}}
+        for variant in variants:
+            yield {
+                **base,
+                'variant_sku': variant.sku,
+                'size': variant.size.name if variant.size else None,
+                'size_type': variant.size.type if variant.size else None,
+                'color': variant.color.name if variant.color else None,
+                'variant_price': variant.price,
+                'variant_compare_price': variant.compare_price,
+                'variant_inventory_quantity': variant.inventory_quantity,
+                'variant_is_active': variant.is_active,
+            }
+
+
+def iter_export(fmt, queryset=None, chunk_size=500):
+    """Genera el archivo de exportación como fragmentos de texto, fila a fila."""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CATALOG_COLUMNS)
+        writer.writeheader()
+        for row in export_rows(queryset, chunk_size):
+            row['images'] = IMAGE_SEPARATOR.join(row['images'])
+            writer.writerow({column: _format_value(row[column], fmt) for column in CATALOG_COLUMNS})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+    for row in export_rows(queryset, chunk_size):
+        yield json.dumps({column: row[column] for column in CATALOG_COLUMNS}, cls=DjangoJSONEncoder) + '\n'
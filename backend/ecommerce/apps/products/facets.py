@@ -0,0 +1,115 @@
+"""
+Conteos por faceta (categoría, marca, género, talla, color y rango de
+precio) para el conjunto de productos que resulta de aplicar ProductFilter.
+
+Las facetas de columnas del producto se calculan con una sola consulta
+agrupada por todas ellas a la vez; tallas y colores, que dependen de las
+variantes, con una segunda consulta (UNION de ambos agrupamientos) que
+cuenta productos distintos.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Count, F, Value, When
+
+from .models import Product, ProductVariant
+
+# (clave, desde, hasta) en pesos; `hasta` es excluyente y None no tiene límite
+PRICE_BUCKETS = (
+    ('0-50000', Decimal('0'), Decimal('50000')),
+    ('50000-100000', Decimal('50000'), Decimal('100000')),
+    ('100000-200000', Decimal('100000'), Decimal('200000')),
+    ('200000-500000', Decimal('200000'), Decimal('500000')),
+    ('500000+', Decimal('500000'), None),
+)
+
+
+def price_bucket_expression():
+    whens = [
+        When(price__gte=low, price__lt=high, then=Value(key))
+        for key, low, high in PRICE_BUCKETS if high is not None
+    ]
+    last_key = PRICE_BUCKETS[-1][0]
+    return Case(*whens, default=Value(last_key), output_field=CharField())
+
+
+def filter_signature(filterset):
+    """
+    Firma normalizada de los filtros válidos y no vacíos, independiente del
+    orden de los parámetros, la paginación y el ordenamiento.
+    """
+    signature = {}
+    for name, value in filterset.form.cleaned_data.items():
+        if value in (None, '', []):
+            continue
+        if isinstance(value, slice):
+            value = f'{value.start}:{value.stop}'
+        elif isinstance(value, Decimal):
+            value = value.normalize()
+        signature[name] = str(value)
+    return signature
+
+
+def _add(facet, key, count, **data):
+    entry = facet.setdefault(key, {**data, 'count': 0})
+    entry['count'] += count
+
+
+def _sorted(facet):
+    return sorted(facet.values(), key=lambda entry: (-entry['count'], entry['name']))
+
+
+def compute_facets(queryset):
+    """
+    Retorna el total de productos y los conteos de cada faceta para el
+    queryset ya filtrado.
+    """
+    rows = queryset.order_by().values(
+        'category_id', 'category__name', 'category__slug',
+        'brand_id', 'brand__name', 'brand__slug',
+        'gender',
+        price_bucket=price_bucket_expression(),
+    ).annotate(count=Count('pk'))
+
+    genders = dict(Product.GENDER_CHOICES)
+    categories, brands, gender_counts = {}, {}, {}
+    price_counts = {key: 0 for key, _, _ in PRICE_BUCKETS}
+    total = 0
+    for row in rows:
+        count = row['count']
+        total += count
+        _add(categories, row['category_id'], count,
+             id=row['category_id'], name=row['category__name'], slug=row['category__slug'])
+        if row['brand_id']:
+            _add(brands, row['brand_id'], count,
+                 id=row['brand_id'], name=row['brand__name'], slug=row['brand__slug'])
+        if row['gender']:
+            _add(gender_counts, row['gender'], count, value=row['gender'], name=str(genders.get(row['gender'], row['gender'])))
+        price_counts[row['price_bucket']] += count
+
+    variants = ProductVariant.objects.filter(product__in=queryset.order_by().values('pk'), is_active=True).order_by()
+    sizes = variants.exclude(size=None).values(
+        facet=Value('size', output_field=CharField()), value_id=F('size_id'), name=F('size__name')
+    ).annotate(count=Count('product_id', distinct=True))
+    colors = variants.exclude(color=None).values(
+        facet=Value('color', output_field=CharField()), value_id=F('color_id'), name=F('color__name')
+    ).annotate(count=Count('product_id', distinct=True))
+
+    variant_facets = {'size': {}, 'color': {}}
+    for row in sizes.union(colors, all=True):
+        _add(variant_facets[row['facet']], row['value_id'], row['count'], id=row['value_id'], name=row['name'])
+
+    return {
+        'total': total,
+        'facets': {
+            'category': _sorted(categories),
+            'brand': _sorted(brands),
+            'gender': _sorted(gender_counts),
+            'size': _sorted(variant_facets['size']),
+            'color': _sorted(variant_facets['color']),
+            'price': [
+                {'value': key, 'min': low, 'max': high, 'count': price_counts[key]}
+                for key, low, high in PRICE_BUCKETS
+            ],
+        },
+    }
@@ -1,6 +1,7 @@
 import django_filters
-from django.db.models import Q
+from rest_framework.filters import OrderingFilter
 from .models import Product
+from .search import search_products
 from ecommerce.apps.categories.models import Category
 
 
@@ -9,7 +10,7 @@ class ProductFilter(django_filters.FilterSet):
     Filtros para productos.
     """
     # Filtros básicos
-    category = django_filters.ModelChoiceFilter(queryset=Category.objects.filter(is_active=True))
+    category = django_filters.CharFilter(method='filter_category')
     gender = django_filters.ChoiceFilter(choices=Product.GENDER_CHOICES)
     
     # Filtros de precio
@@ -39,6 +40,15 @@ class ProductFilter(django_filters.FilterSet):
             'description': ['icontains'],
         }
     
+    def filter_category(self, queryset, name, value):
+        """
+        Filtrar por categoría (id o slug) incluyendo todas sus subcategorías.
+        """
+        if not value:
+            return queryset
+        lookup = {'pk': value} if value.isdigit() else {'slug': value}
+        return queryset.filter(category_id__in=Category.get_subtree_ids(**lookup))
+    
     def filter_in_stock(self, queryset, name, value):
         """
         Filtrar productos en stock.
@@ -50,14 +60,19 @@ class ProductFilter(django_filters.FilterSet):
     
     def filter_search(self, queryset, name, value):
         """
-        Búsqueda en múltiples campos.
+        Búsqueda de texto completo en nombre, SKU, categoría, marca y
+        descripciones. Anota cada producto con `search_rank`.
         """
         if value:
-            return queryset.filter(
-                Q(name__icontains=value) |
-                Q(description__icontains=value) |
-                Q(sku__icontains=value) |
-                Q(category__name__icontains=value) |
-                Q(brand__name__icontains=value)
-            ).distinct()
+            return search_products(queryset, value)
         return queryset
+
+
+class SearchRankOrderingFilter(OrderingFilter):
+    """
+    Ordena por relevancia cuando hay una búsqueda y no se pidió otro orden.
+    """
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank'] + list(self.get_default_ordering(view) or [])
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from ecommerce.apps.products.catalog_io import FORMATS, detect_format, iter_export
+from ecommerce.apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Exporta el catálogo (productos, variantes, imágenes y stock) a CSV o JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Archivo de salida (por defecto la salida estándar)'
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Formato de salida (por defecto según la extensión, o CSV)'
+        )
+        parser.add_argument(
+            '--status',
+            choices=[choice for choice, _ in Product.PRODUCT_STATUS],
+            help='Exportar solo los productos con este estado'
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['output'] or '')
+        queryset = Product.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                for chunk in iter_export(fmt, queryset):
+                    output.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f'Catálogo exportado a {options["output"]}'))
+        else:
+            for chunk in iter_export(fmt, queryset):
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,69 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from ecommerce.apps.products.catalog_io import (
+    DEFAULT_CHUNK_SIZE, FORMATS, CatalogImporter, detect_format, read_rows
+)
+
+
+class Command(BaseCommand):
+    help = 'Importa el catálogo (productos, variantes, imágenes y stock) desde un archivo CSV o JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo CSV o JSONL a importar')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Formato del archivo (por defecto según la extensión)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Número de filas a validar y escribir por lote'
+        )
+        parser.add_argument(
+            '--errors',
+            help='Archivo CSV donde escribir los errores por fila (por defecto se muestran en pantalla)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo valida el archivo, sin escribir en la base de datos'
+        )
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        error_file = open(options['errors'], 'w', newline='', encoding='utf-8') if options['errors'] else None
+        error_count = 0
+
+        def on_error(error):
+            nonlocal error_count
+            error_count += 1
+            if error_writer:
+                error_writer.writerow(error)
+            else:
+                self.stderr.write(f"Línea {error['line']} ({error['sku']}) {error['field']}: {error['message']}")
+
+        error_writer = None
+        if error_file:
+            error_writer = csv.DictWriter(error_file, fieldnames=['line', 'sku', 'field', 'message'])
+            error_writer.writeheader()
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                importer = CatalogImporter(
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                    on_error=on_error,
+                )
+                stats = importer.run(read_rows(stream, fmt))
+        except OSError as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        finally:
+            if error_file:
+                error_file.close()
+
+        summary = ', '.join(f'{key}={value}' for key, value in stats.items())
+        prefix = 'Validación' if options['dry_run'] else 'Importación'
+        self.stdout.write(self.style.SUCCESS(f'{prefix} terminada: {summary}, errores={error_count}'))
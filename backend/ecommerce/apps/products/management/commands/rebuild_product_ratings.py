@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from ecommerce.apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las calificaciones desnormalizadas (promedio, total e histograma) de los productos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Número de productos a recalcular por lote'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+
+        total = 0
+        batch = []
+        for product_id in product_ids.iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) >= batch_size:
+                total += Product.refresh_rating_stats(batch)
+                batch = []
+        if batch:
+            total += Product.refresh_rating_stats(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Calificaciones recalculadas para {total} productos')
+        )
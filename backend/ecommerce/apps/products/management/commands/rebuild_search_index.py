@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from ecommerce.apps.products.models import Product
+from ecommerce.apps.products.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de los productos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Número de productos a indexar por lote'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        backend = get_search_backend()
+        backend.clear()
+
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+        total = 0
+        batch = []
+        for product_id in product_ids.iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) >= batch_size:
+                total += Product.refresh_search_index(batch)
+                batch = []
+        if batch:
+            total += Product.refresh_search_index(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Índice de búsqueda reconstruido para {total} productos')
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from ecommerce.apps.products.suggest import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye en Redis el índice de sugerencias (productos publicados, categorías y marcas activas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Número de elementos a indexar por lote'
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Índice de sugerencias reconstruido con {total} elementos')
+        )
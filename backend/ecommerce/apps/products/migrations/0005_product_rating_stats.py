@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:34
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Q
+
+
+def backfill_rating_stats(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductReview = apps.get_model('products', 'ProductReview')
+
+    rows = ProductReview.objects.filter(is_approved=True).values('product_id').annotate(
+        count=Count('id'),
+        avg=Avg('rating'),
+        **{f'star_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    ).order_by()
+    for row in rows:
+        Product.objects.filter(pk=row['product_id']).update(
+            rating_count=row['count'],
+            rating_avg=round(row['avg'], 2),
+            rating_histogram={str(star): row[f'star_{star}'] for star in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_alter_producttagrelation_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_avg',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Promedio de reseñas aprobadas', max_digits=3, verbose_name='rating average'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='rating count'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_histogram',
+            field=models.JSONField(blank=True, default=dict, help_text='Cantidad de reseñas aprobadas por estrella (1-5)', verbose_name='rating histogram'),
+        ),
+        migrations.RunPython(backfill_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+def backfill_primary_image_url(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+
+    for image in ProductImage.objects.filter(is_primary=True).order_by('product_id', '-created_at'):
+        Product.objects.filter(pk=image.product_id, primary_image_url='').update(
+            primary_image_url=image.image.url
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_rating_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image_url',
+            field=models.CharField(blank=True, max_length=500, verbose_name='primary image URL'),
+        ),
+        migrations.RunPython(backfill_primary_image_url, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,132 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:43
+#
+# El índice de búsqueda se crea con una copia fija de la lógica de
+# ecommerce.apps.products.search (configuración, columnas y análisis del
+# texto) para que esta migración no cambie si ese módulo evoluciona.
+
+import re
+import unicodedata
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+SEARCH_CONFIG = 'spanish_unaccent'
+POSTGRES_INDEX_NAME = 'products_search_vector_gin'
+SQLITE_TABLE = 'product_search_fts'
+
+SPANISH_SUFFIXES = (
+    'amientos', 'imientos', 'aciones', 'uciones', 'amiento', 'imiento',
+    'adoras', 'adores', 'ancias', 'idades', 'mente', 'acion', 'ucion',
+    'adora', 'ador', 'ancia', 'idad', 'ables', 'ibles', 'able', 'ible',
+    'osas', 'osos', 'ivas', 'ivos', 'osa', 'oso', 'iva', 'ivo',
+    'es', 'os', 'as', 'a', 'o', 'e', 's',
+)
+MIN_STEM_LENGTH = 3
+
+POSTGRES_SETUP_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+)
+
+
+def postgres_index():
+    return GinIndex(
+        SearchVector('name', 'sku', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('search_keywords', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('short_description', 'description', weight='C', config=SEARCH_CONFIG),
+        name=POSTGRES_INDEX_NAME,
+    )
+
+
+def analyze(*texts):
+    words = []
+    for text in texts:
+        decomposed = unicodedata.normalize('NFKD', text or '')
+        folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+        for word in re.findall(r'\w+', folded):
+            if not word.isdigit():
+                for suffix in SPANISH_SUFFIXES:
+                    if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+                        word = word[:-len(suffix)]
+                        break
+            words.append(word)
+    return ' '.join(words)
+
+
+def create_search_index(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_SETUP_SQL:
+            schema_editor.execute(sql)
+        schema_editor.add_index(Product, postgres_index())
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} '
+            f'USING fts5(title, keywords, body, tokenize="unicode61 remove_diacritics 2")'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(Product, postgres_index())
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+
+
+def backfill_search_index(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+
+    products = list(Product.objects.select_related('category', 'brand'))
+    for product in products:
+        names = [product.category.name, product.brand.name if product.brand_id else '']
+        product.search_keywords = ' '.join(name for name in names if name)
+    Product.objects.bulk_update(products, ['search_keywords'], batch_size=500)
+
+    # En PostgreSQL el índice es una expresión; solo SQLite guarda los documentos
+    if schema_editor.connection.vendor != 'sqlite' or not products:
+        return
+    rows = [
+        (
+            product.pk,
+            analyze(product.name, product.sku),
+            analyze(product.search_keywords),
+            analyze(product.short_description, product.description),
+        )
+        for product in products
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {SQLITE_TABLE} (rowid, title, keywords, body) VALUES (%s, %s, %s, %s)', rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_primary_image_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_keywords',
+            field=models.TextField(blank=True, editable=False, verbose_name='search keywords'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
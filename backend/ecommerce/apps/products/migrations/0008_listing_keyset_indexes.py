@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_status_a6991e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', '-is_featured', '-created_at', '-id'], name='products_status_aac880_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-is_featured', '-created_at', '-id'], name='products_is_feat_81320f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['product', 'is_approved', '-created_at', '-id'], name='product_rev_product_b01157_idx'),
+        ),
+    ]
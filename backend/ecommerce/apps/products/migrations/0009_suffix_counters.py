@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_listing_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuffixCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, verbose_name='scope')),
+                ('base', models.CharField(max_length=250, verbose_name='base')),
+                ('value', models.PositiveIntegerField(default=0, verbose_name='value')),
+            ],
+            options={
+                'verbose_name': 'Suffix Counter',
+                'verbose_name_plural': 'Suffix Counters',
+                'db_table': 'product_suffix_counters',
+                'unique_together': {('scope', 'base')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_suffix_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productreview',
+            index=models.Index(fields=['is_approved', '-created_at'], name='product_rev_is_appr_bacdf2_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_review_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='products.product')),
+                ('document', models.TextField(db_column='product_search_fts')),
+            ],
+            options={
+                'db_table': 'product_search_fts',
+                'managed': False,
+            },
+        ),
+    ]
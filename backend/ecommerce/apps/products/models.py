@@ -2,7 +2,11 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import Avg, Count, Q
 from decimal import Decimal
+from ecommerce.cache import invalidate_catalog_cache
+from .allocators import allocate_unique
+from .search import SQLITE_TABLE, SearchDocumentField, get_search_backend
 
 
 class Product(models.Model):
@@ -100,6 +104,28 @@ class Product(models.Model):
     meta_title = models.CharField(_('meta title'), max_length=200, blank=True)
     meta_description = models.TextField(_('meta description'), blank=True)
     
+    # Imagen principal (desnormalizada desde ProductImage)
+    primary_image_url = models.CharField(_('primary image URL'), max_length=500, blank=True)
+    
+    # Calificaciones (desnormalizadas desde ProductReview)
+    rating_avg = models.DecimalField(
+        _('rating average'),
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        help_text=_('Promedio de reseñas aprobadas')
+    )
+    rating_count = models.PositiveIntegerField(_('rating count'), default=0)
+    rating_histogram = models.JSONField(
+        _('rating histogram'),
+        default=dict,
+        blank=True,
+        help_text=_('Cantidad de reseñas aprobadas por estrella (1-5)')
+    )
+    
+    # Búsqueda (nombres de categoría y marca desnormalizados)
+    search_keywords = models.TextField(_('search keywords'), blank=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(_('created at'), auto_now_add=True)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
@@ -111,7 +137,9 @@ class Product(models.Model):
         db_table = 'products'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['status', 'is_featured']),
+            # Orden del listado (-is_featured, -created_at, -id) para la paginación por keyset
+            models.Index(fields=['status', '-is_featured', '-created_at', '-id']),
+            models.Index(fields=['-is_featured', '-created_at', '-id']),
             models.Index(fields=['category', 'status']),
             models.Index(fields=['brand', 'status']),
         ]
@@ -121,17 +149,35 @@ class Product(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.slug:
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+            self.slug = allocate_unique(Product, 'slug', slugify(self.name) or 'producto')
         if self.status == 'published' and not self.published_at:
             from django.utils import timezone
             self.published_at = timezone.now()
+        self.search_keywords = self.build_search_keywords()
         super().save(*args, **kwargs)
+        
+        # Mantener actualizado el índice de búsqueda
+        get_search_backend().index([self])
+    
+    def build_search_keywords(self):
+        """Nombres de categoría y marca que se indexan junto al producto."""
+        names = [self.category.name if self.category_id else '', self.brand.name if self.brand_id else '']
+        return ' '.join(name for name in names if name)
+    
+    @classmethod
+    def refresh_search_index(cls, product_ids):
+        """
+        Recalcula search_keywords y reindexa los productos indicados.
+        """
+        products = list(cls.objects.filter(pk__in=product_ids).select_related('category', 'brand'))
+        if not products:
+            return 0
+        for product in products:
+            product.search_keywords = product.build_search_keywords()
+        cls.objects.bulk_update(products, ['search_keywords'])
+        get_search_backend().index(products)
+        invalidate_catalog_cache('products')
+        return len(products)
     
     @property
     def is_in_stock(self):
@@ -160,6 +206,69 @@ class Product(models.Model):
         if self.cost_price and self.cost_price > 0:
             return round(((self.price - self.cost_price) / self.cost_price) * 100, 2)
         return 0
+    
+    @property
+    def average_rating(self):
+        """Promedio de calificación redondeado a un decimal."""
+        if not self.rating_count:
+            return 0
+        return round(float(self.rating_avg), 1)
+    
+    @classmethod
+    def refresh_primary_image(cls, product_id):
+        """Sincroniza primary_image_url con la imagen marcada como principal."""
+        primary_image = ProductImage.objects.filter(
+            product_id=product_id, is_primary=True
+        ).only('image').first()
+        url = primary_image.image.url if primary_image else ''
+        cls.objects.filter(pk=product_id).update(primary_image_url=url)
+        invalidate_catalog_cache('products')
+        return url
+    
+    def update_rating_stats(self):
+        """Recalcula las calificaciones desnormalizadas de este producto."""
+        Product.refresh_rating_stats([self.pk])
+        self.refresh_from_db(fields=['rating_avg', 'rating_count', 'rating_histogram'])
+    
+    @classmethod
+    def refresh_rating_stats(cls, product_ids):
+        """
+        Recalcula rating_avg, rating_count y rating_histogram para los
+        productos indicados con una sola agregación agrupada. Las señales de
+        ProductReview lo llaman al guardar o borrar reseñas (también en
+        cascada); tras un queryset.update() de reseñas hay que llamarlo a mano.
+        """
+        product_ids = [pk for pk in set(product_ids) if pk is not None]
+        if not product_ids:
+            return 0
+        
+        stars = range(1, 6)
+        rows = ProductReview.objects.filter(
+            product_id__in=product_ids, is_approved=True
+        ).values('product_id').annotate(
+            count=Count('id'),
+            avg=Avg('rating'),
+            **{f'star_{star}': Count('id', filter=Q(rating=star)) for star in stars}
+        ).order_by()
+        stats = {row['product_id']: row for row in rows}
+        
+        products = []
+        for pk in product_ids:
+            row = stats.get(pk)
+            product = cls(pk=pk)
+            if row:
+                product.rating_count = row['count']
+                product.rating_avg = Decimal(str(round(row['avg'], 2)))
+                product.rating_histogram = {str(star): row[f'star_{star}'] for star in stars}
+            else:
+                product.rating_count = 0
+                product.rating_avg = Decimal('0')
+                product.rating_histogram = {str(star): 0 for star in stars}
+            products.append(product)
+        
+        cls.objects.bulk_update(products, ['rating_avg', 'rating_count', 'rating_histogram'])
+        invalidate_catalog_cache('products')
+        return len(products)
 
 
 class ProductImage(models.Model):
@@ -194,6 +303,20 @@ class ProductImage(models.Model):
         if self.is_primary:
             ProductImage.objects.filter(product=self.product, is_primary=True).update(is_primary=False)
         super().save(*args, **kwargs)
+        
+        # Mantener sincronizada la URL de la imagen principal del producto
+        if self.is_primary:
+            Product.objects.filter(pk=self.product_id).update(primary_image_url=self.image.url)
+        else:
+            Product.refresh_primary_image(self.product_id)
+    
+    def delete(self, *args, **kwargs):
+        product_id = self.product_id
+        was_primary = self.is_primary
+        result = super().delete(*args, **kwargs)
+        if was_primary:
+            Product.refresh_primary_image(product_id)
+        return result
 
 
 class ProductVariant(models.Model):
@@ -342,9 +465,50 @@ class ProductReview(models.Model):
         db_table = 'product_reviews'
         unique_together = ['product', 'user']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', 'is_approved', '-created_at', '-id']),
+            models.Index(fields=['is_approved', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.product.name} ({self.rating}/5)"
 
 
+class ProductSearchDocument(models.Model):
+    """
+    Fila de la tabla FTS5 de búsqueda en SQLite (rowid = id del producto).
+    Solo sirve para hacer JOIN desde Product al buscar; la tabla la crea y
+    la mantiene el motor de búsqueda (search.py).
+    """
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_document'
+    )
+    document = SearchDocumentField(db_column=SQLITE_TABLE)
+    
+    class Meta:
+        managed = False
+        db_table = SQLITE_TABLE
+
 
+class SuffixCounter(models.Model):
+    """
+    Último sufijo numérico asignado a cada base de slug o SKU, para generar
+    valores únicos sin recorrer los existentes (ver allocators.py).
+    """
+    scope = models.CharField(_('scope'), max_length=50)
+    base = models.CharField(_('base'), max_length=250)
+    value = models.PositiveIntegerField(_('value'), default=0)
+    
+    class Meta:
+        verbose_name = _('Suffix Counter')
+        verbose_name_plural = _('Suffix Counters')
+        db_table = 'product_suffix_counters'
+        unique_together = ['scope', 'base']
+    
+    def __str__(self):
+        return f"{self.scope}:{self.base} = {self.value}"
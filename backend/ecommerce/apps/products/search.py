@@ -0,0 +1,218 @@
+"""
+Búsqueda de texto completo de productos.
+
+Cada producto tiene un documento de búsqueda con tres pesos: nombre y SKU
+(A), categoría y marca (B) y descripciones (C). Las categorías y marcas se
+desnormalizan en Product.search_keywords para no hacer joins al buscar.
+
+- PostgreSQL: índice GIN sobre el tsvector ponderado, con la configuración
+  `spanish_unaccent` (stemming en español y sin tildes).
+- SQLite: tabla virtual FTS5 cuyo contenido se normaliza y se reduce a su
+  raíz en Python, ordenada por bm25.
+- Otros motores: búsqueda por icontains como respaldo.
+"""
+
+import re
+import unicodedata
+
+from django.db import connection as default_connection, models
+from django.db.models import F, FloatField, Func, Lookup, Q, Value
+
+SEARCH_CONFIG = 'spanish_unaccent'
+SQLITE_TABLE = 'product_search_fts'
+
+# Pesos de las columnas (título, palabras clave, cuerpo) para bm25
+SQLITE_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Sufijos del español ordenados de mayor a menor longitud
+SPANISH_SUFFIXES = (
+    'amientos', 'imientos', 'aciones', 'uciones', 'amiento', 'imiento',
+    'adoras', 'adores', 'ancias', 'idades', 'mente', 'acion', 'ucion',
+    'adora', 'ador', 'ancia', 'idad', 'ables', 'ibles', 'able', 'ible',
+    'osas', 'osos', 'ivas', 'ivos', 'osa', 'oso', 'iva', 'ivo',
+    'es', 'os', 'as', 'a', 'o', 'e', 's',
+)
+MIN_STEM_LENGTH = 3
+
+
+class SearchDocumentField(models.TextField):
+    """
+    Columna oculta de una tabla FTS5 (se llama como la tabla). Admite el
+    lookup `match` y es el primer argumento de bm25. En las migraciones
+    figura como un TextField, para que no dependan de este módulo.
+    """
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        return name, 'django.db.models.TextField', args, kwargs
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+def fold(text):
+    """Pasa a minúsculas y elimina tildes y diéresis."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """Divide el texto normalizado en palabras."""
+    return re.findall(r'\w+', fold(text))
+
+
+def stem(word):
+    """Stemmer ligero para español: elimina plurales y sufijos frecuentes."""
+    if word.isdigit():
+        return word
+    for suffix in SPANISH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def analyze(*texts):
+    """Normaliza y reduce a su raíz las palabras de uno o varios textos."""
+    return ' '.join(stem(token) for text in texts for token in tokenize(text))
+
+
+def build_document(product):
+    """Retorna las columnas (título, palabras clave, cuerpo) del documento."""
+    return (
+        analyze(product.name, product.sku),
+        analyze(product.search_keywords),
+        analyze(product.short_description, product.description),
+    )
+
+
+class BaseSearchBackend:
+    """Interfaz común de los motores de búsqueda."""
+    vendor = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, products):
+        """Actualiza el documento de búsqueda de los productos indicados."""
+
+    def remove(self, product_ids):
+        """Elimina del índice los productos indicados."""
+
+    def clear(self):
+        """Vacía el índice antes de una reindexación completa."""
+
+    def search(self, queryset, value):
+        raise NotImplementedError
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Búsqueda por icontains para motores sin soporte de texto completo."""
+
+    def search(self, queryset, value):
+        condition = Q()
+        for token in value.split():
+            condition &= (
+                Q(name__icontains=token) |
+                Q(sku__icontains=token) |
+                Q(search_keywords__icontains=token) |
+                Q(description__icontains=token)
+            )
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    tsvector ponderado calculado por una expresión indexada con GIN. El
+    índice lo mantiene PostgreSQL, por lo que index() y remove() no hacen nada.
+    """
+    vendor = 'postgresql'
+
+    @staticmethod
+    def search_vector():
+        # Debe coincidir con la expresión del índice GIN creado en la migración 0007
+        from django.contrib.postgres.search import SearchVector
+
+        return (
+            SearchVector('name', 'sku', weight='A', config=SEARCH_CONFIG) +
+            SearchVector('search_keywords', weight='B', config=SEARCH_CONFIG) +
+            SearchVector('short_description', 'description', weight='C', config=SEARCH_CONFIG)
+        )
+
+    def search(self, queryset, value):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        tokens = tokenize(value)
+        if not tokens:
+            return queryset.none()
+        # Coincidencia por prefijo en cada palabra para búsquedas incrementales
+        query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config=SEARCH_CONFIG)
+        vector = self.search_vector()
+        return queryset.alias(search_vector=vector).filter(search_vector=query).annotate(
+            search_rank=SearchRank(vector, query)
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Tabla FTS5 con rowid = id del producto. El texto ya llega normalizado y
+    reducido a su raíz, así que el mismo análisis se aplica a las consultas.
+    """
+    vendor = 'sqlite'
+
+    def index(self, products):
+        rows = [(product.pk, *build_document(product)) for product in products]
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {SQLITE_TABLE} (rowid, title, keywords, body) VALUES (%s, %s, %s, %s)', rows
+            )
+
+    def remove(self, product_ids):
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [(pk,) for pk in product_ids])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE}')
+
+    def search(self, queryset, value):
+        terms = [stem(token) for token in tokenize(value)]
+        if not terms:
+            return queryset.none()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # JOIN con la tabla FTS (ProductSearchDocument): MATCH se evalúa una
+        # sola vez y bm25 sale de la misma fila. bm25 es negativo: cuanto
+        # menor, más relevante
+        bm25 = Func(
+            F('search_document__document'), *(Value(weight) for weight in SQLITE_WEIGHTS),
+            function='bm25', output_field=FloatField(),
+        )
+        return queryset.filter(search_document__document__match=match).annotate(search_rank=-bm25)
+
+
+SEARCH_BACKENDS = {
+    backend.vendor: backend for backend in (PostgresSearchBackend, SQLiteSearchBackend)
+}
+
+
+def get_search_backend(connection=None):
+    """Retorna el motor de búsqueda adecuado para la base de datos."""
+    connection = connection or default_connection
+    return SEARCH_BACKENDS.get(connection.vendor, FallbackSearchBackend)(connection)
+
+
+def search_products(queryset, value):
+    """
+    Filtra el queryset por el texto buscado y lo anota con `search_rank`
+    (mayor es más relevante).
+    """
+    return get_search_backend().search(queryset, value)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
-from django.db.models import Avg
 from django.db import IntegrityError
 from .models import Product, ProductImage, ProductVariant, ProductReview
+from .allocators import allocate_unique
 from ecommerce.apps.categories.models import Category, Brand, Size, Color
 from ecommerce.apps.users.models import User
 
@@ -107,8 +107,8 @@ class ProductListSerializer(serializers.ModelSerializer):
     discount_percentage = serializers.ReadOnlyField()
     is_in_stock = serializers.ReadOnlyField()
     is_low_stock = serializers.ReadOnlyField()
-    average_rating = serializers.SerializerMethodField()
-    total_reviews = serializers.SerializerMethodField()
+    average_rating = serializers.ReadOnlyField()
+    total_reviews = serializers.IntegerField(source='rating_count', read_only=True)
     
     class Meta:
         model = Product
@@ -123,19 +123,7 @@ class ProductListSerializer(serializers.ModelSerializer):
         ]
     
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
-        if primary_image:
-            return primary_image.image.url
-        return None
-    
-    def get_average_rating(self, obj):
-        reviews = obj.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'], 1)
-        return 0
-    
-    def get_total_reviews(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
+        return obj.primary_image_url or None
     
     def get_category_details(self, obj):
         if obj.category:
@@ -173,8 +161,8 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     margin_percentage = serializers.ReadOnlyField()
     is_in_stock = serializers.ReadOnlyField()
     is_low_stock = serializers.ReadOnlyField()
-    average_rating = serializers.SerializerMethodField()
-    total_reviews = serializers.SerializerMethodField()
+    average_rating = serializers.ReadOnlyField()
+    total_reviews = serializers.IntegerField(source='rating_count', read_only=True)
     
     class Meta:
         model = Product
@@ -187,19 +175,9 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'published_at', 'images', 'variants',
             'reviews', 'category_details', 'brand_details',
             'discount_percentage', 'margin_percentage', 'is_in_stock',
-            'is_low_stock', 'average_rating', 'total_reviews'
+            'is_low_stock', 'average_rating', 'total_reviews', 'rating_histogram'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'published_at']
-    
-    def get_average_rating(self, obj):
-        reviews = obj.reviews.filter(is_approved=True)
-        if reviews.exists():
-            return round(reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'], 1)
-        return 0
-    
-    def get_total_reviews(self, obj):
-        return obj.reviews.filter(is_approved=True).count()
-
+        read_only_fields = ['id', 'created_at', 'updated_at', 'published_at', 'rating_histogram']
 
 class ProductVariantWriteSerializer(serializers.ModelSerializer):
     """
@@ -282,9 +260,11 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         
         # Crear variantes
         for variant_data in variants_data:
-            # Generar SKU automáticamente si no se proporciona
+            # Generar SKU automáticamente si no se proporciona; si ya existe, generar uno único
             if 'sku' not in variant_data or not variant_data['sku']:
                 variant_data['sku'] = self.generate_variant_sku(product, variant_data)
+            elif ProductVariant.objects.filter(sku=variant_data['sku']).exists():
+                variant_data['sku'] = allocate_unique(ProductVariant, 'sku', variant_data['sku'])
             
             # Establecer valores por defecto para campos obligatorios
             variant_data.setdefault('inventory_quantity', 0)
@@ -297,27 +277,13 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
     
     def generate_product_sku(self, product_data):
         """
-        Genera un SKU único para el producto basado en el nombre y timestamp.
+        Genera un SKU único para el producto basado en el nombre.
         """
-        import time
         from django.utils.text import slugify
         
         # Crear base del SKU desde el nombre
-        base_sku = slugify(product_data.get('name', 'product')).upper()[:10]
-        
-        # Agregar timestamp para hacer único el SKU
-        timestamp = str(int(time.time()))[-6:]  # Últimos 6 dígitos del timestamp
-        
-        sku = f"{base_sku}-{timestamp}"
-        
-        # Verificar que el SKU sea único
-        counter = 1
-        original_sku = sku
-        while Product.objects.filter(sku=sku).exists():
-            sku = f"{original_sku}-{counter}"
-            counter += 1
-        
-        return sku
+        base_sku = slugify(product_data.get('name', 'product')).upper()[:10].rstrip('-') or 'PRODUCT'
+        return allocate_unique(Product, 'sku', base_sku)
     
     def generate_variant_sku(self, product, variant_data):
         """
@@ -357,11 +323,7 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
             except (Color.DoesNotExist, AttributeError):
                 pass
         
-        # Agregar timestamp para hacer único el SKU
-        import time
-        sku_parts.append(str(int(time.time()))[-4:])
-        
-        return '-'.join(sku_parts)
+        return allocate_unique(ProductVariant, 'sku', '-'.join(sku_parts))
     
     def update(self, instance, validated_data):
         images_data = validated_data.pop('images', [])
@@ -387,6 +349,7 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
             instance.images.all().delete()
             for image_data in images_data:
                 ProductImage.objects.create(product=instance, **image_data)
+            Product.refresh_primary_image(instance.pk)
         
         # Actualizar variantes si se proporcionan
         if variants_data:
@@ -443,19 +406,11 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
                             existing_variant_ids.append(existing_variant.id)
                             continue
                     
-                    # Generar SKU automáticamente si no se proporciona
+                    # Generar SKU automáticamente si no se proporciona; si ya existe, generar uno único
                     if 'sku' not in variant_data or not variant_data['sku']:
                         variant_data['sku'] = self.generate_variant_sku(instance, variant_data)
-                    
-                    # Verificar si el SKU ya existe y generar uno único
-                    original_sku = variant_data['sku']
-                    counter = 1
-                    while ProductVariant.objects.filter(sku=variant_data['sku']).exists():
-                        variant_data['sku'] = f"{original_sku}-{counter}"
-                        counter += 1
-                        if counter > 100:  # Prevenir bucle infinito
-                            variant_data['sku'] = self.generate_variant_sku(instance, variant_data)
-                            break
+                    elif ProductVariant.objects.filter(sku=variant_data['sku']).exists():
+                        variant_data['sku'] = allocate_unique(ProductVariant, 'sku', variant_data['sku'])
                     
                     # Establecer valores por defecto para campos obligatorios
                     variant_data.setdefault('inventory_quantity', 0)
@@ -496,16 +451,16 @@ class ProductSearchSerializer(serializers.ModelSerializer):
     brand_details = serializers.StringRelatedField(source='brand', read_only=True)
     primary_image = serializers.SerializerMethodField()
     discount_percentage = serializers.ReadOnlyField()
+    average_rating = serializers.ReadOnlyField()
+    total_reviews = serializers.IntegerField(source='rating_count', read_only=True)
     
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'slug', 'short_description', 'price', 'compare_price',
-            'category_details', 'brand_details', 'primary_image', 'discount_percentage'
+            'category_details', 'brand_details', 'primary_image', 'discount_percentage',
+            'average_rating', 'total_reviews'
         ]
     
     def get_primary_image(self, obj):
-        primary_image = obj.images.filter(is_primary=True).first()
-        if primary_image:
-            return primary_image.image.url
-        return None
+        return obj.primary_image_url or None
@@ -0,0 +1,110 @@
+"""
+Invalidación de la caché del catálogo, mantenimiento de los índices de
+búsqueda y sugerencias y de las calificaciones desnormalizadas de Product
+ante cambios en sus modelos.
+"""
+
+from django.db.models.signals import post_save, post_delete, pre_save
+
+from ecommerce.apps.categories.models import Category, Brand, Size, Color
+from ecommerce.cache import invalidate_catalog_cache
+from .models import Product, ProductImage, ProductReview, ProductVariant
+from .search import get_search_backend
+from .suggest import brand_entry, category_entry, product_entry, sync_on_commit
+
+# Modelo -> espacios de nombres de la caché afectados por sus cambios
+CATALOG_CACHE_DEPENDENCIES = {
+    Product: ('products',),
+    ProductVariant: ('products',),
+    ProductImage: ('products',),
+    Category: ('categories', 'products'),
+    Brand: ('brands', 'products'),
+    Size: ('sizes', 'products'),
+    Color: ('colors', 'products'),
+}
+
+
+def invalidate_catalog_on_change(sender, **kwargs):
+    invalidate_catalog_cache(*CATALOG_CACHE_DEPENDENCIES[sender])
+
+
+for model in CATALOG_CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_catalog_on_change, sender=model, dispatch_uid=f'catalog-cache-save-{model.__name__}')
+    post_delete.connect(invalidate_catalog_on_change, sender=model, dispatch_uid=f'catalog-cache-delete-{model.__name__}')
+
+
+def remove_product_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
+
+
+def remember_stored_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda el nombre almacenado para saber en post_save si cambió."""
+    instance._stored_name = None
+    if raw or not instance.pk or (update_fields is not None and 'name' not in update_fields):
+        return
+    instance._stored_name = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+def reindex_products_on_rename(sender, instance, created, **kwargs):
+    """Los nombres de categoría y marca forman parte del documento de búsqueda."""
+    stored_name = getattr(instance, '_stored_name', None)
+    if created or stored_name is None or stored_name == instance.name:
+        return
+    lookup = 'category' if sender is Category else 'brand'
+    product_ids = list(Product.objects.filter(**{lookup: instance}).values_list('pk', flat=True))
+    if product_ids:
+        Product.refresh_search_index(product_ids)
+
+
+post_delete.connect(remove_product_from_search_index, sender=Product, dispatch_uid='search-index-delete-Product')
+for model in (Category, Brand):
+    pre_save.connect(remember_stored_name, sender=model, dispatch_uid=f'search-index-name-{model.__name__}')
+    post_save.connect(reindex_products_on_rename, sender=model, dispatch_uid=f'search-index-rename-{model.__name__}')
+
+
+# Modelo -> (tipo, condición para estar indexado, constructor de la entrada)
+SUGGEST_SOURCES = {
+    Product: ('product', lambda product: product.status == 'published', product_entry),
+    Category: ('category', lambda category: category.is_active, category_entry),
+    Brand: ('brand', lambda brand: brand.is_active, brand_entry),
+}
+
+
+def sync_suggest_index(sender, instance, **kwargs):
+    kind, is_listed, build_entry = SUGGEST_SOURCES[sender]
+    sync_on_commit(kind, instance.pk, build_entry(instance) if is_listed(instance) else None)
+
+
+def remove_from_suggest_index(sender, instance, **kwargs):
+    kind = SUGGEST_SOURCES[sender][0]
+    sync_on_commit(kind, instance.pk, None)
+
+
+for model in SUGGEST_SOURCES:
+    post_save.connect(sync_suggest_index, sender=model, dispatch_uid=f'suggest-index-save-{model.__name__}')
+    post_delete.connect(remove_from_suggest_index, sender=model, dispatch_uid=f'suggest-index-delete-{model.__name__}')
+
+
+def remember_review_product(sender, instance, raw=False, **kwargs):
+    """Guarda el producto almacenado para recalcular también el anterior si cambia."""
+    instance._stored_product_id = None
+    if raw or not instance.pk:
+        return
+    instance._stored_product_id = sender.objects.filter(pk=instance.pk).values_list('product_id', flat=True).first()
+
+
+def refresh_ratings_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    Product.refresh_rating_stats([instance.product_id, getattr(instance, '_stored_product_id', None)])
+
+
+def refresh_ratings_on_delete(sender, instance, **kwargs):
+    # También se emite en los borrados en cascada y en queryset.delete();
+    # queryset.update() no emite señales y requiere Product.refresh_rating_stats
+    Product.refresh_rating_stats([instance.product_id])
+
+
+pre_save.connect(remember_review_product, sender=ProductReview, dispatch_uid='ratings-product-ProductReview')
+post_save.connect(refresh_ratings_on_save, sender=ProductReview, dispatch_uid='ratings-save-ProductReview')
+post_delete.connect(refresh_ratings_on_delete, sender=ProductReview, dispatch_uid='ratings-delete-ProductReview')
@@ -0,0 +1,208 @@
+"""
+Índice de prefijos para autocompletar el buscador de la tienda.
+
+Vive en Redis y no consulta la base de datos al responder:
+
+- `catalog:suggest:index`: sorted set con puntuación 0, de modo que los
+  miembros quedan en orden lexicográfico y ZRANGEBYLEX resuelve un prefijo
+  en O(log n). Cada miembro es `<término>\\x01<tipo>:<id>`, donde el término
+  es el nombre normalizado a partir de cada una de sus palabras.
+- `catalog:suggest:items`: hash `<tipo>:<id>` -> JSON con lo que se muestra
+  y los términos indexados (para poder retirarlos después).
+
+Productos publicados, categorías activas y marcas activas se indexan al
+guardarse y se retiran al despublicarse, desactivarse o eliminarse.
+"""
+
+import json
+import logging
+
+from django.db import transaction
+from redis.exceptions import RedisError
+
+from ecommerce.cache import CACHE_PREFIX
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+INDEX_KEY = f'{CACHE_PREFIX}:suggest:index'
+ITEMS_KEY = f'{CACHE_PREFIX}:suggest:items'
+SEPARATOR = '\x01'
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+# Palabras iniciales del nombre a partir de las cuales se indexa
+MAX_TERMS_PER_ITEM = 6
+
+
+def get_connection():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def build_terms(name, *extra):
+    """
+    Términos de un elemento: el nombre normalizado desde cada una de sus
+    palabras, para que "clas" encuentre "Zapatos Clásicos".
+    """
+    tokens = tokenize(name)
+    terms = {' '.join(tokens[start:]) for start in range(min(len(tokens), MAX_TERMS_PER_ITEM))}
+    terms.update(' '.join(tokenize(value)) for value in extra if value)
+    return sorted(term for term in terms if term)
+
+
+def product_entry(product):
+    return 'product', product.pk, {'name': product.name, 'slug': product.slug}, build_terms(product.name, product.sku)
+
+
+def category_entry(category):
+    return 'category', category.pk, {'name': category.name, 'slug': category.slug}, build_terms(category.name)
+
+
+def brand_entry(brand):
+    return 'brand', brand.pk, {'name': brand.name, 'slug': brand.slug}, build_terms(brand.name)
+
+
+def _item_key(kind, pk):
+    return f'{kind}:{pk}'
+
+
+def _indexed_terms(conn, item_keys):
+    """Términos indexados actualmente para cada elemento."""
+    payloads = conn.hmget(ITEMS_KEY, item_keys) if item_keys else []
+    return {
+        item_key: json.loads(payload)['terms']
+        for item_key, payload in zip(item_keys, payloads)
+        if payload
+    }
+
+
+def index_entries(entries):
+    """Agrega o reemplaza elementos (tipo, id, datos, términos) en el índice."""
+    entries = list(entries)
+    if not entries:
+        return
+    conn = get_connection()
+    item_keys = [_item_key(kind, pk) for kind, pk, _, _ in entries]
+    previous = _indexed_terms(conn, item_keys)
+
+    pipe = conn.pipeline()
+    for item_key, (kind, pk, data, terms) in zip(item_keys, entries):
+        stale = set(previous.get(item_key, [])) - set(terms)
+        if stale:
+            pipe.zrem(INDEX_KEY, *[f'{term}{SEPARATOR}{item_key}' for term in stale])
+        if terms:
+            pipe.zadd(INDEX_KEY, {f'{term}{SEPARATOR}{item_key}': 0 for term in terms})
+        pipe.hset(ITEMS_KEY, item_key, json.dumps({'type': kind, 'id': pk, **data, 'terms': terms}))
+    pipe.execute()
+
+
+def remove_entries(kind, pks):
+    """Retira elementos del índice."""
+    item_keys = [_item_key(kind, pk) for pk in pks]
+    if not item_keys:
+        return
+    conn = get_connection()
+    previous = _indexed_terms(conn, item_keys)
+
+    pipe = conn.pipeline()
+    for item_key, terms in previous.items():
+        if terms:
+            pipe.zrem(INDEX_KEY, *[f'{term}{SEPARATOR}{item_key}' for term in terms])
+    pipe.hdel(ITEMS_KEY, *item_keys)
+    pipe.execute()
+
+
+def sync_on_commit(kind, pk, entry):
+    """
+    Indexa (entry) o retira (entry=None) un elemento cuando la transacción
+    se confirma. Si Redis no está disponible solo se registra el fallo: el
+    índice se recupera con `rebuild_suggest_index`.
+    """
+    def sync():
+        try:
+            if entry:
+                index_entries([entry])
+            else:
+                remove_entries(kind, [pk])
+        except (RedisError, NotImplementedError) as e:
+            logger.warning('No se pudo actualizar el índice de sugerencias (%s:%s): %s', kind, pk, e)
+
+    transaction.on_commit(sync)
+
+
+def sync_batch_on_commit(kind, entries, removed_pks):
+    """Como sync_on_commit, para un lote completo (p. ej. una importación)."""
+    def sync():
+        try:
+            index_entries(entries)
+            remove_entries(kind, removed_pks)
+        except (RedisError, NotImplementedError) as e:
+            logger.warning('No se pudo actualizar el índice de sugerencias (%s): %s', kind, e)
+
+    transaction.on_commit(sync)
+
+
+def suggest(query, limit=DEFAULT_LIMIT):
+    """
+    Retorna hasta `limit` sugerencias cuyo nombre (o alguna de sus palabras)
+    empieza por `query`. Retorna una lista vacía si Redis no está disponible.
+    """
+    prefix = ' '.join(tokenize(query)).encode()
+    if not prefix:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    try:
+        conn = get_connection()
+        # Se piden miembros de más porque un elemento aparece una vez por término
+        members = conn.zrangebylex(
+            INDEX_KEY, b'[' + prefix, b'[' + prefix + b'\xff', start=0, num=limit * MAX_TERMS_PER_ITEM
+        )
+        item_keys = []
+        for member in members:
+            item_key = member.decode().split(SEPARATOR, 1)[1]
+            if item_key not in item_keys:
+                item_keys.append(item_key)
+                if len(item_keys) >= limit:
+                    break
+        payloads = conn.hmget(ITEMS_KEY, item_keys) if item_keys else []
+    except (RedisError, NotImplementedError) as e:
+        logger.warning('Índice de sugerencias no disponible: %s', e)
+        return []
+
+    suggestions = []
+    for payload in payloads:
+        if payload:
+            item = json.loads(payload)
+            item.pop('terms', None)
+            suggestions.append(item)
+    return suggestions
+
+
+def rebuild_index(batch_size=500):
+    """Reconstruye el índice completo desde la base de datos."""
+    from ecommerce.apps.categories.models import Brand, Category
+    from .models import Product
+
+    conn = get_connection()
+    conn.delete(INDEX_KEY, ITEMS_KEY)
+
+    sources = (
+        (Product.objects.filter(status='published').only('name', 'slug', 'sku'), product_entry),
+        (Category.objects.filter(is_active=True).only('name', 'slug'), category_entry),
+        (Brand.objects.filter(is_active=True).only('name', 'slug'), brand_entry),
+    )
+    total = 0
+    for queryset, build_entry in sources:
+        batch = []
+        for obj in queryset.order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(build_entry(obj))
+            if len(batch) >= batch_size:
+                index_entries(batch)
+                total += len(batch)
+                batch = []
+        index_entries(batch)
+        total += len(batch)
+    return total
@@ -5,7 +5,12 @@ urlpatterns = [
     # Productos
     path('', views.ProductListView.as_view(), name='product-list'),
     path('search/', views.ProductSearchView.as_view(), name='product-search'),
+    path('suggest/', views.product_suggestions, name='product-suggestions'),
+    path('facets/', views.product_facets, name='product-facets'),
     path('featured/', views.featured_products, name='featured-products'),
+    path('import/', views.catalog_import, name='catalog-import'),
+    path('export/', views.catalog_export, name='catalog-export'),
+    path('cache-stats/', views.catalog_cache_stats, name='catalog-cache-stats'),
     path('<int:pk>/', views.ProductDetailView.as_view(), name='product-detail'),
     path('<int:product_id>/related/', views.related_products, name='related-products'),
     path('<int:product_id>/stats/', views.product_stats, name='product-stats'),
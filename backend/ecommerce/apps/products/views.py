@@ -1,31 +1,41 @@
+import io
+
 from rest_framework import generics, status, permissions, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Avg, Count
+from django.db.models import Q, Avg, Count, Prefetch
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from .models import Product, ProductImage, ProductVariant, ProductReview
 from .serializers import (
     ProductListSerializer, ProductDetailSerializer, ProductCreateUpdateSerializer,
     ProductImageSerializer, ProductVariantSerializer, ProductReviewSerializer,
     ProductSearchSerializer
 )
-from .filters import ProductFilter
+from .filters import ProductFilter, SearchRankOrderingFilter
 from .permissions import IsVendorOrReadOnly, IsProductOwnerOrReadOnly
+from .suggest import DEFAULT_LIMIT, suggest
+from .facets import compute_facets, filter_signature
+from .catalog_io import (
+    FORMATS as CATALOG_FORMATS, MAX_REPORTED_ERRORS, CatalogImporter, detect_format, iter_export, read_rows
+)
 from ecommerce.apps.categories.models import Category, Brand, Size, Color
+from ecommerce.pagination import ListingPagination
+from ecommerce.cache import CatalogCacheMixin, cache_catalog_response, cached_response, get_cache_stats
 
 
 class ProductListView(generics.ListCreateAPIView):
     """
     Vista para listar y crear productos.
     """
-    queryset = Product.objects.select_related('category', 'brand').prefetch_related('images', 'variants__size', 'variants__color')
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    queryset = Product.objects.select_related('category', 'brand').prefetch_related('variants__size', 'variants__color')
+    filter_backends = [DjangoFilterBackend, SearchRankOrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ['name', 'description', 'short_description', 'sku']
     ordering_fields = ['name', 'price', 'created_at', 'is_featured']
     ordering = ['-is_featured', '-created_at']
+    pagination_class = ListingPagination
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
@@ -58,7 +68,8 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     Vista para obtener, actualizar y eliminar un producto específico.
     """
     queryset = Product.objects.select_related('category', 'brand').prefetch_related(
-        'images', 'variants__size', 'variants__color', 'reviews'
+        'images', 'variants__size', 'variants__color',
+        Prefetch('reviews', queryset=ProductReview.objects.select_related('user'))
     )
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
@@ -68,26 +79,23 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
         return ProductDetailSerializer
 
 
-class ProductSearchView(generics.ListAPIView):
+class ProductSearchView(CatalogCacheMixin, generics.ListAPIView):
     """
     Vista para búsqueda avanzada de productos.
     """
+    cache_namespace = 'products'
     serializer_class = ProductSearchSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchRankOrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ['name', 'description', 'short_description', 'sku']
     ordering_fields = ['name', 'price', 'created_at']
     ordering = ['-created_at']
     
     def get_queryset(self):
-        queryset = Product.objects.filter(status='published').select_related('category', 'brand').prefetch_related('images')
-        
-        # Filtros adicionales
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(category__slug=category)
+        queryset = Product.objects.filter(status='published').select_related('category', 'brand')
         
+        # Filtros adicionales (la categoría, por id o slug y con sus
+        # subcategorías, la resuelve ProductFilter)
         brand = self.request.query_params.get('brand')
         if brand:
             queryset = queryset.filter(brand__slug=brand)
@@ -184,6 +192,7 @@ class ProductReviewView(generics.ListCreateAPIView):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at', 'rating']
     ordering = ['-created_at']
+    pagination_class = ListingPagination
     
     def get_queryset(self):
         product_id = self.kwargs['product_id']
@@ -211,13 +220,14 @@ class ProductReviewDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_catalog_response('products')
 def featured_products(request):
     """
     Vista para obtener productos destacados.
     """
     products = Product.objects.filter(
         status='published', is_featured=True
-    ).select_related('category', 'brand').prefetch_related('images')[:8]
+    ).select_related('category', 'brand').prefetch_related('variants__size', 'variants__color')[:8]
     
     serializer = ProductListSerializer(products, many=True)
     return Response(serializer.data)
@@ -225,6 +235,7 @@ def featured_products(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_catalog_response('products')
 def related_products(request, product_id):
     """
     Vista para obtener productos relacionados.
@@ -234,7 +245,9 @@ def related_products(request, product_id):
         related_products = Product.objects.filter(
             category=product.category,
             status='published'
-        ).exclude(id=product_id).select_related('category', 'brand').prefetch_related('images')[:4]
+        ).exclude(id=product_id).select_related('category', 'brand').prefetch_related(
+            'variants__size', 'variants__color'
+        )[:4]
         
         serializer = ProductListSerializer(related_products, many=True)
         return Response(serializer.data)
@@ -330,11 +343,6 @@ def product_stats(request, product_id):
     except Product.DoesNotExist:
         return Response({'error': 'Producto no encontrado'}, status=status.HTTP_404_NOT_FOUND)
     
-    # Estadísticas de reseñas
-    reviews = product.reviews.filter(is_approved=True)
-    total_reviews = reviews.count()
-    average_rating = reviews.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
-    
     # Estadísticas de ventas (si tienes un modelo de OrderItem)
     # total_sold = OrderItem.objects.filter(product=product).aggregate(
     #     total=Sum('quantity')
@@ -346,8 +354,9 @@ def product_stats(request, product_id):
     
     return Response({
         'reviews': {
-            'total': total_reviews,
-            'average_rating': round(average_rating, 1),
+            'total': product.rating_count,
+            'average_rating': product.average_rating,
+            'histogram': product.rating_histogram,
         },
         'variants': {
             'total': total_variants,
@@ -359,3 +368,102 @@ def product_stats(request, product_id):
             'in_stock': product.is_in_stock,
         },
     })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def catalog_cache_stats(request):
+    """
+    Vista para consultar aciertos y fallos de la caché del catálogo.
+    """
+    return Response(get_cache_stats())
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def catalog_import(request):
+    """
+    Vista para importar el catálogo desde un archivo CSV o JSONL (`file`).
+    Con `dry_run=true` solo valida. Para archivos muy grandes conviene el
+    comando `import_catalog`.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': 'No se proporcionó el archivo'}, status=status.HTTP_400_BAD_REQUEST)
+    fmt = request.data.get('file_format') or detect_format(upload.name)
+    if fmt not in CATALOG_FORMATS:
+        return Response({'error': f'Formato no válido. Use {", ".join(CATALOG_FORMATS)}.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    importer = CatalogImporter(dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes'))
+    stream = io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')
+    try:
+        stats = importer.run(read_rows(stream, fmt))
+    except UnicodeDecodeError:
+        return Response({'error': 'El archivo debe estar codificado en UTF-8'}, status=status.HTTP_400_BAD_REQUEST)
+    finally:
+        stream.detach()
+    
+    return Response({
+        'stats': stats,
+        'errors': importer.errors,
+        'errors_truncated': len(importer.errors) >= MAX_REPORTED_ERRORS,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def catalog_export(request):
+    """
+    Vista para descargar el catálogo en CSV o JSONL (`file_format`). La
+    respuesta se genera fila a fila, sin cargar el catálogo en memoria.
+    """
+    fmt = request.query_params.get('file_format', 'csv')
+    if fmt not in CATALOG_FORMATS:
+        return Response({'error': f'Formato no válido. Use {", ".join(CATALOG_FORMATS)}.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    queryset = Product.objects.all()
+    if request.query_params.get('status'):
+        queryset = queryset.filter(status=request.query_params['status'])
+    
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = StreamingHttpResponse(iter_export(fmt, queryset), content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="catalogo.{fmt}"'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def product_suggestions(request):
+    """
+    Vista de autocompletado: productos, categorías y marcas cuyo nombre
+    empieza por `q`. Se resuelve desde el índice en Redis, sin consultar
+    la base de datos.
+    """
+    query = request.query_params.get('q', '')
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    return Response({'query': query, 'results': suggest(query, limit)})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def product_facets(request):
+    """
+    Vista de facetas: conteos por categoría, marca, género, talla, color y
+    rango de precio de los productos publicados que cumplen los filtros de
+    ProductFilter. Se cachea por la firma normalizada de los filtros.
+    """
+    filterset = ProductFilter(
+        request.query_params, queryset=Product.objects.filter(status='published'), request=request
+    )
+    if not filterset.is_valid():
+        return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    return cached_response(
+        request, 'products', lambda: Response(compute_facets(filterset.qs)),
+        anonymous_only=False, params=filter_signature(filterset)
+    )
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 import json
-from .models import Report, Claim
+from .models import Report, Claim, DailySalesRollup
 
 
 @admin.register(Report)
@@ -10,14 +10,20 @@ class ReportAdmin(admin.ModelAdmin):
     """
     Configuración del admin para el modelo Report.
     """
-    list_display = ['name', 'report_type', 'generated_by', 'data_preview', 'created_at']
-    list_filter = ['report_type', 'created_at', 'generated_by']
-    search_fields = ['name', 'description', 'generated_by__email']
-    readonly_fields = ['generated_by', 'data_preview', 'created_at', 'updated_at']
+    list_display = ['name', 'report_type', 'status', 'generated_by', 'data_preview', 'created_at']
+    list_filter = ['report_type', 'status', 'is_scheduled', 'created_at', 'generated_by']
+    search_fields = ['name', 'generated_by__email']
+    readonly_fields = [
+        'generated_by', 'data_preview', 'status', 'error', 'started_at', 'completed_at',
+        'created_at', 'updated_at'
+    ]
     
     fieldsets = (
         (_('Información del reporte'), {
-            'fields': ('name', 'description', 'report_type', 'generated_by')
+            'fields': ('name', 'report_type', 'generated_by', 'filters', 'is_scheduled', 'schedule_frequency')
+        }),
+        (_('Generación'), {
+            'fields': ('status', 'error', 'started_at', 'completed_at')
         }),
         (_('Datos'), {
             'fields': ('data', 'data_preview'),
@@ -142,3 +148,17 @@ class ClaimAdmin(admin.ModelAdmin):
         updated = queryset.update(status='pending', resolved_by=None, resolved_at=None)
         self.message_user(request, f"{updated} reclamos marcados como pendientes.")
     mark_as_pending.short_description = _("Marcar como pendientes")
+
+
+@admin.register(DailySalesRollup)
+class DailySalesRollupAdmin(admin.ModelAdmin):
+    """
+    Configuración del admin para el modelo DailySalesRollup. Los agregados
+    se recalculan desde los pedidos; no se editan a mano.
+    """
+    list_display = ['date', 'revenue', 'orders', 'units', 'customers', 'updated_at']
+    date_hierarchy = 'date'
+    readonly_fields = ['date', 'revenue', 'orders', 'units', 'customers', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
@@ -5,3 +5,6 @@ class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ecommerce.apps.reports'
     verbose_name = 'Reportes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,172 @@
+"""
+Exportaciones masivas en CSV o NDJSON (pedidos, items, pagos y reclamos).
+
+Cada exportación es una sola consulta con `values_list` (solo las columnas
+del archivo, con los JOIN necesarios) recorrida con `.iterator()`: en
+PostgreSQL usa un cursor del lado del servidor y trae las filas por
+bloques, así que la memoria no depende del número de filas. El archivo se
+genera a medida que se envía, en fragmentos de ~64 KB.
+"""
+
+import csv
+import io
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from ecommerce.apps.orders.models import Order, OrderItem
+from ecommerce.apps.payments.models import Payment
+from .models import Claim
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+DEFAULT_CHUNK_SIZE = 2000
+# Tamaño aproximado de cada fragmento enviado al cliente
+BUFFER_SIZE = 64 * 1024
+
+
+class ExportDataset:
+    """Columnas (nombre en el archivo -> campo) y consulta de una exportación."""
+
+    def __init__(self, model, columns, date_field='created_at', status_field='status'):
+        self.model = model
+        self.columns = columns
+        self.date_field = date_field
+        self.status_field = status_field
+
+    @property
+    def headers(self):
+        return list(self.columns)
+
+    def queryset(self, start_date=None, end_date=None, status=None):
+        queryset = self.model._default_manager.all()
+        # Rango de fechas como datetimes (no __date), para poder usar el índice
+        if start_date:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': _start_of_day(start_date)})
+        if end_date:
+            queryset = queryset.filter(**{f'{self.date_field}__lt': _start_of_day(end_date + timedelta(days=1))})
+        if status:
+            queryset = queryset.filter(**{self.status_field: status})
+        return queryset.order_by('pk').values_list(*self.columns.values())
+
+
+def _start_of_day(date):
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+DATASETS = {
+    'orders': ExportDataset(Order, {
+        'id': 'id',
+        'order_number': 'order_number',
+        'created_at': 'created_at',
+        'status': 'status',
+        'payment_status': 'payment_status',
+        'user_id': 'user_id',
+        'email': 'email',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'shipping_city': 'shipping_city',
+        'shipping_state': 'shipping_state',
+        'shipping_country': 'shipping_country',
+        'subtotal': 'subtotal',
+        'tax_amount': 'tax_amount',
+        'shipping_amount': 'shipping_amount',
+        'discount_amount': 'discount_amount',
+        'total_amount': 'total_amount',
+        'tracking_number': 'tracking_number',
+        'shipped_at': 'shipped_at',
+        'delivered_at': 'delivered_at',
+    }),
+    'order-items': ExportDataset(OrderItem, {
+        'id': 'id',
+        'order_id': 'order_id',
+        'order_number': 'order__order_number',
+        'order_status': 'order__status',
+        'created_at': 'order__created_at',
+        'product_id': 'product_id',
+        'variant_id': 'variant_id',
+        'product_sku': 'product_sku',
+        'product_name': 'product_name',
+        'variant_info': 'variant_info',
+        'quantity': 'quantity',
+        'unit_price': 'unit_price',
+        'total_price': 'total_price',
+    }, date_field='order__created_at', status_field='order__status'),
+    'payments': ExportDataset(Payment, {
+        'id': 'id',
+        'payment_id': 'payment_id',
+        'order_number': 'order__order_number',
+        'user_id': 'user_id',
+        'created_at': 'created_at',
+        'processed_at': 'processed_at',
+        'amount': 'amount',
+        'currency': 'currency',
+        'method': 'method',
+        'provider': 'provider',
+        'status': 'status',
+        'provider_transaction_id': 'provider_transaction_id',
+        'card_brand': 'card_brand',
+        'card_last_four': 'card_last_four',
+    }),
+    'claims': ExportDataset(Claim, {
+        'id': 'id',
+        'created_at': 'created_at',
+        'user_id': 'user_id',
+        'user_email': 'user__email',
+        'order_number': 'order__order_number',
+        'product_sku': 'product__sku',
+        'claim_type': 'claim_type',
+        'priority': 'priority',
+        'status': 'status',
+        'title': 'title',
+        'resolved_by_id': 'resolved_by_id',
+        'resolved_at': 'resolved_at',
+    }),
+}
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(headers, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        if buffer.tell() >= BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(headers, rows):
+    encode = DjangoJSONEncoder().encode
+    lines, size = [], 0
+    for row in rows:
+        line = encode(dict(zip(headers, row)))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= BUFFER_SIZE:
+            yield '\n'.join(lines) + '\n'
+            lines, size = [], 0
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_export(dataset, fmt, chunk_size=DEFAULT_CHUNK_SIZE, **filters):
+    """Genera el archivo de una exportación como fragmentos de texto."""
+    dataset = DATASETS[dataset]
+    rows = dataset.queryset(**filters).iterator(chunk_size=chunk_size)
+    if fmt == 'csv':
+        return iter_csv(dataset.headers, rows)
+    return iter_ndjson(dataset.headers, rows)
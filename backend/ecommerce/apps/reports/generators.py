@@ -0,0 +1,467 @@
+"""
+Cálculo de los reportes de administración.
+
+Cada generador recibe filtros ya interpretados y retorna un diccionario
+listo para serializar. Los usan tanto las vistas síncronas como la tarea
+`generate_report`, que guarda el resultado en Report.data.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min, Q, Sum, Window
+from django.db.models.functions import CumeDist
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ecommerce.apps.products.models import Product, ProductReview, ProductVariant
+from ecommerce.apps.users.models import User
+from . import timeseries
+from .models import Claim, DailyCustomerSalesRollup, DailyProductSalesRollup, DailySalesRollup, Report
+
+logger = logging.getLogger(__name__)
+
+
+def parse_period(params, default_days=30):
+    """
+    Interpreta `start_date` y `end_date` (YYYY-MM-DD) de un dict de
+    parámetros. Sin `end_date` se usa hoy y sin `start_date`, `default_days`
+    días antes. Lanza ValueError si alguna fecha no es válida.
+    """
+    start_value = params.get('start_date') or ''
+    end_value = params.get('end_date') or ''
+    try:
+        end_date = parse_date(end_value) if end_value else timezone.localdate()
+        start_date = parse_date(start_value) if start_value else end_date - timedelta(days=default_days)
+    except ValueError:
+        end_date = start_date = None
+    if start_date is None or end_date is None:
+        raise ValueError('Las fechas deben tener el formato YYYY-MM-DD.')
+    if start_date > end_date:
+        raise ValueError('start_date debe ser anterior a end_date.')
+    return start_date, end_date
+
+
+# Valores de `type` en el reporte de ventas -> agrupación de la serie
+SALES_GRANULARITIES = {'daily': 'day', 'weekly': 'week', 'monthly': 'month'}
+
+
+def parse_granularity(params):
+    """Agrupación de la serie de ventas según `type` (daily por defecto)."""
+    value = params.get('type') or 'daily'
+    if value not in SALES_GRANULARITIES:
+        raise ValueError(f'type debe ser uno de: {", ".join(SALES_GRANULARITIES)}.')
+    return SALES_GRANULARITIES[value]
+
+
+def sales_report(start_date, end_date, granularity='day'):
+    """
+    Ventas del período a partir de los agregados diarios (sin pedidos
+    cancelados ni reembolsados), agrupadas por día, semana o mes.
+    """
+    # Ventas por período, con los períodos sin ventas en cero
+    daily_sales = timeseries.series(
+        DailySalesRollup.objects.all(), 'date', start_date, end_date, granularity, key='day',
+        total=Sum('revenue'), count=Sum('orders')
+    )
+
+    total_sales = sum((day['total'] for day in daily_sales), 0)
+    total_orders = sum(day['count'] for day in daily_sales)
+    average_order_value = total_sales / total_orders if total_orders else 0
+
+    return {
+        'period': {
+            'start_date': start_date,
+            'end_date': end_date,
+            'granularity': granularity
+        },
+        'summary': {
+            'total_sales': total_sales,
+            'total_orders': total_orders,
+            'average_order_value': average_order_value
+        },
+        'daily_sales': daily_sales
+    }
+
+
+def products_report():
+    """Productos más vendidos, con stock bajo e inactivos."""
+    # Productos más vendidos (agregados diarios)
+    top_products = DailyProductSalesRollup.objects.values('product_id', 'product__name').annotate(
+        total_sold=Sum('units')
+    ).order_by('-total_sold')[:10]
+
+    # Productos con stock bajo
+    low_stock_products = Product.objects.filter(
+        inventory_quantity__lte=F('low_stock_threshold')
+    ).values('id', 'name', 'inventory_quantity', 'low_stock_threshold')
+
+    # Productos inactivos
+    inactive_products = Product.objects.exclude(status='published').values('id', 'name', 'status')
+
+    return {
+        'top_products': [
+            {
+                'id': product['product_id'],
+                'name': product['product__name'],
+                'total_sold': product['total_sold'] or 0
+            }
+            for product in top_products
+        ],
+        'low_stock_products': [
+            {
+                'id': product['id'],
+                'name': product['name'],
+                'current_stock': product['inventory_quantity'],
+                'low_stock_threshold': product['low_stock_threshold']
+            }
+            for product in low_stock_products
+        ],
+        'inactive_products': list(inactive_products)
+    }
+
+
+def users_report():
+    """Clientes con más compras, nuevos e inactivos."""
+    # Usuarios más activos (agregados diarios)
+    top_users = DailyCustomerSalesRollup.objects.values(
+        'user_id', 'user__first_name', 'user__last_name', 'user__email'
+    ).annotate(
+        total_orders=Sum('orders'),
+        total_spent=Sum('revenue')
+    ).order_by('-total_spent')[:10]
+
+    # Nuevos usuarios
+    new_users = User.objects.filter(
+        date_joined__gte=timeseries.start_of_day(timezone.localdate() - timedelta(days=30))
+    ).count()
+
+    # Usuarios inactivos
+    inactive_users = User.objects.filter(
+        last_login__lt=timeseries.start_of_day(timezone.localdate() - timedelta(days=90))
+    ).count()
+
+    return {
+        'top_users': [
+            {
+                'id': user['user_id'],
+                'name': f"{user['user__first_name']} {user['user__last_name']}".strip(),
+                'email': user['user__email'],
+                'total_orders': user['total_orders'] or 0,
+                'total_spent': user['total_spent'] or 0
+            }
+            for user in top_users
+        ],
+        'summary': {
+            'new_users': new_users,
+            'inactive_users': inactive_users
+        }
+    }
+
+
+def reviews_report(top=10):
+    """
+    Estadísticas de reseñas con un número fijo de consultas: resumen e
+    histograma de calificaciones en una sola agregación condicional, y los
+    `top` productos más reseñados desde sus calificaciones desnormalizadas
+    (rating_count y rating_avg), sin agregar por producto.
+    """
+    stars = range(1, 6)
+    approved = Q(is_approved=True)
+    totals = ProductReview.objects.aggregate(
+        total=Count('id'),
+        approved=Count('id', filter=approved),
+        average=Avg('rating', filter=approved),
+        **{f'star_{star}': Count('id', filter=approved & Q(rating=star)) for star in stars}
+    )
+
+    # Productos con más reviews
+    top_reviewed_products = Product.objects.filter(rating_count__gt=0).order_by(
+        '-rating_count', '-rating_avg', 'id'
+    ).values('id', 'name', 'rating_count', 'rating_avg')[:top]
+
+    # Reviews recientes
+    recent_reviews = ProductReview.objects.filter(
+        is_approved=True
+    ).select_related('user', 'product').order_by('-created_at')[:10]
+
+    # Reviews por mes
+    monthly_reviews = timeseries.monthly_series(
+        ProductReview.objects.filter(is_approved=True), 'created_at',
+        count=Count('id'), avg_rating=Avg('rating')
+    )
+
+    return {
+        'summary': {
+            'total_reviews': totals['total'],
+            'approved_reviews': totals['approved'],
+            'pending_reviews': totals['total'] - totals['approved'],
+            'average_rating': round(totals['average'] or 0, 2)
+        },
+        'rating_distribution': [
+            {'rating': star, 'count': totals[f'star_{star}']} for star in stars
+        ],
+        'top_reviewed_products': [
+            {
+                'id': product['id'],
+                'name': product['name'],
+                'review_count': product['rating_count'],
+                'average_rating': float(product['rating_avg'])
+            }
+            for product in top_reviewed_products
+        ],
+        'recent_reviews': [
+            {
+                'id': review.id,
+                'user_name': review.user.get_full_name(),
+                'product_name': review.product.name,
+                'rating': review.rating,
+                'title': review.title,
+                'created_at': review.created_at
+            }
+            for review in recent_reviews
+        ],
+        'monthly_reviews': monthly_reviews
+    }
+
+
+def _choice_counts(field, choices):
+    """Un Count condicional por cada valor de `choices` (alias `{field}__{valor}`)."""
+    return {f'{field}__{value}': Count('id', filter=Q(**{field: value})) for value, label in choices}
+
+
+def _distribution(totals, field, choices):
+    """Distribución [{field, count}] ordenada de mayor a menor, sin valores vacíos."""
+    rows = [{field: value, 'count': totals[f'{field}__{value}']} for value, label in choices]
+    return sorted((row for row in rows if row['count']), key=lambda row: -row['count'])
+
+
+def _hours(duration):
+    return round(duration.total_seconds() / 3600, 2) if duration is not None else None
+
+
+def claims_report():
+    """
+    Estadísticas de reclamos en tres consultas: conteos por estado, tipo y
+    prioridad con agregados condicionales; tiempos de resolución (promedio,
+    mediana y p90) calculados en la base de datos; y la serie mensual.
+    """
+    totals = Claim.objects.aggregate(
+        total=Count('id'),
+        **_choice_counts('status', Claim.CLAIM_STATUS),
+        **_choice_counts('claim_type', Claim.CLAIM_TYPES),
+        **_choice_counts('priority', Claim.PRIORITY_LEVELS),
+    )
+
+    # Percentiles por rango más cercano: el menor tiempo cuya distribución
+    # acumulada (CUME_DIST) alcanza el percentil. Funciona en SQLite y PostgreSQL.
+    resolved = Claim.objects.filter(status='resolved', resolved_at__isnull=False).annotate(
+        resolution_time=ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+    ).annotate(
+        cume=Window(CumeDist(), order_by=F('resolution_time').asc())
+    )
+    resolution = resolved.aggregate(
+        avg=Avg('resolution_time'),
+        median=Min('resolution_time', filter=Q(cume__gte=0.5)),
+        p90=Min('resolution_time', filter=Q(cume__gte=0.9)),
+    )
+
+    # Reclamos por mes (últimos 12 meses, en la zona horaria del sitio)
+    monthly_claims = timeseries.monthly_series(Claim.objects.all(), 'created_at', count=Count('id'))
+
+    # Reclamos recientes
+    recent_claims = Claim.objects.select_related('user').order_by('-created_at')[:10]
+
+    return {
+        'summary': {
+            'total_claims': totals['total'],
+            'pending_claims': totals['status__pending'],
+            'in_review_claims': totals['status__in_review'],
+            'resolved_claims': totals['status__resolved'],
+            'rejected_claims': totals['status__rejected'],
+            'avg_resolution_time_hours': _hours(resolution['avg']),
+            'median_resolution_time_hours': _hours(resolution['median']),
+            'p90_resolution_time_hours': _hours(resolution['p90'])
+        },
+        'claims_by_type': _distribution(totals, 'claim_type', Claim.CLAIM_TYPES),
+        'claims_by_priority': _distribution(totals, 'priority', Claim.PRIORITY_LEVELS),
+        'recent_claims': [
+            {
+                'id': claim.id,
+                'user_name': claim.user.get_full_name(),
+                'title': claim.title,
+                'claim_type': claim.get_claim_type_display(),
+                'status': claim.get_status_display(),
+                'priority': claim.get_priority_display(),
+                'created_at': claim.created_at
+            }
+            for claim in recent_claims
+        ],
+        'monthly_claims': monthly_claims
+    }
+
+
+def inventory_report():
+    """Stock y valor del inventario de productos y variantes."""
+    stock = Product.objects.filter(track_inventory=True).aggregate(
+        products=Count('id'),
+        units=Sum('inventory_quantity'),
+        value=Sum(F('inventory_quantity') * F('price')),
+        out_of_stock=Count('id', filter=Q(inventory_quantity=0)),
+        low_stock=Count('id', filter=Q(inventory_quantity__gt=0, inventory_quantity__lte=F('low_stock_threshold'))),
+    )
+    variant_stock = ProductVariant.objects.filter(is_active=True).aggregate(
+        variants=Count('id'),
+        units=Sum('inventory_quantity'),
+        out_of_stock=Count('id', filter=Q(inventory_quantity=0)),
+        low_stock=Count('id', filter=Q(inventory_quantity__gt=0, inventory_quantity__lte=F('low_stock_threshold'))),
+    )
+
+    low_stock_variants = ProductVariant.objects.filter(
+        is_active=True,
+        inventory_quantity__lte=F('low_stock_threshold')
+    ).order_by('inventory_quantity').values(
+        'id', 'sku', 'product_id', 'product__name', 'inventory_quantity', 'low_stock_threshold'
+    )[:100]
+
+    return {
+        'summary': {
+            'tracked_products': stock['products'],
+            'product_units': stock['units'] or 0,
+            'stock_value': stock['value'] or 0,
+            'out_of_stock_products': stock['out_of_stock'],
+            'low_stock_products': stock['low_stock'],
+            'active_variants': variant_stock['variants'],
+            'variant_units': variant_stock['units'] or 0,
+            'out_of_stock_variants': variant_stock['out_of_stock'],
+            'low_stock_variants': variant_stock['low_stock']
+        },
+        'low_stock_variants': [
+            {
+                'id': variant['id'],
+                'sku': variant['sku'],
+                'product_id': variant['product_id'],
+                'product_name': variant['product__name'],
+                'current_stock': variant['inventory_quantity'],
+                'low_stock_threshold': variant['low_stock_threshold']
+            }
+            for variant in low_stock_variants
+        ]
+    }
+
+
+def _sales_from_filters(filters):
+    return sales_report(*parse_period(filters), granularity=parse_granularity(filters))
+
+
+# Tipo de reporte -> función que lo calcula a partir de Report.filters
+REPORT_GENERATORS = {
+    'sales': _sales_from_filters,
+    'products': lambda filters: products_report(),
+    'users': lambda filters: users_report(),
+    'reviews': lambda filters: reviews_report(),
+    'claims': lambda filters: claims_report(),
+    'inventory': lambda filters: inventory_report(),
+}
+
+
+def stale_before(now=None):
+    """Antes de este momento un reporte pendiente o en curso se da por abandonado."""
+    return (now or timezone.now()) - timedelta(seconds=settings.REPORT_RUNNING_TIMEOUT)
+
+
+def in_progress(now=None):
+    """
+    Q de los reportes que siguen en cola o calculándose: `running` desde hace
+    menos de REPORT_RUNNING_TIMEOUT o `pending` actualizado dentro de esa
+    misma ventana. Los demás se pueden volver a programar.
+    """
+    stale = stale_before(now)
+    return Q(status='running', started_at__gte=stale) | Q(status='pending', updated_at__gte=stale)
+
+
+def is_in_progress(report, now=None):
+    """Versión en memoria de `in_progress` para un reporte ya cargado."""
+    stale = stale_before(now)
+    if report.status == 'running':
+        return report.started_at is not None and report.started_at >= stale
+    return report.status == 'pending' and report.updated_at >= stale
+
+
+def run_report(report_id):
+    """
+    Calcula un reporte y guarda el resultado en Report.data. La transición
+    a `running` es un UPDATE condicional, así que dos workers no calculan
+    el mismo reporte a la vez; un reporte que lleva más de
+    REPORT_RUNNING_TIMEOUT segundos en `running` se considera abandonado.
+    Retorna si se calculó.
+    """
+    now = timezone.now()
+    claimed = Report.objects.filter(pk=report_id).filter(
+        ~Q(status='running') | Q(started_at__lt=stale_before(now))
+    ).update(status='running', started_at=now, error='')
+    if not claimed:
+        return False
+
+    report = Report.objects.get(pk=report_id)
+    generator = REPORT_GENERATORS.get(report.report_type)
+    try:
+        if generator is None:
+            raise ValueError(f'El tipo de reporte "{report.report_type}" no se genera automáticamente.')
+        data = generator(report.filters or {})
+    except Exception as e:
+        logger.exception('No se pudo generar el reporte %s', report_id)
+        Report.objects.filter(pk=report_id).update(
+            status='failed', error=str(e), completed_at=timezone.now(), updated_at=timezone.now()
+        )
+        return False
+
+    report.data = data
+    report.status = 'completed'
+    report.completed_at = timezone.now()
+    report.save(update_fields=['data', 'status', 'completed_at', 'updated_at'])
+    return True
+
+
+def enqueue_report(report):
+    """
+    Programa el cálculo del reporte al confirmar la transacción; sin broker
+    se calcula en el momento.
+    """
+    from kombu.exceptions import OperationalError
+    from .tasks import generate_report
+
+    def send():
+        try:
+            generate_report.delay(report.pk)
+        except OperationalError as e:
+            logger.warning('No se pudo programar el reporte %s: %s', report.pk, e)
+            run_report(report.pk)
+
+    Report.objects.filter(pk=report.pk).update(status='pending', error='', updated_at=timezone.now())
+    report.status = 'pending'
+    transaction.on_commit(send)
+
+
+SCHEDULE_INTERVALS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+    'monthly': timedelta(days=30),
+}
+
+
+def due_scheduled_reports(now=None):
+    """
+    Reportes programados cuya última ejecución ya cumplió su frecuencia. Los
+    que quedaron en cola o en curso más allá de REPORT_RUNNING_TIMEOUT (el
+    worker murió) vuelven a programarse.
+    """
+    now = now or timezone.now()
+    due = Q()
+    for frequency, interval in SCHEDULE_INTERVALS.items():
+        due |= Q(schedule_frequency=frequency) & (
+            Q(completed_at__isnull=True) | Q(completed_at__lte=now - interval)
+        )
+    return Report.objects.filter(due, is_scheduled=True).exclude(in_progress(now))
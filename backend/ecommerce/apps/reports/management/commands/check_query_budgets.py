@@ -0,0 +1,371 @@
+import json
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+)
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ecommerce.apps.cart.models import Cart, CartItem, Wishlist, WishlistItem
+from ecommerce.apps.categories.models import Category, Brand, Size, Color
+from ecommerce.apps.orders.models import Order, OrderItem
+from ecommerce.apps.payments.models import Payment
+from ecommerce.apps.products.models import Product, ProductImage, ProductVariant, ProductReview
+from ecommerce.apps.reports.models import Claim
+from ecommerce.apps.reports.rollups import local_date, rebuild
+
+User = get_user_model()
+
+
+# Presupuesto máximo de consultas SQL por endpoint (nombre de URL -> consultas).
+# Los presupuestos deben ser constantes: no pueden crecer con el tamaño de página
+# ni con el volumen del catálogo.
+QUERY_BUDGETS = {
+    # Catálogo público
+    'product-list': 6,
+    'product-search': 4,
+    'product-facets': 3,
+    'featured-products': 5,
+    'product-detail': 8,
+    'related-products': 6,
+    'product-stats': 4,
+    'product-review-list': 4,
+    'category-list': 4,
+    'brand-list': 3,
+    'size-list': 3,
+    'color-list': 3,
+    # Cliente autenticado
+    'user-profile': 3,
+    'simple-addresses': 4,
+    'cart': 8,
+    'cart-summary': 3,
+    'cart-item-list': 8,
+    'wishlist': 8,
+    'wishlist-item-list': 8,
+    'order-list': 5,
+    'order-detail': 8,
+    'claim-list': 5,
+    # Administración
+    'user-list': 4,
+    'payment-list': 4,
+    'report-list': 4,
+    'sales-report': 3,
+    'product-report': 4,
+    'user-report': 4,
+    'reviews-report': 5,
+    'claims-report': 5,
+    'dashboard-report': 6,
+    'admin-stats': 6,
+    'admin-settings': 4,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Siembra un catálogo realista en una base de datos de prueba, recorre los endpoints '
+        'públicos de la API y falla si alguno supera su presupuesto de consultas SQL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=2000, help='Número de productos a crear')
+        parser.add_argument('--variants', type=int, default=4, help='Variantes por producto')
+        parser.add_argument('--users', type=int, default=200, help='Número de clientes a crear')
+        parser.add_argument('--reviews', type=int, default=5, help='Reseñas por producto')
+        parser.add_argument('--orders', type=int, default=2000, help='Número de pedidos a crear')
+        parser.add_argument('--cart-items', type=int, default=15, help='Items en el carrito del cliente de prueba')
+        parser.add_argument(
+            '--budget',
+            action='append',
+            default=[],
+            metavar='NOMBRE=N',
+            help='Sobrescribe el presupuesto de un endpoint (puede repetirse)'
+        )
+        parser.add_argument('--only', action='append', default=[], help='Ejecutar solo estos endpoints')
+        parser.add_argument('--json', dest='json_path', help='Guardar los resultados en un archivo JSON')
+        parser.add_argument('--seed', type=int, default=42, help='Semilla aleatoria para los datos')
+
+    def handle(self, *args, **options):
+        budgets = dict(QUERY_BUDGETS)
+        for override in options['budget']:
+            name, _, value = override.partition('=')
+            if not value.isdigit():
+                raise CommandError(f'Presupuesto inválido: {override}')
+            budgets[name] = int(value)
+
+        random.seed(options['seed'])
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            fixtures = self.seed(options)
+            self.stdout.write(f'Datos sembrados en {time.perf_counter() - started:.1f}s')
+            # Sin caché de respuestas: se mide el coste real de cada endpoint
+            with override_settings(CATALOG_CACHE_TIMEOUT=0):
+                results = self.run_endpoints(fixtures, budgets, options['only'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+
+        failures = [result for result in results if not result['ok']]
+        if failures:
+            names = ', '.join(result['name'] for result in failures)
+            raise CommandError(f'{len(failures)} endpoints fuera de presupuesto o con error: {names}')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} endpoints dentro de presupuesto'))
+
+    # Siembra de datos
+
+    def seed(self, options):
+        now = timezone.now()
+
+        admin = User.objects.create_superuser(
+            username='budget-admin', email='budget-admin@tienda.com', password='admin123',
+            first_name='Admin', last_name='Presupuesto'
+        )
+        customers = User.objects.bulk_create([
+            User(
+                username=f'cliente{i}', email=f'cliente{i}@tienda.com', first_name='Cliente',
+                last_name=str(i), password='!', date_joined=now - timedelta(days=random.randint(0, 365))
+            )
+            for i in range(max(options['users'], options['reviews'], 1))
+        ])
+        customer = customers[0]
+
+        roots = Category.objects.bulk_create([
+            Category(name=name, slug=slugify(name), sort_order=i)
+            for i, name in enumerate(['Ropa', 'Calzado', 'Accesorios'])
+        ])
+        leaves = Category.objects.bulk_create([
+            Category(name=f'{root.name} {i}', slug=f'{root.slug}-{i}', parent=root, sort_order=i)
+            for root in roots for i in range(5)
+        ])
+        Category.rebuild_tree()
+        brands = Brand.objects.bulk_create([
+            Brand(name=f'Marca {i}', slug=f'marca-{i}') for i in range(20)
+        ])
+        sizes = Size.objects.bulk_create([
+            Size(name=name, type='clothing', sort_order=i) for i, name in enumerate(['XS', 'S', 'M', 'L', 'XL'])
+        ])
+        colors = Color.objects.bulk_create([
+            Color(name=name, hex_code=code, sort_order=i)
+            for i, (name, code) in enumerate([
+                ('Negro', '#000000'), ('Blanco', '#FFFFFF'), ('Azul', '#0000FF'), ('Rojo', '#FF0000')
+            ])
+        ])
+
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Producto {i}', slug=f'producto-{i}', sku=f'BUDGET-{i:06d}',
+                description='Descripción del producto de prueba', short_description='Producto de prueba',
+                category=random.choice(leaves), brand=random.choice(brands),
+                gender=random.choice(['masculino', 'femenino', 'unisex']),
+                price=Decimal(random.randint(20, 500) * 1000), inventory_quantity=random.randint(0, 100),
+                status='published' if i % 10 else 'draft', is_featured=i % 25 == 0,
+                primary_image_url=f'/media/products/producto-{i}.jpg', published_at=now,
+            )
+            for i in range(options['products'])
+        ], batch_size=500)
+
+        ProductImage.objects.bulk_create([
+            ProductImage(product=product, image=f'products/producto-{product.pk}-{n}.jpg', is_primary=n == 0, sort_order=n)
+            for product in products for n in range(2)
+        ], batch_size=1000)
+
+        variant_combinations = [(size, color) for size in sizes for color in colors]
+        variants = ProductVariant.objects.bulk_create([
+            ProductVariant(
+                product=product, sku=f'{product.sku}-{n}', size=size, color=color,
+                inventory_quantity=random.randint(0, 30)
+            )
+            for product in products
+            for n, (size, color) in enumerate(random.sample(variant_combinations, min(options['variants'], len(variant_combinations))))
+        ], batch_size=1000)
+        variants_by_product = {}
+        for variant in variants:
+            variants_by_product.setdefault(variant.product_id, []).append(variant)
+
+        ProductReview.objects.bulk_create([
+            ProductReview(
+                product=product, user=user, rating=random.randint(1, 5), title='Reseña de prueba',
+                comment='Comentario de prueba', is_approved=random.random() > 0.1
+            )
+            for product in products
+            for user in random.sample(customers, min(options['reviews'], len(customers)))
+        ], batch_size=1000)
+        product_ids = [product.pk for product in products]
+        for start in range(0, len(product_ids), 500):
+            Product.refresh_rating_stats(product_ids[start:start + 500])
+            Product.refresh_search_index(product_ids[start:start + 500])
+
+        published = [product for product in products if product.status == 'published']
+        orders = []
+        for i in range(options['orders']):
+            user = customer if i < 25 else random.choice(customers)
+            orders.append(Order(
+                order_number=f'BUDGET-{i:08d}', user=user, email=user.email, phone='3000000000',
+                first_name=user.first_name, last_name=user.last_name,
+                shipping_first_name=user.first_name, shipping_last_name=user.last_name,
+                shipping_address='Calle 1', shipping_city='Bogotá', shipping_state='Cundinamarca',
+                shipping_country='Colombia', shipping_postal_code='110111',
+                status=random.choice(['pending', 'confirmed', 'shipped', 'delivered']),
+                payment_status=random.choice(['pending', 'paid']), subtotal=0, total_amount=0,
+            ))
+        orders = Order.objects.bulk_create(orders, batch_size=500)
+
+        order_items = []
+        for order in orders:
+            subtotal = Decimal('0')
+            for product in random.sample(published, min(3, len(published))):
+                variant = random.choice(variants_by_product[product.pk])
+                quantity = random.randint(1, 3)
+                subtotal += product.price * quantity
+                order_items.append(OrderItem(
+                    order=order, product=product, variant=variant, quantity=quantity,
+                    unit_price=product.price, total_price=product.price * quantity,
+                    product_name=product.name, product_sku=product.sku,
+                ))
+            order.subtotal = order.total_amount = subtotal
+            # Una fecha por pedido para repartirlos entre los períodos de los reportes
+            order.created_at = now - timedelta(days=random.randint(0, 180), minutes=random.randint(0, 24 * 60))
+        OrderItem.objects.bulk_create(order_items, batch_size=1000)
+        Order.objects.bulk_update(orders, ['subtotal', 'total_amount', 'created_at'], batch_size=500)
+        # Los reportes de ventas leen los agregados diarios
+        rebuild(local_date(now - timedelta(days=180)), timezone.localdate())
+
+        Payment.objects.bulk_create([
+            Payment(
+                payment_id=f'PAY-BUDGET-{order.pk:08d}', order=order, user=order.user, amount=order.total_amount,
+                method='credit_card', provider='wompi', status='completed' if order.payment_status == 'paid' else 'pending'
+            )
+            for order in orders
+        ], batch_size=500)
+
+        Claim.objects.bulk_create([
+            Claim(
+                user=random.choice(customers), claim_type='product_issue', title='Reclamo de prueba',
+                description='Descripción', status=random.choice(['pending', 'in_review', 'resolved', 'rejected']),
+                order=random.choice(orders), product=random.choice(published),
+            )
+            for _ in range(200)
+        ])
+
+        cart = Cart.objects.create(user=customer)
+        CartItem.objects.bulk_create([
+            CartItem(cart=cart, product=product, variant=variants_by_product[product.pk][0], quantity=1)
+            for product in random.sample(published, min(options['cart_items'], len(published)))
+        ])
+        wishlist = Wishlist.objects.create(user=customer)
+        WishlistItem.objects.bulk_create([
+            WishlistItem(wishlist=wishlist, product=product)
+            for product in random.sample(published, min(10, len(published)))
+        ])
+
+        return {
+            'admin': admin,
+            'customer': customer,
+            'product': published[0],
+            'order': Order.objects.filter(user=customer).first(),
+            'category': roots[0],
+        }
+
+    # Ejecución de endpoints
+
+    def endpoints(self, fixtures):
+        """
+        Endpoints GET a medir: (nombre, url, rol, parámetros). Las rutas del
+        namespace 'admin' de system_config colisionan con el admin de Django,
+        por lo que se usan sus URLs literales.
+        """
+        product = fixtures['product']
+        order = fixtures['order']
+        return [
+            ('product-list', reverse('product-list'), None, {}),
+            ('product-search', reverse('product-search'), None, {'search': 'Producto'}),
+            ('product-facets', reverse('product-facets'), None, {'search': 'Producto', 'category': fixtures['category'].slug}),
+            ('featured-products', reverse('featured-products'), None, {}),
+            ('product-detail', reverse('product-detail', kwargs={'pk': product.pk}), None, {}),
+            ('related-products', reverse('related-products', kwargs={'product_id': product.pk}), None, {}),
+            ('product-stats', reverse('product-stats', kwargs={'product_id': product.pk}), None, {}),
+            ('product-review-list', reverse('product-review-list', kwargs={'product_id': product.pk}), None, {}),
+            ('category-list', reverse('category-list'), None, {}),
+            ('brand-list', reverse('brand-list'), None, {}),
+            ('size-list', reverse('size-list'), None, {}),
+            ('color-list', reverse('color-list'), None, {}),
+            ('user-profile', reverse('user-profile'), 'customer', {}),
+            ('simple-addresses', reverse('simple-addresses'), 'customer', {}),
+            ('cart', reverse('cart'), 'customer', {}),
+            ('cart-summary', reverse('cart-summary'), 'customer', {}),
+            ('cart-item-list', reverse('cart-item-list'), 'customer', {}),
+            ('wishlist', reverse('wishlist'), 'customer', {}),
+            ('wishlist-item-list', reverse('wishlist-item-list'), 'customer', {}),
+            ('order-list', reverse('order-list'), 'customer', {}),
+            ('order-detail', reverse('order-detail', kwargs={'pk': order.pk}), 'customer', {}),
+            ('claim-list', reverse('claim-list'), 'customer', {}),
+            ('user-list', reverse('user-list'), 'admin', {}),
+            ('payment-list', reverse('payment-list'), 'admin', {}),
+            ('report-list', reverse('report-list'), 'admin', {}),
+            ('sales-report', reverse('sales-report'), 'admin', {}),
+            ('product-report', reverse('product-report'), 'admin', {}),
+            ('user-report', reverse('user-report'), 'admin', {}),
+            ('reviews-report', reverse('reviews-report'), 'admin', {}),
+            ('claims-report', reverse('claims-report'), 'admin', {}),
+            ('dashboard-report', reverse('dashboard-report'), 'admin', {}),
+            ('admin-stats', '/api/admin/stats/', 'admin', {}),
+            ('admin-settings', '/api/admin/settings/', 'admin', {}),
+        ]
+
+    def run_endpoints(self, fixtures, budgets, only):
+        # Los errores 5xx se registran como resultado en lugar de propagarse
+        clients = {None: APIClient(raise_request_exception=False)}
+        for role in ('customer', 'admin'):
+            client = APIClient(raise_request_exception=False)
+            token = RefreshToken.for_user(fixtures[role]).access_token
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            clients[role] = client
+
+        self.stdout.write(f"{'endpoint':<24} {'status':>6} {'queries':>8} {'budget':>7} {'ms':>9} {'bytes':>9}")
+        results = []
+        for name, url, role, params in self.endpoints(fixtures):
+            if only and name not in only:
+                continue
+            client = clients[role]
+
+            # Petición de calentamiento para no contar cachés de arranque
+            client.get(url, params)
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url, params)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+            budget = budgets.get(name)
+            query_count = len(queries)
+            ok = response.status_code < 400 and (budget is None or query_count <= budget)
+            results.append({
+                'name': name,
+                'url': url,
+                'status': response.status_code,
+                'queries': query_count,
+                'budget': budget,
+                'time_ms': round(elapsed_ms, 2),
+                'bytes': len(response.content),
+                'ok': ok,
+            })
+
+            line = f"{name:<24} {response.status_code:>6} {query_count:>8} {budget if budget is not None else '-':>7} {elapsed_ms:>9.1f} {len(response.content):>9}"
+            self.stdout.write(line if ok else self.style.ERROR(line))
+        return results
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ecommerce.apps.orders.models import Order
+from ecommerce.apps.reports.rollups import local_date, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye los agregados diarios de ventas (tienda, producto y cliente) a partir de los pedidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='Primer día (YYYY-MM-DD); por defecto el del primer pedido')
+        parser.add_argument('--end', help='Último día (YYYY-MM-DD); por defecto hoy')
+        parser.add_argument('--days', type=int, help='Reconstruir solo los últimos N días')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        try:
+            start = parse_date(options['start']) if options['start'] else None
+            end = parse_date(options['end']) if options['end'] else today
+        except ValueError:
+            start = end = None
+        if (options['start'] and start is None) or end is None:
+            raise CommandError('Las fechas deben tener el formato YYYY-MM-DD')
+
+        if options['days']:
+            start = end - timedelta(days=options['days'] - 1)
+        elif start is None:
+            bounds = Order.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+            if bounds['first'] is None:
+                self.stdout.write('No hay pedidos para agregar')
+                return
+            start = local_date(bounds['first'])
+            end = max(end, local_date(bounds['last']))
+
+        days = rebuild(start, end)
+        self.stdout.write(
+            self.style.SUCCESS(f'Agregados de ventas reconstruidos para {days} días ({start} a {end})')
+        )
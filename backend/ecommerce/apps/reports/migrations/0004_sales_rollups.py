@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_suffix_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0003_claimmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='date')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='revenue')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='orders')),
+                ('units', models.PositiveIntegerField(default=0, verbose_name='units')),
+                ('customers', models.PositiveIntegerField(default=0, verbose_name='customers')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'Daily Sales Rollup',
+                'verbose_name_plural': 'Daily Sales Rollups',
+                'db_table': 'daily_sales_rollups',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='revenue')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='orders')),
+                ('units', models.PositiveIntegerField(default=0, verbose_name='units')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.product', verbose_name='product')),
+            ],
+            options={
+                'verbose_name': 'Daily Product Sales Rollup',
+                'verbose_name_plural': 'Daily Product Sales Rollups',
+                'db_table': 'daily_product_sales_rollups',
+                'indexes': [models.Index(fields=['product', 'date'], name='daily_produ_product_a55472_idx')],
+                'unique_together': {('date', 'product')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCustomerSalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='revenue')),
+                ('orders', models.PositiveIntegerField(default=0, verbose_name='orders')),
+                ('units', models.PositiveIntegerField(default=0, verbose_name='units')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to=settings.AUTH_USER_MODEL, verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'Daily Customer Sales Rollup',
+                'verbose_name_plural': 'Daily Customer Sales Rollups',
+                'db_table': 'daily_customer_sales_rollups',
+                'indexes': [models.Index(fields=['user', 'date'], name='daily_custo_user_id_cbb729_idx')],
+                'unique_together': {('date', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:20
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='completed at'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='error',
+            field=models.TextField(blank=True, verbose_name='error'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='started at'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=20, verbose_name='status'),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='data',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='data'),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('sales', 'Sales Report'), ('products', 'Products Report'), ('users', 'Users Report'), ('reviews', 'Reviews Report'), ('claims', 'Claims Report'), ('inventory', 'Inventory Report'), ('custom', 'Custom Report')], max_length=20, verbose_name='report type'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['is_scheduled', 'schedule_frequency'], name='reports_is_sche_991ccc_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from ecommerce.apps.users.models import User
@@ -105,6 +106,9 @@ class Claim(models.Model):
         verbose_name_plural = _('Claims')
         db_table = 'claims'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.full_name} - {self.title} ({self.get_status_display()})"
@@ -162,10 +166,19 @@ class Report(models.Model):
         ('sales', _('Sales Report')),
         ('products', _('Products Report')),
         ('users', _('Users Report')),
+        ('reviews', _('Reviews Report')),
+        ('claims', _('Claims Report')),
         ('inventory', _('Inventory Report')),
         ('custom', _('Custom Report')),
     ]
     
+    REPORT_STATUS = [
+        ('pending', _('Pending')),
+        ('running', _('Running')),
+        ('completed', _('Completed')),
+        ('failed', _('Failed')),
+    ]
+    
     name = models.CharField(_('name'), max_length=200)
     report_type = models.CharField(_('report type'), max_length=20, choices=REPORT_TYPES)
     generated_by = models.ForeignKey(
@@ -174,8 +187,14 @@ class Report(models.Model):
         related_name='generated_reports',
         verbose_name=_('generated by')
     )
-    data = models.JSONField(_('data'), default=dict)
+    data = models.JSONField(_('data'), default=dict, encoder=DjangoJSONEncoder)
     filters = models.JSONField(_('filters'), default=dict, blank=True)
+    
+    # Generación en segundo plano
+    status = models.CharField(_('status'), max_length=20, choices=REPORT_STATUS, default='completed')
+    error = models.TextField(_('error'), blank=True)
+    started_at = models.DateTimeField(_('started at'), null=True, blank=True)
+    completed_at = models.DateTimeField(_('completed at'), null=True, blank=True)
     is_scheduled = models.BooleanField(_('is scheduled'), default=False)
     schedule_frequency = models.CharField(
         _('schedule frequency'),
@@ -197,6 +216,87 @@ class Report(models.Model):
         verbose_name_plural = _('Reports')
         db_table = 'reports'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_scheduled', 'schedule_frequency']),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+
+class DailySalesRollup(models.Model):
+    """
+    Ventas de la tienda agregadas por día (en la zona horaria del sitio).
+    Excluye los pedidos cancelados y reembolsados.
+    """
+    date = models.DateField(_('date'), unique=True)
+    revenue = models.DecimalField(_('revenue'), max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(_('orders'), default=0)
+    units = models.PositiveIntegerField(_('units'), default=0)
+    customers = models.PositiveIntegerField(_('customers'), default=0)
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Daily Sales Rollup')
+        verbose_name_plural = _('Daily Sales Rollups')
+        db_table = 'daily_sales_rollups'
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.date}: {self.revenue} ({self.orders} pedidos)"
+
+
+class DailyProductSalesRollup(models.Model):
+    """
+    Ventas de un producto agregadas por día.
+    """
+    date = models.DateField(_('date'))
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='daily_sales',
+        verbose_name=_('product')
+    )
+    revenue = models.DecimalField(_('revenue'), max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(_('orders'), default=0)
+    units = models.PositiveIntegerField(_('units'), default=0)
+    
+    class Meta:
+        verbose_name = _('Daily Product Sales Rollup')
+        verbose_name_plural = _('Daily Product Sales Rollups')
+        db_table = 'daily_product_sales_rollups'
+        unique_together = ['date', 'product']
+        indexes = [
+            models.Index(fields=['product', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.product_id}: {self.units}"
+
+
+class DailyCustomerSalesRollup(models.Model):
+    """
+    Compras de un cliente agregadas por día.
+    """
+    date = models.DateField(_('date'))
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_sales',
+        verbose_name=_('user')
+    )
+    revenue = models.DecimalField(_('revenue'), max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(_('orders'), default=0)
+    units = models.PositiveIntegerField(_('units'), default=0)
+    
+    class Meta:
+        verbose_name = _('Daily Customer Sales Rollup')
+        verbose_name_plural = _('Daily Customer Sales Rollups')
+        db_table = 'daily_customer_sales_rollups'
+        unique_together = ['date', 'user']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.date} - {self.user_id}: {self.revenue}"
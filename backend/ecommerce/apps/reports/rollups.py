@@ -0,0 +1,134 @@
+"""
+Agregados diarios de ventas (tienda, producto y cliente) para los reportes.
+
+Los reportes leen DailySalesRollup, DailyProductSalesRollup y
+DailyCustomerSalesRollup en lugar de recorrer `orders` y `order_items`, así
+que su costo depende del número de días y no del de pedidos.
+
+Los agregados se mantienen por día: cada alta, cambio de estado o borrado
+de un pedido (o de sus items) marca su día local como pendiente y la tarea
+`refresh_sales_rollup` vuelve a calcular ese día desde los pedidos. Los
+cambios que llegan mientras el día está pendiente se agrupan en un solo
+recálculo, y recalcular es idempotente: el resultado no depende del orden
+ni de cuántas veces se aplique. `rebuild_sales_rollups` reconstruye
+cualquier rango de días (carga inicial o reparación).
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from ecommerce.apps.orders.models import Order, OrderItem
+from .models import DailyCustomerSalesRollup, DailyProductSalesRollup, DailySalesRollup
+
+logger = logging.getLogger(__name__)
+
+# Pedidos que no cuentan como venta
+EXCLUDED_ORDER_STATUSES = ('cancelled', 'refunded')
+PENDING_KEY = 'reports:rollup:pending:{day}'
+
+
+def local_date(value):
+    """Día (en TIME_ZONE) de un datetime con zona horaria."""
+    return timezone.localtime(value).date()
+
+
+def day_bounds(day):
+    """[inicio, fin) del día local como datetimes, para filtrar por índice."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def refresh_day(day):
+    """
+    Recalcula los agregados de un día a partir de sus pedidos. La fila de
+    la tienda se bloquea durante el recálculo para que dos recálculos del
+    mismo día no se mezclen.
+    """
+    start, end = day_bounds(day)
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end).exclude(
+        status__in=EXCLUDED_ORDER_STATUSES
+    )
+    items = OrderItem.objects.filter(order__in=orders)
+
+    with transaction.atomic():
+        DailySalesRollup.objects.get_or_create(date=day)
+        summary = DailySalesRollup.objects.select_for_update().get(date=day)
+
+        customers = {
+            row['user_id']: row
+            for row in orders.values('user_id').annotate(revenue=Sum('total_amount'), orders=Count('id')).order_by()
+        }
+        for user_id, units in items.values_list('order__user_id').annotate(units=Sum('quantity')).order_by():
+            customers[user_id]['units'] = units
+        products = items.values('product_id').annotate(
+            revenue=Sum('total_price'), units=Sum('quantity'), orders=Count('order_id', distinct=True)
+        ).order_by()
+
+        DailyCustomerSalesRollup.objects.filter(date=day).delete()
+        DailyCustomerSalesRollup.objects.bulk_create([
+            DailyCustomerSalesRollup(
+                date=day, user_id=user_id, revenue=row['revenue'], orders=row['orders'], units=row.get('units', 0)
+            )
+            for user_id, row in customers.items()
+        ])
+        DailyProductSalesRollup.objects.filter(date=day).delete()
+        DailyProductSalesRollup.objects.bulk_create([
+            DailyProductSalesRollup(date=day, **row) for row in products
+        ])
+
+        summary.revenue = sum((row['revenue'] for row in customers.values()), 0)
+        summary.orders = sum(row['orders'] for row in customers.values())
+        summary.units = sum(row.get('units', 0) for row in customers.values())
+        summary.customers = len(customers)
+        summary.save()
+    return summary
+
+
+def rebuild(start, end):
+    """Recalcula todos los días de [start, end]; retorna cuántos se procesaron."""
+    day, days = start, 0
+    while day <= end:
+        refresh_day(day)
+        day += timedelta(days=1)
+        days += 1
+    return days
+
+
+def schedule_refresh(day):
+    """
+    Programa el recálculo de un día. Si ya hay uno pendiente no se programa
+    otro; sin broker se recalcula en el momento.
+    """
+    from kombu.exceptions import OperationalError
+    from .tasks import refresh_sales_rollup
+
+    delay = settings.SALES_ROLLUP_REFRESH_DELAY
+    key = PENDING_KEY.format(day=day.isoformat())
+    # add() retorna False solo si la clave ya existe (None si Redis no responde)
+    if cache.add(key, True, delay * 10) is False:
+        return
+    try:
+        refresh_sales_rollup.apply_async((day.isoformat(),), countdown=delay)
+    except OperationalError as e:
+        logger.warning('No se pudo programar el recálculo de ventas del %s: %s', day, e)
+        cache.delete(key)
+        refresh_day(day)
+
+
+def mark_day_dirty(day):
+    """Programa el recálculo del día cuando se confirme la transacción actual."""
+    transaction.on_commit(lambda: schedule_refresh(day))
+
+
+def refresh_pending_day(day):
+    """Ejecuta un recálculo programado (lo llama la tarea)."""
+    day = date.fromisoformat(day) if isinstance(day, str) else day
+    # Liberar la marca antes de leer: lo que cambie desde ahora se vuelve a programar
+    cache.delete(PENDING_KEY.format(day=day.isoformat()))
+    return refresh_day(day)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .generators import parse_granularity, parse_period
 from .models import Report, Claim, ClaimMessage
 
 
@@ -86,6 +87,41 @@ class ReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'report_type', 'generated_by', 'generated_by_name', 
             'generated_by_email', 'data', 'filters', 'is_scheduled', 
-            'schedule_frequency', 'created_at', 'updated_at'
+            'schedule_frequency', 'status', 'error', 'started_at', 'completed_at',
+            'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'generated_by', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'generated_by', 'status', 'error', 'started_at', 'completed_at',
+            'created_at', 'updated_at'
+        ]
+    
+    def validate(self, attrs):
+        report_type = attrs.get('report_type', getattr(self.instance, 'report_type', None))
+        filters = attrs.get('filters', getattr(self.instance, 'filters', None)) or {}
+        if report_type == 'sales':
+            try:
+                parse_period(filters)
+                parse_granularity(filters)
+            except ValueError as e:
+                raise serializers.ValidationError({'filters': str(e)})
+        is_scheduled = attrs.get('is_scheduled', getattr(self.instance, 'is_scheduled', False))
+        frequency = attrs.get('schedule_frequency', getattr(self.instance, 'schedule_frequency', ''))
+        if is_scheduled and not frequency:
+            raise serializers.ValidationError({'schedule_frequency': 'Los reportes programados requieren una frecuencia.'})
+        return attrs
+
+
+class ReportStatusSerializer(serializers.ModelSerializer):
+    """
+    Serializer de reportes sin el resultado (listados y sondeo del estado).
+    """
+    generated_by_name = serializers.CharField(source='generated_by.get_full_name', read_only=True)
+    
+    class Meta:
+        model = Report
+        fields = [
+            'id', 'name', 'report_type', 'generated_by', 'generated_by_name', 'filters',
+            'is_scheduled', 'schedule_frequency', 'status', 'error', 'started_at',
+            'completed_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
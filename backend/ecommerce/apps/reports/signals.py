@@ -0,0 +1,30 @@
+"""
+Recálculo de los agregados diarios de ventas cuando cambian los pedidos.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from ecommerce.apps.orders.models import Order, OrderItem
+from .rollups import local_date, mark_day_dirty
+
+
+def order_changed(sender, instance, **kwargs):
+    mark_day_dirty(local_date(instance.created_at))
+
+
+def order_item_changed(sender, instance, origin=None, **kwargs):
+    # Al borrar un pedido sus items se borran en cascada: basta con la señal del pedido
+    if isinstance(origin, Order):
+        return
+    if OrderItem.order.is_cached(instance):
+        created_at = instance.order.created_at
+    else:
+        created_at = Order.objects.filter(pk=instance.order_id).values_list('created_at', flat=True).first()
+    if created_at is not None:
+        mark_day_dirty(local_date(created_at))
+
+
+post_save.connect(order_changed, sender=Order, dispatch_uid='sales-rollups-Order-save')
+post_delete.connect(order_changed, sender=Order, dispatch_uid='sales-rollups-Order-delete')
+post_save.connect(order_item_changed, sender=OrderItem, dispatch_uid='sales-rollups-OrderItem-save')
+post_delete.connect(order_item_changed, sender=OrderItem, dispatch_uid='sales-rollups-OrderItem-delete')
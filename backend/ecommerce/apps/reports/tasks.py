@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from . import generators, rollups
+
+
+@shared_task(ignore_result=True)
+def refresh_sales_rollup(day):
+    """Recálculo programado de los agregados de ventas de un día (YYYY-MM-DD)."""
+    rollups.refresh_pending_day(day)
+
+
+@shared_task(ignore_result=True)
+def refresh_recent_sales_rollups(days=2):
+    """
+    Barrido periódico de los últimos días, por si algún cambio no pasó por
+    las señales (p. ej. un update() masivo).
+    """
+    today = timezone.localdate()
+    return rollups.rebuild(today - timedelta(days=days - 1), today)
+
+
+@shared_task(ignore_result=True)
+def generate_report(report_id):
+    """Calcula un reporte y guarda el resultado en Report.data."""
+    generators.run_report(report_id)
+
+
+@shared_task(ignore_result=True)
+def run_scheduled_reports():
+    """Programa los reportes cuya frecuencia (schedule_frequency) ya se cumplió."""
+    count = 0
+    for report in generators.due_scheduled_reports():
+        generators.enqueue_report(report)
+        count += 1
+    return count
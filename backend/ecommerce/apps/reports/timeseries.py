@@ -0,0 +1,114 @@
+"""
+Series de tiempo para los reportes.
+
+Las series se agrupan por día, semana (desde el lunes) o mes con
+TruncDay/TruncWeek/TruncMonth, que convierten a la zona horaria del sitio
+(TIME_ZONE) tanto en SQLite como en PostgreSQL. El período se filtra con un
+rango [inicio, fin) sobre la columna sin transformar (nunca con `__date` ni
+funciones sobre la columna), así que la consulta puede usar los índices de
+`created_at`. Los períodos sin datos se completan en Python.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import models
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+GRANULARITIES = ('day', 'week', 'month')
+TRUNCATE = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+
+
+def start_of_day(day):
+    """Inicio del día local como datetime con zona horaria."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def bucket_start(day, granularity):
+    """Primer día del período (día, semana o mes) que contiene `day`."""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    """Primer día del período siguiente al que empieza en `day`."""
+    if granularity == 'week':
+        return day + timedelta(weeks=1)
+    if granularity == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def add_months(day, months):
+    """Primer día del mes que está `months` meses antes o después de `day`."""
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def buckets(start, end, granularity):
+    """Inicio de cada período que toca [start, end], en orden."""
+    day = bucket_start(start, granularity)
+    result = []
+    while day <= end:
+        result.append(day)
+        day = next_bucket(day, granularity)
+    return result
+
+
+def date_range(queryset, field, start, end):
+    """
+    Filtro de [start, end] (fechas locales, ambas incluidas) como rango
+    semiabierto sobre la columna, para que pueda usarse su índice.
+    """
+    if isinstance(queryset.model._meta.get_field(field), models.DateTimeField):
+        lower, upper = start_of_day(start), start_of_day(end + timedelta(days=1))
+    else:
+        lower, upper = start, end + timedelta(days=1)
+    return queryset.filter(**{f'{field}__gte': lower, f'{field}__lt': upper})
+
+
+def _local_date(value):
+    return timezone.localtime(value).date() if isinstance(value, datetime) else value
+
+
+def bucketed(queryset, field, start, end, granularity='day', **aggregates):
+    """
+    Agregados por período en una consulta con GROUP BY. Retorna
+    {inicio del período: {alias: valor}} solo con los períodos que tienen filas.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity debe ser uno de: {", ".join(GRANULARITIES)}.')
+    rows = date_range(queryset, field, start, end).annotate(
+        bucket=TRUNCATE[granularity](field)
+    ).values('bucket').annotate(**aggregates).order_by()
+    return {_local_date(row.pop('bucket')): row for row in rows}
+
+
+def series(queryset, field, start, end, granularity='day', key='period', **aggregates):
+    """
+    Serie completa de [start, end]: una fila por período, `{key: inicio,
+    alias: valor}`, con 0 en los conteos y sumas de los períodos sin datos
+    (None en los demás agregados, p. ej. promedios).
+    """
+    data = bucketed(queryset, field, start, end, granularity, **aggregates)
+    empty = {
+        name: 0 if isinstance(aggregate, (models.Count, models.Sum)) else None
+        for name, aggregate in aggregates.items()
+    }
+    return [{key: day, **data.get(day, empty)} for day in buckets(start, end, granularity)]
+
+
+def monthly_series(queryset, field, months=12, **aggregates):
+    """
+    Serie de los últimos `months` meses calendario (incluido el actual) con
+    el mes como 'YYYY-MM'.
+    """
+    today = timezone.localdate()
+    rows = series(queryset, field, add_months(today, 1 - months), today, 'month', key='month', **aggregates)
+    for row in rows:
+        row['month'] = row['month'].strftime('%Y-%m')
+    return rows
+
@@ -14,4 +14,5 @@ urlpatterns = [
     path('reviews/', views.ReviewsReportView.as_view(), name='reviews-report'),
     path('claims-report/', views.ClaimsReportView.as_view(), name='claims-report'),
     path('dashboard/', views.DashboardReportView.as_view(), name='dashboard-report'),
+    path('export/<slug:dataset>/', views.ExportView.as_view(), name='export'),
 ]
@@ -2,36 +2,103 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Sum, Count, Avg, F, Q
+from django.db.models import Prefetch, Sum, Count
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
-from .models import Report, Claim, ClaimMessage
-from .serializers import ReportSerializer, ClaimSerializer, ClaimCreateSerializer, ClaimUpdateSerializer, ClaimMessageSerializer, ClaimMessageCreateSerializer
-from ecommerce.apps.orders.models import Order
-from ecommerce.apps.products.models import Product, ProductReview
+from . import timeseries
+from .exports import CONTENT_TYPES, DATASETS, FORMATS as EXPORT_FORMATS, iter_export
+from .models import (
+    Report, Claim, ClaimMessage, DailySalesRollup, DailyProductSalesRollup, DailyCustomerSalesRollup
+)
+from .generators import (
+    REPORT_GENERATORS, claims_report, enqueue_report, is_in_progress, parse_granularity, parse_period, products_report,
+    reviews_report, sales_report, users_report
+)
+from .serializers import ReportSerializer, ReportStatusSerializer, ClaimSerializer, ClaimCreateSerializer, ClaimUpdateSerializer, ClaimMessageSerializer, ClaimMessageCreateSerializer
+from ecommerce.apps.products.models import Product
 from ecommerce.apps.users.models import User
 
 
 class ReportViewSet(viewsets.ModelViewSet):
     """
-    ViewSet para gestionar reportes.
+    ViewSet para gestionar reportes. Los tipos con generador (ventas,
+    productos, usuarios, reseñas, reclamos e inventario) se calculan en
+    segundo plano: crear o regenerar un reporte responde 202 de inmediato y
+    el resultado se consulta en `status/` y `result/`.
     """
     serializer_class = ReportSerializer
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
     
+    def get_serializer_class(self):
+        if self.action in ('list', 'report_status'):
+            return ReportStatusSerializer
+        return ReportSerializer
+    
     def get_queryset(self):
         """
         Filtra los reportes según el usuario.
         """
         if self.request.user.is_staff:
-            return Report.objects.all().select_related('generated_by')
-        return Report.objects.filter(generated_by=self.request.user).select_related('generated_by')
+            queryset = Report.objects.all().select_related('generated_by')
+        else:
+            queryset = Report.objects.filter(generated_by=self.request.user).select_related('generated_by')
+        if self.action in ('list', 'report_status'):
+            # El resultado puede ser grande: solo se carga en el detalle y en result/
+            queryset = queryset.defer('data')
+        return queryset
     
-    def perform_create(self, serializer):
+    def create(self, request, *args, **kwargs):
+        """
+        Crea el reporte y, si su tipo tiene generador, programa su cálculo.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = serializer.save(generated_by=request.user)
+        if report.report_type not in REPORT_GENERATORS:
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        enqueue_report(report)
+        return Response(ReportStatusSerializer(report).data, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=True, methods=['get'], url_path='status')
+    def report_status(self, request, pk=None):
+        """
+        Estado de la generación, sin el resultado (para sondeo).
+        """
+        return Response(ReportStatusSerializer(self.get_object()).data)
+    
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """
+        Resultado del reporte: 202 mientras se calcula y 409 si falló.
+        """
+        report = self.get_object()
+        if report.status in ('pending', 'running'):
+            return Response(ReportStatusSerializer(report).data, status=status.HTTP_202_ACCEPTED)
+        if report.status == 'failed':
+            return Response(ReportStatusSerializer(report).data, status=status.HTTP_409_CONFLICT)
+        return Response({
+            'id': report.id,
+            'report_type': report.report_type,
+            'filters': report.filters,
+            'completed_at': report.completed_at,
+            'data': report.data
+        })
+    
+    @action(detail=True, methods=['post'])
+    def regenerate(self, request, pk=None):
         """
-        Asigna el usuario actual al reporte.
+        Vuelve a calcular el reporte con sus filtros actuales.
         """
-        serializer.save(generated_by=self.request.user)
+        report = self.get_object()
+        if report.report_type not in REPORT_GENERATORS:
+            return Response({'error': 'Este tipo de reporte no se genera automáticamente.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Uno en cola o en curso no se duplica, salvo que haya vencido REPORT_RUNNING_TIMEOUT
+        if not is_in_progress(report):
+            enqueue_report(report)
+        return Response(ReportStatusSerializer(report).data, status=status.HTTP_202_ACCEPTED)
 
 
 class SalesReportView(APIView):
@@ -42,47 +109,15 @@ class SalesReportView(APIView):
     
     def get(self, request):
         """
-        Genera un reporte de ventas.
+        Genera un reporte de ventas a partir de los agregados diarios (sin
+        pedidos cancelados ni reembolsados).
         """
-        # Obtener parámetros de fecha
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        if not start_date:
-            start_date = timezone.now() - timedelta(days=30)
-        if not end_date:
-            end_date = timezone.now()
-        
-        # Calcular métricas de ventas
-        orders = Order.objects.filter(
-            created_at__date__range=[start_date, end_date],
-            status='completed'
-        )
-        
-        total_sales = orders.aggregate(total=Sum('total_amount'))['total'] or 0
-        total_orders = orders.count()
-        average_order_value = orders.aggregate(avg=Avg('total_amount'))['avg'] or 0
-        
-        # Ventas por día
-        daily_sales = orders.extra(
-            select={'day': 'date(created_at)'}
-        ).values('day').annotate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        ).order_by('day')
-        
-        return Response({
-            'period': {
-                'start_date': start_date,
-                'end_date': end_date
-            },
-            'summary': {
-                'total_sales': total_sales,
-                'total_orders': total_orders,
-                'average_order_value': average_order_value
-            },
-            'daily_sales': list(daily_sales)
-        })
+        try:
+            start_date, end_date = parse_period(request.query_params)
+            granularity = parse_granularity(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(sales_report(start_date, end_date, granularity))
 
 
 class ProductReportView(APIView):
@@ -95,46 +130,7 @@ class ProductReportView(APIView):
         """
         Genera un reporte de productos.
         """
-        # Productos más vendidos
-        top_products = Product.objects.annotate(
-            total_sold=Sum('orderitem__quantity')
-        ).order_by('-total_sold')[:10]
-        
-        # Productos con stock bajo
-        low_stock_products = Product.objects.filter(
-            inventory_quantity__lte=models.F('low_stock_threshold')
-        )
-        
-        # Productos inactivos
-        inactive_products = Product.objects.filter(is_active=False)
-        
-        return Response({
-            'top_products': [
-                {
-                    'id': product.id,
-                    'name': product.name,
-                    'total_sold': product.total_sold or 0
-                }
-                for product in top_products
-            ],
-            'low_stock_products': [
-                {
-                    'id': product.id,
-                    'name': product.name,
-                    'current_stock': product.inventory_quantity,
-                    'low_stock_threshold': product.low_stock_threshold
-                }
-                for product in low_stock_products
-            ],
-            'inactive_products': [
-                {
-                    'id': product.id,
-                    'name': product.name,
-                    'status': product.status
-                }
-                for product in inactive_products
-            ]
-        })
+        return Response(products_report())
 
 
 class UserReportView(APIView):
@@ -147,38 +143,46 @@ class UserReportView(APIView):
         """
         Genera un reporte de usuarios.
         """
-        # Usuarios más activos
-        top_users = User.objects.annotate(
-            total_orders=Count('orders'),
-            total_spent=Sum('orders__total_amount')
-        ).order_by('-total_spent')[:10]
-        
-        # Nuevos usuarios
-        new_users = User.objects.filter(
-            date_joined__date__gte=timezone.now().date() - timedelta(days=30)
-        ).count()
-        
-        # Usuarios inactivos
-        inactive_users = User.objects.filter(
-            last_login__date__lt=timezone.now().date() - timedelta(days=90)
-        ).count()
-        
-        return Response({
-            'top_users': [
-                {
-                    'id': user.id,
-                    'name': user.get_full_name(),
-                    'email': user.email,
-                    'total_orders': user.total_orders or 0,
-                    'total_spent': user.total_spent or 0
-                }
-                for user in top_users
-            ],
-            'summary': {
-                'new_users': new_users,
-                'inactive_users': inactive_users
-            }
-        })
+        return Response(users_report())
+
+
+class ExportView(APIView):
+    """
+    Vista para descargar pedidos, items, pagos o reclamos en CSV o NDJSON.
+    """
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+    
+    def get(self, request, dataset):
+        """
+        Genera la exportación fila a fila, sin cargarla en memoria. Filtros
+        opcionales: `start_date`, `end_date` (YYYY-MM-DD) y `status`.
+        """
+        if dataset not in DATASETS:
+            return Response({'error': f'Exportación no válida. Use {", ".join(DATASETS)}.'},
+                            status=status.HTTP_404_NOT_FOUND)
+        fmt = request.query_params.get('file_format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return Response({'error': f'Formato no válido. Use {", ".join(EXPORT_FORMATS)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        filters = {'status': request.query_params.get('status')}
+        for param in ('start_date', 'end_date'):
+            value = request.query_params.get(param)
+            try:
+                filters[param] = parse_date(value) if value else None
+            except ValueError:
+                filters[param] = None
+            if value and filters[param] is None:
+                return Response({'error': f'{param} debe tener el formato YYYY-MM-DD.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(
+            iter_export(dataset, fmt, **filters),
+            content_type=f'{CONTENT_TYPES[fmt]}; charset=utf-8'
+        )
+        filename = f'{dataset}-{timezone.localdate():%Y%m%d}.{fmt}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
 class ClaimViewSet(viewsets.ModelViewSet):
@@ -198,9 +202,12 @@ class ClaimViewSet(viewsets.ModelViewSet):
         """
         Filtra los reclamos según el usuario.
         """
+        queryset = Claim.objects.select_related('user', 'order', 'product', 'resolved_by').prefetch_related(
+            Prefetch('messages', queryset=ClaimMessage.objects.select_related('author'))
+        )
         if self.request.user.is_staff:
-            return Claim.objects.all().select_related('user', 'order', 'product', 'resolved_by')
-        return Claim.objects.filter(user=self.request.user).select_related('user', 'order', 'product', 'resolved_by')
+            return queryset
+        return queryset.filter(user=self.request.user)
     
     def perform_create(self, serializer):
         """
@@ -256,68 +263,7 @@ class ReviewsReportView(APIView):
         """
         Genera un reporte de reviews.
         """
-        # Estadísticas generales de reviews
-        total_reviews = ProductReview.objects.count()
-        approved_reviews = ProductReview.objects.filter(is_approved=True).count()
-        pending_reviews = ProductReview.objects.filter(is_approved=False).count()
-        average_rating = ProductReview.objects.filter(is_approved=True).aggregate(avg=Avg('rating'))['avg'] or 0
-        
-        # Distribución de ratings
-        rating_distribution = ProductReview.objects.filter(is_approved=True).values('rating').annotate(
-            count=Count('id')
-        ).order_by('rating')
-        
-        # Productos con más reviews
-        top_reviewed_products = Product.objects.annotate(
-            review_count=Count('reviews', filter=Q(reviews__is_approved=True))
-        ).filter(review_count__gt=0).order_by('-review_count')[:10]
-        
-        # Reviews recientes
-        recent_reviews = ProductReview.objects.filter(
-            is_approved=True
-        ).select_related('user', 'product').order_by('-created_at')[:10]
-        
-        # Reviews por mes
-        monthly_reviews = ProductReview.objects.filter(
-            is_approved=True,
-            created_at__date__gte=timezone.now().date() - timedelta(days=365)
-        ).extra(
-            select={'month': 'strftime("%%Y-%%m", created_at)'}
-        ).values('month').annotate(
-            count=Count('id'),
-            avg_rating=Avg('rating')
-        ).order_by('month')
-        
-        return Response({
-            'summary': {
-                'total_reviews': total_reviews,
-                'approved_reviews': approved_reviews,
-                'pending_reviews': pending_reviews,
-                'average_rating': round(average_rating, 2)
-            },
-            'rating_distribution': list(rating_distribution),
-            'top_reviewed_products': [
-                {
-                    'id': product.id,
-                    'name': product.name,
-                    'review_count': product.review_count,
-                    'average_rating': product.reviews.filter(is_approved=True).aggregate(avg=Avg('rating'))['avg'] or 0
-                }
-                for product in top_reviewed_products
-            ],
-            'recent_reviews': [
-                {
-                    'id': review.id,
-                    'user_name': review.user.get_full_name(),
-                    'product_name': review.product.name,
-                    'rating': review.rating,
-                    'title': review.title,
-                    'created_at': review.created_at
-                }
-                for review in recent_reviews
-            ],
-            'monthly_reviews': list(monthly_reviews)
-        })
+        return Response(reviews_report())
 
 
 class ClaimsReportView(APIView):
@@ -330,75 +276,15 @@ class ClaimsReportView(APIView):
         """
         Genera un reporte de reclamos.
         """
-        # Estadísticas generales de reclamos
-        total_claims = Claim.objects.count()
-        pending_claims = Claim.objects.filter(status='pending').count()
-        in_review_claims = Claim.objects.filter(status='in_review').count()
-        resolved_claims = Claim.objects.filter(status='resolved').count()
-        rejected_claims = Claim.objects.filter(status='rejected').count()
-        
-        # Reclamos por tipo
-        claims_by_type = Claim.objects.values('claim_type').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        # Reclamos por prioridad
-        claims_by_priority = Claim.objects.values('priority').annotate(
-            count=Count('id')
-        ).order_by('-count')
-        
-        # Reclamos recientes
-        recent_claims = Claim.objects.select_related('user', 'order', 'product').order_by('-created_at')[:10]
-        
-        # Tiempo promedio de resolución
-        resolved_claims_with_time = Claim.objects.filter(
-            status='resolved',
-            resolved_at__isnull=False
-        ).annotate(
-            resolution_time=F('resolved_at') - F('created_at')
-        )
-        
-        avg_resolution_time = None
-        if resolved_claims_with_time.exists():
-            total_seconds = sum(
-                (claim.resolution_time.total_seconds() for claim in resolved_claims_with_time)
-            )
-            avg_resolution_time = total_seconds / resolved_claims_with_time.count()
-        
-        # Reclamos por mes
-        monthly_claims = Claim.objects.filter(
-            created_at__date__gte=timezone.now().date() - timedelta(days=365)
-        ).extra(
-            select={'month': 'strftime("%%Y-%%m", created_at)'}
-        ).values('month').annotate(
-            count=Count('id')
-        ).order_by('month')
-        
-        return Response({
-            'summary': {
-                'total_claims': total_claims,
-                'pending_claims': pending_claims,
-                'in_review_claims': in_review_claims,
-                'resolved_claims': resolved_claims,
-                'rejected_claims': rejected_claims,
-                'avg_resolution_time_hours': round(avg_resolution_time / 3600, 2) if avg_resolution_time else None
-            },
-            'claims_by_type': list(claims_by_type),
-            'claims_by_priority': list(claims_by_priority),
-            'recent_claims': [
-                {
-                    'id': claim.id,
-                    'user_name': claim.user.get_full_name(),
-                    'title': claim.title,
-                    'claim_type': claim.get_claim_type_display(),
-                    'status': claim.get_status_display(),
-                    'priority': claim.get_priority_display(),
-                    'created_at': claim.created_at
-                }
-                for claim in recent_claims
-            ],
-            'monthly_claims': list(monthly_claims)
-        })
+        return Response(claims_report())
+
+
+def _growth(current, previous):
+    return float((current - previous) / previous * 100) if previous else 0
+
+
+def _sum_days(daily, start, end, field):
+    return sum((values[field] for day, values in daily.items() if start <= day <= end), 0)
 
 
 class DashboardReportView(APIView):
@@ -409,114 +295,100 @@ class DashboardReportView(APIView):
     
     def get(self, request):
         """
-        Genera un reporte del dashboard.
+        Genera un reporte del dashboard. Las ventas salen de los agregados
+        diarios y los clientes y productos nuevos se agrupan por día en una
+        consulta cada uno (cubriendo el período, el anterior y los últimos 6
+        meses calendario); los totales de cada ventana se suman a partir de
+        esos días.
         """
-        # Obtener parámetros de fecha
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        # Si no se proporcionan fechas, usar los últimos 30 días
-        if not start_date or not end_date:
-            end_date = timezone.now()
-            start_date = end_date - timedelta(days=30)
-        else:
-            start_date = timezone.datetime.strptime(start_date, '%Y-%m-%d')
-            end_date = timezone.datetime.strptime(end_date, '%Y-%m-%d')
-        
-        # Período anterior para comparación
-        period_length = (end_date - start_date).days
-        previous_start = start_date - timedelta(days=period_length)
-        previous_end = start_date
-        
-        # Resumen actual
-        current_orders = Order.objects.filter(created_at__range=[start_date, end_date])
-        current_revenue = current_orders.aggregate(total=Sum('total_amount'))['total'] or 0
-        current_orders_count = current_orders.count()
-        current_customers = User.objects.filter(date_joined__range=[start_date, end_date]).count()
-        current_products = Product.objects.filter(created_at__range=[start_date, end_date]).count()
-        
-        # Resumen anterior
-        previous_orders = Order.objects.filter(created_at__range=[previous_start, previous_end])
-        previous_revenue = previous_orders.aggregate(total=Sum('total_amount'))['total'] or 0
-        previous_orders_count = previous_orders.count()
-        previous_customers = User.objects.filter(date_joined__range=[previous_start, previous_end]).count()
-        previous_products = Product.objects.filter(created_at__range=[previous_start, previous_end]).count()
+        try:
+            start_date, end_date = parse_period(request.query_params, default_days=29)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Período anterior de la misma duración, para comparación
+        period_length = end_date - start_date + timedelta(days=1)
+        previous_start = start_date - period_length
+        previous_end = start_date - timedelta(days=1)
+        # Últimos 6 meses calendario, incluyendo el de end_date
+        months = [timeseries.add_months(end_date, offset) for offset in range(-5, 1)]
+        since = min(previous_start, months[0])
+        
+        orders_daily = {
+            row.pop('date'): row
+            for row in DailySalesRollup.objects.filter(date__gte=since, date__lte=end_date).values(
+                'date', 'revenue', 'orders'
+            )
+        }
+        customers_daily = timeseries.bucketed(User.objects.all(), 'date_joined', since, end_date, customers=Count('id'))
+        products_daily = timeseries.bucketed(Product.objects.all(), 'created_at', since, end_date, products=Count('id'))
+        series = (
+            (orders_daily, 'revenue'), (orders_daily, 'orders'),
+            (customers_daily, 'customers'), (products_daily, 'products'),
+        )
         
-        # Calcular crecimiento
-        revenue_growth = ((current_revenue - previous_revenue) / previous_revenue * 100) if previous_revenue > 0 else 0
-        orders_growth = ((current_orders_count - previous_orders_count) / previous_orders_count * 100) if previous_orders_count > 0 else 0
-        customers_growth = ((current_customers - previous_customers) / previous_customers * 100) if previous_customers > 0 else 0
-        products_growth = ((current_products - previous_products) / previous_products * 100) if previous_products > 0 else 0
+        current = {field: _sum_days(daily, start_date, end_date, field) for daily, field in series}
+        previous = {field: _sum_days(daily, previous_start, previous_end, field) for daily, field in series}
         
         # Datos mensuales
         monthly_data = []
-        for i in range(6):  # Últimos 6 meses
-            month_start = end_date - timedelta(days=30 * (i + 1))
-            month_end = end_date - timedelta(days=30 * i)
-            
-            month_orders = Order.objects.filter(created_at__range=[month_start, month_end])
-            month_revenue = month_orders.aggregate(total=Sum('total_amount'))['total'] or 0
-            month_orders_count = month_orders.count()
-            month_customers = User.objects.filter(date_joined__range=[month_start, month_end]).count()
-            month_products = Product.objects.filter(created_at__range=[month_start, month_end]).count()
-            
+        for month in months:
+            month_end = timeseries.add_months(month, 1) - timedelta(days=1)
+            totals = {field: _sum_days(daily, month, month_end, field) for daily, field in series}
             monthly_data.append({
-                'period': month_start.strftime('%b'),
-                'revenue': float(month_revenue),
-                'orders': month_orders_count,
-                'customers': month_customers,
-                'products': month_products
+                'period': month.strftime('%b'),
+                'month': month.strftime('%Y-%m'),
+                'revenue': float(totals['revenue']),
+                'orders': totals['orders'],
+                'customers': totals['customers'],
+                'products': totals['products']
             })
         
-        monthly_data.reverse()
-        
         # Top productos
-        top_products = Product.objects.filter(
-            orderitem__order__created_at__range=[start_date, end_date]
-        ).annotate(
-            sales=Count('orderitem'),
-            revenue=Sum('orderitem__total_price')
+        top_products = DailyProductSalesRollup.objects.filter(
+            date__gte=start_date, date__lte=end_date
+        ).values('product_id', 'product__name').annotate(
+            sales=Sum('units'),
+            revenue=Sum('revenue')
         ).order_by('-sales')[:5]
         
-        top_products_data = []
-        for product in top_products:
-            top_products_data.append({
-                'id': product.id,
-                'name': product.name,
-                'sales': product.sales,
-                'revenue': float(product.revenue or 0)
-            })
-        
         # Top clientes
-        top_customers = User.objects.filter(
-            orders__created_at__range=[start_date, end_date]
-        ).annotate(
-            orders_count=Count('orders'),
-            total_spent=Sum('orders__total_amount')
+        top_customers = DailyCustomerSalesRollup.objects.filter(
+            date__gte=start_date, date__lte=end_date
+        ).values('user_id', 'user__first_name', 'user__last_name', 'user__email').annotate(
+            orders_count=Sum('orders'),
+            total_spent=Sum('revenue')
         ).order_by('-total_spent')[:5]
         
-        top_customers_data = []
-        for customer in top_customers:
-            top_customers_data.append({
-                'id': customer.id,
-                'name': customer.get_full_name(),
-                'email': customer.email,
-                'orders': customer.orders_count,
-                'totalSpent': float(customer.total_spent or 0)
-            })
-        
         return Response({
             'summary': {
-                'total_revenue': float(current_revenue),
-                'total_orders': current_orders_count,
-                'total_customers': current_customers,
-                'total_products': current_products,
-                'revenue_growth': revenue_growth,
-                'orders_growth': orders_growth,
-                'customers_growth': customers_growth,
-                'products_growth': products_growth
+                'total_revenue': float(current['revenue']),
+                'total_orders': current['orders'],
+                'total_customers': current['customers'],
+                'total_products': current['products'],
+                'revenue_growth': _growth(current['revenue'], previous['revenue']),
+                'orders_growth': _growth(current['orders'], previous['orders']),
+                'customers_growth': _growth(current['customers'], previous['customers']),
+                'products_growth': _growth(current['products'], previous['products'])
             },
             'monthly_data': monthly_data,
-            'top_products': top_products_data,
-            'top_customers': top_customers_data
+            'top_products': [
+                {
+                    'id': product['product_id'],
+                    'name': product['product__name'],
+                    'sales': product['sales'],
+                    'revenue': float(product['revenue'] or 0)
+                }
+                for product in top_products
+            ],
+            'top_customers': [
+                {
+                    'id': customer['user_id'],
+                    'name': f"{customer['user__first_name']} {customer['user__last_name']}".strip(),
+                    'email': customer['user__email'],
+                    'orders': customer['orders_count'],
+                    'totalSpent': float(customer['total_spent'] or 0)
+                }
+                for customer in top_customers
+            ]
         })
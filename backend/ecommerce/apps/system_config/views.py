@@ -110,36 +110,37 @@ def admin_stats_view(request):
     """
     try:
         from django.contrib.auth import get_user_model
-        from ecommerce.apps.products.models import Product
+        from django.db.models import Count, Exists, OuterRef, Q
+        from ecommerce.apps.products.models import Product, ProductVariant
         from ecommerce.apps.orders.models import Order
         from ecommerce.apps.users.models import UserAddress
         
         User = get_user_model()
         
+        # Una consulta con conteos condicionales por modelo
         stats = {
-            'users': {
-                'total': User.objects.count(),
-                'active': User.objects.filter(is_active=True).count(),
-                'staff': User.objects.filter(is_staff=True).count(),
-                'customers': User.objects.filter(is_customer=True).count(),
-            },
-            'products': {
-                'total': Product.objects.count(),
-                'active': Product.objects.filter(status='active').count(),
-                'with_variants': Product.objects.filter(variants__isnull=False).distinct().count(),
-            },
-            'orders': {
-                'total': Order.objects.count(),
-                'pending': Order.objects.filter(status='pending').count(),
-                'confirmed': Order.objects.filter(status='confirmed').count(),
-                'shipped': Order.objects.filter(status='shipped').count(),
-                'delivered': Order.objects.filter(status='delivered').count(),
-                'cancelled': Order.objects.filter(status='cancelled').count(),
-            },
-            'addresses': {
-                'total': UserAddress.objects.count(),
-                'default': UserAddress.objects.filter(is_default=True).count(),
-            }
+            'users': User.objects.aggregate(
+                total=Count('pk'),
+                active=Count('pk', filter=Q(is_active=True)),
+                staff=Count('pk', filter=Q(is_staff=True)),
+                customers=Count('pk', filter=Q(is_customer=True)),
+            ),
+            'products': Product.objects.aggregate(
+                total=Count('pk'),
+                active=Count('pk', filter=Q(status='active')),
+                with_variants=Count('pk', filter=Exists(ProductVariant.objects.filter(product=OuterRef('pk')))),
+            ),
+            'orders': Order.objects.aggregate(
+                total=Count('pk'),
+                **{
+                    order_status: Count('pk', filter=Q(status=order_status))
+                    for order_status in ('pending', 'confirmed', 'shipped', 'delivered', 'cancelled')
+                }
+            ),
+            'addresses': UserAddress.objects.aggregate(
+                total=Count('pk'),
+                default=Count('pk', filter=Q(is_default=True)),
+            ),
         }
         
         return Response(stats)
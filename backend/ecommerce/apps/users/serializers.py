@@ -233,7 +233,8 @@ class UserListSerializer(serializers.ModelSerializer):
         Obtener la dirección predeterminada del usuario.
         """
         try:
-            default_address = obj.addresses.filter(is_default=True).first()
+            # Sobre las direcciones ya cargadas (prefetch del listado)
+            default_address = next((address for address in obj.addresses.all() if address.is_default), None)
             if default_address:
                 return UserAddressSerializer(default_address).data
             return None
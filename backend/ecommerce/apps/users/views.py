@@ -152,6 +152,8 @@ class UserViewSet(viewsets.ModelViewSet):
         Filtrar usuarios según parámetros de búsqueda.
         """
         queryset = User.objects.all()
+        if self.action == 'list':
+            queryset = queryset.prefetch_related('addresses')
         
         # Filtrar por estado activo
         is_active = self.request.query_params.get('is_active', None)
@@ -0,0 +1,159 @@
+"""
+Caché de respuestas para los endpoints públicos del catálogo.
+
+Las respuestas se guardan por espacio de nombres (productos, categorías,
+marcas, tallas y colores) bajo una versión. Invalidar un espacio de nombres
+consiste en cambiar su versión, lo que deja huérfanas todas las entradas
+anteriores sin tener que recorrerlas.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+CACHE_PREFIX = 'catalog'
+CACHE_NAMESPACES = ('products', 'categories', 'brands', 'sizes', 'colors')
+
+
+def get_cache_timeout():
+    """Segundos de vida de una respuesta cacheada; 0 desactiva la caché."""
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300)
+
+
+def _version_key(namespace):
+    return f'{CACHE_PREFIX}:version:{namespace}'
+
+
+def _stats_key(namespace, outcome):
+    return f'{CACHE_PREFIX}:stats:{namespace}:{outcome}'
+
+
+def get_namespace_version(namespace):
+    """Retorna la versión vigente de un espacio de nombres, creándola si no existe."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key) or 0
+    return version
+
+
+def invalidate_catalog_cache(*namespaces):
+    """
+    Invalida los espacios de nombres indicados cuando la transacción actual
+    se confirma, para no volver a cachear datos que aún no son visibles.
+    """
+    namespaces = namespaces or CACHE_NAMESPACES
+
+    def bump_versions():
+        cache.set_many({_version_key(namespace): time.time_ns() for namespace in namespaces}, None)
+
+    transaction.on_commit(bump_versions)
+
+
+def build_cache_key(request, namespace, params=None):
+    """
+    Construye la clave a partir de la ruta y los parámetros normalizados.
+    `params` (dict) reemplaza a los parámetros de la URL cuando la vista ya
+    conoce una firma más precisa, p. ej. solo los filtros válidos.
+    """
+    if params is None:
+        params = sorted(
+            (key, value)
+            for key in request.query_params
+            for value in request.query_params.getlist(key)
+            if value != ''
+        )
+    else:
+        params = sorted(params.items())
+    raw = f'{request.get_host()}|{request.path}|{urlencode(params)}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{CACHE_PREFIX}:{namespace}:{get_namespace_version(namespace)}:{digest}'
+
+
+def _record(namespace, outcome):
+    key = _stats_key(namespace, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def get_cache_stats():
+    """Retorna aciertos, fallos y tasa de acierto por espacio de nombres."""
+    keys = [_stats_key(namespace, outcome) for namespace in CACHE_NAMESPACES for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    stats = {}
+    for namespace in CACHE_NAMESPACES:
+        hits = values.get(_stats_key(namespace, 'hits'), 0)
+        misses = values.get(_stats_key(namespace, 'misses'), 0)
+        total = hits + misses
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def cached_response(request, namespace, get_response, anonymous_only=True, params=None):
+    """
+    Sirve la respuesta desde la caché para peticiones GET anónimas. Los
+    usuarios autenticados (administradores incluidos) siempre ven datos frescos,
+    salvo que la respuesta no dependa del usuario (anonymous_only=False).
+    """
+    timeout = get_cache_timeout()
+    if not timeout or request.method != 'GET':
+        return get_response()
+    if anonymous_only and request.user.is_authenticated:
+        return get_response()
+
+    key = build_cache_key(request, namespace, params)
+    data = cache.get(key)
+    if data is not None:
+        _record(namespace, 'hits')
+        response = Response(data)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _record(namespace, 'misses')
+    response = get_response()
+    if response.status_code == 200:
+        cache.set(key, response.data, timeout)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cache_catalog_response(namespace):
+    """Decorador para vistas basadas en funciones (debajo de @api_view)."""
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            return cached_response(request, namespace, lambda: view_func(request, *args, **kwargs))
+        return wrapped
+    return decorator
+
+
+class CatalogCacheMixin:
+    """
+    Mixin para vistas genéricas y viewsets de solo lectura del catálogo.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.cache_namespace,
+            lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, self.cache_namespace,
+            lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs)
+        )
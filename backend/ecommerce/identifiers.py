@@ -0,0 +1,222 @@
+"""
+Identificadores legibles para pedidos, pagos y reembolsos.
+
+Formato: `[PREFIJO-]YYYYMMDD-XXXXXXXXXX`. La fecha es la del día (UTC) y el
+código son 10 caracteres en base 36 que codifican, al estilo Snowflake:
+
+    milisegundos desde el inicio del día (27 bits)
+    | identificador del proceso (ID_WORKER_ID, 10 bits)
+    | secuencia dentro del mismo milisegundo (12 bits)
+
+Se generan en memoria, sin consultar la base de datos, y no se repiten
+mientras cada proceso tenga un worker_id distinto. Si no se fija ID_WORKER_ID,
+cada proceso toma uno en Redis con una concesión (`id-worker:<n>`, SET NX con
+expiración) que renueva mientras genera identificadores; si Redis no está
+disponible se usa uno derivado del host y del PID, que puede coincidir con el
+de otro proceso. Por eso `save_with_identifier` reintenta con otro
+identificador si el INSERT choca con el índice único.
+
+Como crecen con el tiempo y tienen ancho fijo, el orden alfabético coincide
+con el de creación y las inserciones en el índice único caen casi siempre al
+final del B-tree.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from redis.exceptions import RedisError, WatchError
+
+logger = logging.getLogger(__name__)
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+CODE_LENGTH = 10
+ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+MS_PER_DAY = 24 * 60 * 60 * 1000
+WORKER_KEY = 'id-worker:{worker_id}'
+WORKER_COUNTER_KEY = 'id-worker:next'
+# Segundos antes de volver a intentar con Redis tras un error
+LEASE_RETRY_SECONDS = 30
+# Intentos de guardado con identificadores distintos ante un choque en el índice único
+SAVE_ATTEMPTS = 3
+
+
+def default_worker_id():
+    """Identificador del proceso derivado del host y del PID."""
+    seed = f'{socket.gethostname()}:{os.getpid()}'.encode()
+    return zlib.crc32(seed) & MAX_WORKER_ID
+
+
+class WorkerLease:
+    """
+    Concesión de un worker_id en Redis. Se renueva cada tercio de
+    ID_WORKER_LEASE_SECONDS al generar identificadores; si expiró y otro
+    proceso tomó el mismo número, se pide uno nuevo antes de seguir.
+    """
+
+    def __init__(self, connection=None, timeout=None):
+        self._connection = connection
+        self.timeout = settings.ID_WORKER_LEASE_SECONDS if timeout is None else timeout
+        self.token = uuid.uuid4().hex
+        self.worker_id = None
+        self._renewed_at = None
+
+    @property
+    def conn(self):
+        if self._connection is None:
+            from django_redis import get_redis_connection
+            self._connection = get_redis_connection('default')
+        return self._connection
+
+    def acquire(self):
+        """Toma el primer worker_id libre a partir de un contador compartido."""
+        start = self.conn.incr(WORKER_COUNTER_KEY)
+        for offset in range(MAX_WORKER_ID + 1):
+            worker_id = (start + offset) & MAX_WORKER_ID
+            if self.conn.set(WORKER_KEY.format(worker_id=worker_id), self.token, nx=True, ex=self.timeout):
+                self.worker_id = worker_id
+                self._renewed_at = time.monotonic()
+                return worker_id
+        raise RuntimeError('No quedan worker_id libres; defina ID_WORKER_ID en cada proceso.')
+
+    def renew(self):
+        """Extiende la concesión; retorna False si otro proceso tiene el worker_id."""
+        key = WORKER_KEY.format(worker_id=self.worker_id)
+        with self.conn.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                owner = pipe.get(key)
+                if owner is not None and owner.decode() != self.token:
+                    return False
+                pipe.multi()
+                pipe.set(key, self.token, ex=self.timeout)
+                pipe.execute()
+            except WatchError:
+                return False
+        self._renewed_at = time.monotonic()
+        return True
+
+    def current(self):
+        """worker_id vigente, renovando la concesión o pidiendo otra cuando toca."""
+        if self.worker_id is None:
+            return self.acquire()
+        if time.monotonic() - self._renewed_at >= self.timeout / 3 and not self.renew():
+            return self.acquire()
+        return self.worker_id
+
+
+def to_base36(number, length=CODE_LENGTH):
+    chars = []
+    while number:
+        number, remainder = divmod(number, 36)
+        chars.append(ALPHABET[remainder])
+    return ''.join(reversed(chars)).rjust(length, '0')
+
+
+class IdentifierGenerator:
+    """Generador monótono por proceso; seguro entre hilos."""
+
+    def __init__(self, worker_id=None):
+        self._configured_worker_id = worker_id
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        worker_id = self._configured_worker_id
+        if worker_id is None:
+            worker_id = getattr(settings, 'ID_WORKER_ID', None)
+        if worker_id is None:
+            self.worker_id = None
+            self._lease = WorkerLease()
+            self._lease_retry_at = 0
+        else:
+            self.worker_id = int(worker_id) & MAX_WORKER_ID
+            self._lease = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _refresh_worker_id(self):
+        if self._lease is None or time.monotonic() < self._lease_retry_at:
+            return
+        try:
+            self.worker_id = self._lease.current()
+        except RedisError as e:
+            self._lease_retry_at = time.monotonic() + LEASE_RETRY_SECONDS
+            if self.worker_id is None:
+                logger.warning('No se pudo asignar un worker_id en Redis (%s); se deriva del host y del PID', e)
+                self.worker_id = default_worker_id()
+
+    def _next(self):
+        """Retorna (milisegundo Unix, worker_id, secuencia) únicos para este proceso."""
+        with self._lock:
+            if os.getpid() != self._pid:
+                self._reset()  # Proceso hijo tras un fork: otro worker_id
+            self._refresh_worker_id()
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms < self._last_ms:
+                now_ms = self._last_ms  # El reloj retrocedió: seguir en el último milisegundo
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Secuencia agotada en este milisegundo: esperar al siguiente
+                    while now_ms <= self._last_ms:
+                        now_ms = time.time_ns() // 1_000_000
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return now_ms, self.worker_id, self._sequence
+
+    def generate(self, prefix=''):
+        now_ms, worker_id, sequence = self._next()
+        day_ms = now_ms % MS_PER_DAY
+        date_str = datetime.fromtimestamp(now_ms / 1000, tz=dt_timezone.utc).strftime('%Y%m%d')
+        value = (((day_ms << WORKER_BITS) | worker_id) << SEQUENCE_BITS) | sequence
+        code = to_base36(value)
+        return f'{prefix}-{date_str}-{code}' if prefix else f'{date_str}-{code}'
+
+
+_generator = None
+_generator_lock = threading.Lock()
+
+
+def generate_identifier(prefix=''):
+    """Retorna un identificador único y ordenado en el tiempo, p. ej. `PAY-20250101-00A1B2C3D4`."""
+    global _generator
+    if _generator is None:
+        with _generator_lock:
+            if _generator is None:
+                _generator = IdentifierGenerator()
+    return _generator.generate(prefix)
+
+
+def save_with_identifier(instance, field, generate, save):
+    """
+    Ejecuta `save()` asignando antes un identificador nuevo (`generate()`) al
+    campo único `field` si está vacío. Si el INSERT choca porque ese valor ya
+    existe, reintenta con otro hasta SAVE_ATTEMPTS veces.
+    """
+    if getattr(instance, field):
+        return save()
+    for attempt in range(SAVE_ATTEMPTS):
+        value = generate()
+        setattr(instance, field, value)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            setattr(instance, field, '')
+            taken = type(instance)._default_manager.filter(**{field: value}).exists()
+            if not taken or attempt == SAVE_ATTEMPTS - 1:
+                raise
+            logger.warning('%s %s repetido; se genera otro', field, value)
@@ -0,0 +1,237 @@
+"""
+Paginación para listados grandes (productos, órdenes y reseñas).
+
+Por defecto pagina por número de página, igual que PageNumberPagination.
+Además admite:
+
+- Paginación por keyset: `?pagination=cursor` pide la primera página y cada
+  respuesta trae en `next` la URL con `?cursor=` de la siguiente. En lugar
+  de OFFSET filtra por los valores de orden de la última fila vista, así que
+  el costo de una página no depende de su profundidad. El orden es el del
+  queryset con la clave primaria como desempate.
+- `?count=none`: omite el COUNT(*). `?count=estimate`: usa la estimación
+  del planificador en PostgreSQL y un conteo acotado en otros motores. En
+  modo cursor el conteo se omite salvo que se pida (`count=exact`).
+"""
+
+import base64
+import datetime
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+COUNT_EXACT = 'exact'
+COUNT_NONE = 'none'
+COUNT_ESTIMATE = 'estimate'
+
+# Máximo de filas que cuenta `count=estimate` fuera de PostgreSQL
+ESTIMATE_COUNT_CAP = 1000
+
+
+def estimate_count(queryset):
+    """
+    Retorna (conteo, es_exacto). En PostgreSQL usa las filas estimadas por
+    EXPLAIN; en otros motores cuenta hasta ESTIMATE_COUNT_CAP filas.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows']), False
+
+    count = queryset[:ESTIMATE_COUNT_CAP + 1].count()
+    return min(count, ESTIMATE_COUNT_CAP), count <= ESTIMATE_COUNT_CAP
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Conserva los microsegundos, que DjangoJSONEncoder trunca."""
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class ListingPagination(PageNumberPagination):
+    """
+    Paginación por número de página o por keyset, con conteo opcional.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.use_cursor = bool(
+            request.query_params.get(self.cursor_query_param) or
+            request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+        default_count = COUNT_NONE if self.use_cursor else COUNT_EXACT
+        self.count_mode = request.query_params.get(self.count_query_param, default_count)
+        if self.count_mode not in (COUNT_EXACT, COUNT_NONE, COUNT_ESTIMATE):
+            self.count_mode = default_count
+
+        if self.use_cursor:
+            return self.paginate_keyset(queryset, request)
+        if self.count_mode == COUNT_EXACT:
+            self.count = None
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_without_count(queryset, request)
+
+    # Conteo
+
+    def compute_count(self, queryset):
+        self.count, self.count_is_exact = None, True
+        if self.count_mode == COUNT_EXACT:
+            self.count = queryset.count()
+        elif self.count_mode == COUNT_ESTIMATE:
+            self.count, self.count_is_exact = estimate_count(queryset)
+
+    # Número de página sin COUNT(*)
+
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=self.page_number, message=''))
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.compute_count(queryset)
+        return rows[:page_size]
+
+    # Keyset
+
+    def get_keyset_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if any(not isinstance(term, str) or term.startswith('?') for term in ordering):
+            raise NotFound('Este listado no admite paginación por cursor.')
+        pk_name = queryset.model._meta.pk.name
+        if not {'pk', pk_name} & {term.lstrip('-') for term in ordering}:
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+        return ordering
+
+    def encode_cursor(self, values):
+        raw = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, queryset, ordering):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        decoded = []
+        for term, value in zip(ordering, values):
+            name = term.lstrip('-')
+            try:
+                field = queryset.model._meta.pk if name == 'pk' else queryset.model._meta.get_field(name)
+                value = field.target_field.to_python(value) if field.is_relation else field.to_python(value)
+            except FieldDoesNotExist:
+                pass  # Anotaciones y campos relacionados se comparan con el valor tal cual
+            except DjangoValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            decoded.append(value)
+        return decoded
+
+    def row_values(self, obj, ordering):
+        values = []
+        for term in ordering:
+            value = obj
+            for part in term.lstrip('-').split('__'):
+                value = getattr(value, part)
+            values.append(value.pk if isinstance(value, models.Model) else value)
+        return values
+
+    def keyset_filter(self, ordering, values):
+        """
+        Filas posteriores a `values` en el orden dado:
+        (a > va) OR (a = va AND b > vb) OR (a = va AND b = vb AND c > vc) ...
+        """
+        condition = Q()
+        equal = Q()
+        for term, value in zip(ordering, values):
+            name = term.lstrip('-')
+            lookup = 'lt' if term.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_keyset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        ordering = self.get_keyset_ordering(queryset)
+        queryset = queryset.order_by(*ordering)
+        self.compute_count(queryset)
+
+        page = queryset
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            page = queryset.filter(self.keyset_filter(ordering, self.decode_cursor(cursor, queryset, ordering)))
+
+        rows = list(page[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = self.encode_cursor(self.row_values(rows[-1], ordering)) if self.has_next else None
+        return rows
+
+    # Respuesta
+
+    def get_next_link(self):
+        if self.use_cursor:
+            if not self.next_cursor:
+                return None
+            url = self.request.build_absolute_uri()
+            url = replace_query_param(url, self.mode_query_param, 'cursor')
+            return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+        if self.count_mode == COUNT_EXACT:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.use_cursor:
+            return None
+        if self.count_mode == COUNT_EXACT:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor and self.count_mode == COUNT_EXACT:
+            return super().get_paginated_response(data)
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+            response['count_is_exact'] = self.count_is_exact
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
@@ -251,10 +251,35 @@ CACHES = {
         'LOCATION': config('REDIS_URL', default='redis://127.0.0.1:6379/1'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # Si Redis no está disponible, degradar a no usar caché en lugar de fallar
+            'IGNORE_EXCEPTIONS': True,
         }
     }
 }
 
+# Tiempo de vida (segundos) de las respuestas cacheadas del catálogo; 0 la desactiva
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Backend del carrito: 'database' o 'redis' (escritura diferida en Cart/CartItem)
+CART_BACKEND = config('CART_BACKEND', default='database')
+# Segundos que espera la escritura diferida de un carrito en Redis
+CART_WRITE_BEHIND_DELAY = config('CART_WRITE_BEHIND_DELAY', default=5, cast=int)
+
+# Identificador de este proceso (0-1023) para los números de pedido, pago y
+# reembolso; si no se define, cada proceso toma uno en Redis con una concesión
+ID_WORKER_ID = config('ID_WORKER_ID', default=None, cast=lambda value: None if value in (None, '') else int(value))
+# Segundos que dura la concesión del worker_id en Redis (se renueva al usarse)
+ID_WORKER_LEASE_SECONDS = config('ID_WORKER_LEASE_SECONDS', default=300, cast=int)
+
+# Minutos que dura la reserva de inventario de un pedido pendiente de pago
+INVENTORY_HOLD_MINUTES = config('INVENTORY_HOLD_MINUTES', default=15, cast=int)
+
+# Segundos que se agrupan los cambios de un día antes de recalcular sus agregados de ventas
+SALES_ROLLUP_REFRESH_DELAY = config('SALES_ROLLUP_REFRESH_DELAY', default=30, cast=int)
+
+# Segundos tras los cuales un reporte en 'running' se considera abandonado
+REPORT_RUNNING_TIMEOUT = config('REPORT_RUNNING_TIMEOUT', default=30 * 60, cast=int)
+
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://127.0.0.1:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://127.0.0.1:6379/0')
@@ -262,6 +287,24 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    'flush-pending-carts': {
+        'task': 'ecommerce.apps.cart.tasks.flush_pending_carts',
+        'schedule': 60.0,
+    },
+    'release-expired-inventory-holds': {
+        'task': 'ecommerce.apps.orders.tasks.release_expired_holds',
+        'schedule': 60.0,
+    },
+    'refresh-recent-sales-rollups': {
+        'task': 'ecommerce.apps.reports.tasks.refresh_recent_sales_rollups',
+        'schedule': 15 * 60.0,
+    },
+    'run-scheduled-reports': {
+        'task': 'ecommerce.apps.reports.tasks.run_scheduled_reports',
+        'schedule': 15 * 60.0,
+    },
+}
 
 # Logging Configuration
 LOGGING = {